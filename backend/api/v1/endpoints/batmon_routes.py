@@ -1,74 +1,231 @@
+import asyncio
 import datetime
+import json
+from typing import List, Optional
 
 
 from backend.core.logger import get_logger
-from fastapi import APIRouter
-from datetime import datetime, timezone, timedelta
-from backend.domains.batmon_schema import HealthCheckResponse
-from backend.domains.services.auto_esafe import AutoEsafeService
-from backend.domains.services.fund_mail_service import FundMailService
-from backend.domains.services.kindscrap_service import KindscrapService
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from backend.core.batmon_db import batmon_db
+from backend.domains.batmon_schema import CheckHistory, HealthCheckResponse, JobInfo, ServiceStatus
+from backend.domains.services.health_check import KST, build_health_response
+from backend.domains.services.health_monitor import health_monitor
+from backend.domains.services.hub_poller import hub_poller
+from backend.domains.services.job_manager import JobError, job_manager
+from backend.domains.services.service_registry import service_registry
 from backend.core.config import config 
+from backend.core.http_cache import is_not_modified, make_etag, not_modified_response, set_etag
 
 logger = get_logger(__name__)
 
-KST = timezone(timedelta(hours=9))
-
 router = APIRouter()
+
 @router.get("/check", response_model=HealthCheckResponse, include_in_schema=True)
-def check():
-    ''' 3개의 프로그램에 대해서 현재의 상황을 리포트한다. '''
-    programs = config.list_programs()
-    services = []
-    
-    for program in programs:
-        if program["name"] == "auto_esafe":
-            autoesafe = AutoEsafeService("auto_esafe")
-            service = autoesafe.check()
-        elif program["name"] == "kindscrap":
-            kindscrap = KindscrapService("kindscrap")
-            service = kindscrap.check()
-        elif program["name"] == "fund_mail":
-            fund_mail = FundMailService("fund_mail")
-            service = fund_mail.check()
-        else:
-            raise ValueError("Unknown program")
-        services.append(service)
-    
-    # 전체 상태 집계
-    ok_count = sum(1 for service in services if service.status == "OK")
-    error_count = sum(1 for service in services if service.status == "ERROR")
-    total_services = len(services)
-    
-    # 전체 상태 판단
-    if error_count > 0:
-        overall_status = "ERROR"
-        summary = f"{error_count}개의 서비스에서 오류가 발생했습니다."
+def check(request: Request, response: Response,
+          fresh: bool = Query(False, description="1이면 스냅샷 대신 지금 바로 다시 점검"),
+          local: bool = Query(False, description="1이면 허브 모드에서도 이 서버의 프로그램만 (허브가 에이전트를 조회할 때)")):
+    '''
+    프로그램들의 현재 상황을 리포트한다. (백그라운드 점검 스냅샷을 읽어서 응답)
+    ETag는 (설정 버전, 스냅샷 버전)이며, If-None-Match가 같으면 본문 없이 304를 돌려준다.
+    timestamp/age_seconds 는 응답할 때마다 달라지므로 weak ETag 이다. (경과 시간은 checked_at 으로 계산)
+    허브 모드(BATMON.yml agents)이면 에이전트들의 결과를 합쳐서 응답한다.
+    '''
+    if hub_poller.active and not local:
+        return _hub_check(request, response, fresh)
+    if fresh:
+        version, services = health_monitor.refresh()
     else:
-        overall_status = "OK"
-        summary = "모든 서비스가 정상적으로 동작 중입니다."
-    
-    return HealthCheckResponse(
-        timestamp=datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S"),
-        overall_status=overall_status,
-        services=services,
-        summary=summary,
-        total_services=total_services,
-        ok_count=ok_count,
-        error_count=error_count
+        etag = make_etag("check", config.snapshot().version, health_monitor.version, weak=True)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        version, services = health_monitor.snapshot()
+    set_etag(response, make_etag("check", config.snapshot().version, version, weak=True))
+    return build_health_response(services, snapshot_version=version)
+
+def _hub_check(request: Request, response: Response, fresh: bool):
+    '''
+    허브 모드 /check: 이 서버의 프로그램(있으면) + 에이전트별 마지막 조회 결과.
+    ETag는 (설정 버전, 스냅샷 버전, 에이전트 결과 버전)인 weak ETag 이다. (경과 시간은 checked_at/fetched_at 으로 계산)
+    '''
+    if fresh:
+        hub_version, remote, agents = hub_poller.refresh()
+        version, services = health_monitor.refresh()
+    else:
+        etag = make_etag("check", config.snapshot().version, health_monitor.version, hub_poller.version, weak=True)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        hub_version, remote, agents = hub_poller.merged()
+        version, services = health_monitor.snapshot()
+    set_etag(response, make_etag("check", config.snapshot().version, version, hub_version, weak=True))
+    result = build_health_response(services + remote, snapshot_version=version)
+    result.agents = agents
+    return result
+
+@router.get("/stream", include_in_schema=True)
+async def stream(request: Request, last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    '''
+    서비스 상태 변경을 Server-Sent Events로 보낸다.
+    - 처음 접속하면 전체 상태(event: snapshot, HealthCheckResponse)를 보내고,
+      이후에는 상태가 바뀐 서비스만(event: status, ServiceStatus) 바로 보낸다.
+    - 재접속 시 Last-Event-ID 이후의 이벤트를 이어서 보낸다.
+    - SSE_HEARTBEAT 초마다 주석 줄(heartbeat)을 보내 연결을 유지한다.
+    '''
+    try:
+        resume_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_id = None
+
+    # 아직 점검되지 않은 프로그램이 있으면 먼저 점검 (파일시스템 접근이므로 스레드풀에서)
+    await run_in_threadpool(health_monitor.snapshot)
+    sub, backlog = health_monitor.subscribe(resume_id)
+
+    def fmt(event) -> str:
+        return f"id: {event.id}\nevent: {event.event}\ndata: {event.data}\n\n"
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            for event in backlog:
+                yield fmt(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=config.SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is None:  # 서버 종료 또는 너무 밀려서 끊김
+                    break
+                yield fmt(event)
+        finally:
+            health_monitor.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-@router.get("/rerun", response_model=HealthCheckResponse, include_in_schema=True)
+@router.get("/history", response_model=List[CheckHistory], include_in_schema=True)
+def history(program: str,
+            start: Optional[datetime.datetime] = Query(None, alias="from", description="시작 시각 (기본: 24시간 전)"),
+            end: Optional[datetime.datetime] = Query(None, alias="to", description="끝 시각 (기본: 현재)"),
+            limit: int = Query(1000, ge=1, le=100000)):
+    ''' 프로그램의 점검 이력을 시간 오름차순으로 반환한다. (구간 안에서 가장 최근 limit건) '''
+    until = end.timestamp() if end else datetime.datetime.now().timestamp() + 1
+    since = start.timestamp() if start else until - 86400
+    rows = batmon_db.check_history(program, since, until, limit)
+    for row in rows:
+        row["checked_at"] = datetime.datetime.fromtimestamp(row["checked_at"], KST)
+    return rows
+
+@router.get("/rerun", response_model=ServiceStatus, include_in_schema=True)
 def rerun(program: str):
-    ''' 프로그램을 실행한다. '''
-    if program not in ["auto_esafe", "kindscrap"]:
-        raise ValueError("Unknown program")
-
-    if program == "auto_esafe":
-        autoesafe = AutoEsafeService("auto_esafe")
-        service = autoesafe.rerun()
-    elif program == "kindscrap":
-        kindscrap = KindscrapService("kindscrap")
-        service = kindscrap.rerun()
-
-    return service
+    ''' 프로그램을 실행한다. (작업 관리자로 실행, 작업 id 와 출력은 /jobs 참고) '''
+    service = service_registry.get(program)
+    if service is None:
+        raise HTTPException(status_code=404, detail=f"프로그램 '{program}'을 찾을 수 없습니다.")
+    return service.rerun()
+
+@router.get("/jobs", response_model=List[JobInfo], include_in_schema=True)
+def jobs(program: Optional[str] = None, limit: int = Query(50, ge=1, le=1000)):
+    ''' 프로그램 실행 작업 목록 (최근 요청 순). 메모리의 최근 작업 + DB 에 기록된 지난 작업 '''
+    current = job_manager.jobs(program)
+    result = [job_manager.info(job) for job in current[:limit]]
+    seen = {job.id for job in current}
+    for row in batmon_db.job_history(program, limit):
+        if len(result) >= limit:
+            break
+        if row["id"] not in seen:
+            result.append(job_manager.history_info(row))
+    result.sort(key=lambda info: info.requested_at, reverse=True)
+    return result
+
+@router.post("/jobs", response_model=JobInfo, include_in_schema=True)
+def run_job(program: str, response: Response):
+    '''
+    프로그램(retry_program)을 실행한다. 새 작업이면 202, 같은 프로그램이 이미 대기/실행 중이면 그 작업을 200 (duplicate)으로 돌려준다.
+    진행 상황과 출력은 /jobs/{id}/stream 으로 받는다.
+    '''
+    service = service_registry.get(program)
+    if service is None:
+        raise HTTPException(status_code=404, detail=f"프로그램 '{program}'을 찾을 수 없습니다.")
+    try:
+        job, created = service.start_job()
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    response.status_code = 202 if created else 200
+    return job_manager.info(job, duplicate=not created)
+
+@router.get("/jobs/{job_id}", response_model=JobInfo, include_in_schema=True)
+def job_detail(job_id: str):
+    ''' 작업 상태와 최근 출력 (메모리에 없는 지난 작업은 DB 에 남은 마지막 출력만) '''
+    job = job_manager.get(job_id)
+    if job is not None:
+        return job_manager.info(job, with_output=True)
+    rows = batmon_db.job_history(job_id=job_id, limit=1)
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"작업 '{job_id}'을 찾을 수 없습니다.")
+    return job_manager.history_info(rows[0])
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobInfo, include_in_schema=True)
+def cancel_job(job_id: str):
+    ''' 대기 중인 작업은 취소하고, 실행 중인 작업은 프로세스(자식 포함)를 종료한다. '''
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업 '{job_id}'을 찾을 수 없습니다.")
+    return job_manager.info(job)
+
+@router.get("/jobs/{job_id}/stream", include_in_schema=True)
+async def job_stream(job_id: str, request: Request, last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    '''
+    작업 출력을 Server-Sent Events로 보낸다.
+    - event: output (id = 줄 번호, JobOutputLine), 재접속 시 Last-Event-ID 이후 줄부터
+    - event: skipped: 보관 한도(JOB_OUTPUT_LINES)를 넘어 보내지 못한 줄 수
+    - event: status: 상태가 바뀔 때 JobInfo, event: end: 작업이 끝나면 보내고 연결을 닫는다
+    '''
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업 '{job_id}'을 찾을 수 없습니다.")
+    try:
+        after = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        after = 0
+
+    async def event_stream():
+        nonlocal after
+        wakeup = job.subscribe()
+        status = None
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                # 끝났는지 먼저 보고 출력을 읽는다 (끝나기 전에 쌓인 줄은 모두 읽힘)
+                finished = job.finished
+                lines, skipped = job.read_output(after)
+                if skipped:
+                    yield f"event: skipped\ndata: {json.dumps({'count': skipped})}\n\n"
+                for line in lines:
+                    yield f"id: {line.seq}\nevent: output\ndata: {line.model_dump_json()}\n\n"
+                    after = line.seq
+                if job.status != status:
+                    status = job.status
+                    yield f"event: status\ndata: {job_manager.info(job).model_dump_json()}\n\n"
+                if finished:
+                    yield "event: end\ndata: {}\n\n"
+                    break
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=config.SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                wakeup.clear()
+        finally:
+            job.unsubscribe(wakeup)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -9,17 +9,20 @@
 버전: 1.0
 """
 from fastapi import APIRouter, Query, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 
 from backend.core.config import config
 from backend.core.logger import get_logger
-from backend.core.template_engine import render_template
+from backend.core.template_engine import render_template, stream_template
 from backend.domains.page_contexts.context_registry import PAGE_CONTEXT_PROVIDERS
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+# 조각씩 렌더링해서 바로 보내는 화면 (데이터가 큰 페이지: 첫 바이트를 렌더링 완료 전에 보낸다)
+STREAMED_PAGES = {"template/files/view.html"}
+
 def get_today():
     from datetime import datetime
     weekdays = ["월", "화", "수", "목", "금", "토", "일"]
@@ -95,4 +98,6 @@ async def page(
         context["data"] = data
     template_page = f"template/{path.lstrip('/')}.html"
     logger.debug(f"template_page 호출됨: {template_page}")
+    if template_page in STREAMED_PAGES:
+        return StreamingResponse(stream_template(template_page, context), media_type="text/html; charset=utf-8")
     return render_template(template_page, context)    
\ No newline at end of file
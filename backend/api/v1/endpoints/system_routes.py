@@ -1,23 +1,38 @@
+import asyncio
+import json
 import mimetypes
 import os
 import tempfile
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from fastapi.responses import FileResponse, StreamingResponse
 from backend.core.config import config
-from backend.core.logger import get_logger
-from fastapi import APIRouter, HTTPException, Request
+from backend.core.file_response import file_response
+from backend.core.http_cache import is_not_modified, make_etag, not_modified_response, set_etag
+from backend.core.logger import get_logger, log_stats
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 
-from backend.domains.system_schema import SystemSummary
-from backend.utils.dir_util import get_directory_info
-from backend.utils.sys_util import get_system_info
+from backend.domains.services.log_tailer import TailFilter, log_tailer
+from backend.domains.services.metrics_sampler import metrics_sampler
+from backend.domains.system_schema import ExcelPage, LogStats, MetricSeries, SystemSummary, TextWindow
+from backend.utils.dir_util import get_directory_info, iter_directory_entries, listing_signature, normalize_and_guard
+from backend.utils.excel_preview import MAX_PAGE_ROWS as EXCEL_MAX_PAGE_ROWS
+from backend.utils.excel_preview import read_page as read_excel_page
+from backend.utils.line_index import MAX_WINDOW_LINES, read_window
+from backend.utils.sys_util import KST, get_system_info, host_facts_ready, system_info_version
 
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+# 배치 로그/설정 파일은 text/plain 으로 보낸다 (기본값 application/octet-stream 이면 응답 압축 대상에서 빠짐)
+for _ext in ('.log', '.ini', '.cfg', '.conf', '.yml', '.yaml'):
+    mimetypes.add_type('text/plain', _ext)
+
 @router.get("/time",  include_in_schema=True)
 def time(request: Request):
 
@@ -30,13 +45,22 @@ def time(request: Request):
     return content
 
 @router.get("/info", response_model=SystemSummary, include_in_schema=True)
-def info(request: Request):
+async def info(request: Request, response: Response):
     """
     시스템 정보를 반환합니다.
+    호스트 정보는 캐시, CPU 사용률은 백그라운드 지표 수집값을 쓰므로 기다리지 않아 스레드풀 없이 처리합니다.
+    (startup 에서 미리 수집하는 호스트 정보가 아직 없으면 그때만 스레드풀에서 기다립니다)
+    ETag는 (호스트 정보 세대, 지표 수집 시각)이며, 같으면 본문을 만들지 않고 304를 돌려줍니다.
     """
     logger.info("시스템 정보 요청")
+    etag = make_etag("info", *system_info_version())
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
     try:
-        summary = get_system_info()  # 반드시 SystemSummary 인스턴스를 반환하도록 구현
+        if host_facts_ready():
+            summary = get_system_info()  # 반드시 SystemSummary 인스턴스를 반환하도록 구현
+        else:
+            summary = await run_in_threadpool(get_system_info)
     except Exception as e:
         logger.exception("시스템 정보 조회 실패: %s", e)
         # JSON으로 {"detail": "..."} 형식 반환
@@ -45,12 +69,53 @@ def info(request: Request):
     if summary is None:
         raise HTTPException(status_code=500, detail="시스템 정보가 비어 있습니다.")
 
+    # 처음 요청이면 호스트 정보를 방금 수집해서 세대가 바뀌었을 수 있다
+    set_etag(response, make_etag("info", *system_info_version()))
     return summary  # OK: 200 + JSON (SystemSummary 직렬화)
 
+@router.get("/logging", response_model=LogStats, include_in_schema=True)
+def logging_stats():
+    """
+    Batmon 자체 로그 큐 상태. dropped 가 늘면 로그가 디스크 쓰기보다 빨리 쌓이는 것이므로
+    LOG_LEVEL 을 올리거나 LOG_QUEUE_SIZE 를 늘린다.
+    """
+    return LogStats(**log_stats())
+
+@router.get("/metrics", response_model=MetricSeries, include_in_schema=True)
+def metrics(start: Optional[datetime] = Query(None, alias="from", description="시작 시각 (기본: 1시간 전)"),
+            end: Optional[datetime] = Query(None, alias="to", description="끝 시각 (기본: 현재)"),
+            step: Optional[int] = Query(None, ge=1, description="점 사이 간격(초), 생략하면 자동")):
+    """
+    CPU/메모리/디스크 사용률과 디스크 I/O 속도의 시계열을 반환합니다.
+    step 60초 이상은 1분/5분/1시간 집계에서, 그 미만은 메모리의 최근 수집값에서 만듭니다.
+    """
+    until = end.timestamp() if end else datetime.now().timestamp() + 1
+    since = start.timestamp() if start else until - 3600
+    if since >= until:
+        raise HTTPException(status_code=400, detail="from 은 to 보다 이전이어야 합니다.")
+    step, source, points = metrics_sampler.series(since, until, step)
+    for point in points:
+        point["time"] = datetime.fromtimestamp(point["time"], KST)
+    return MetricSeries(step=step, source=source, points=points)
+
 @router.get("/dir/{name}", include_in_schema=True)
-def get_dirs(name: str, subpath: str = "", request: Request = None):
-    """ name에 해당하는 디렉토리의 하위 디렉토리 목록을 반환합니다. """
+def get_dirs(name: str, response: Response, subpath: str = "", request: Request = None,
+             sort: str = Query("name", pattern="^(name|mtime|size)$", description="정렬 기준"),
+             order: str = Query("asc", pattern="^(asc|desc)$"),
+             ext: Optional[str] = Query(None, description="파일 확장자 필터, 쉼표 구분 (예: log,txt)"),
+             glob: Optional[str] = Query(None, description="파일명 glob 필터 (예: *2025_07*)"),
+             limit: Optional[int] = Query(None, ge=1, le=10000, description="한 번에 받을 파일 수 (생략하면 전체)"),
+             cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+             stream: bool = Query(False, description="1이면 정렬 없이 scandir 순서대로 NDJSON 스트리밍")):
+    """
+    name에 해당하는 디렉토리의 하위 디렉토리 목록을 반환합니다.
+    폴더 용량은 용량 인덱스에서 읽으며, 재계산 중이면 size_computing=True 로 응답합니다.
+    limit을 주면 파일을 정렬 순서대로 limit개씩 나누어 주고 다음 페이지용 next_cursor를 줍니다.
+    stream=1 이면 application/x-ndjson 으로 항목을 한 줄씩 보내고, 마지막 줄은 {"type": "end", ...} 입니다.
+    ETag는 만든 목록 내용으로 정하며, 같으면 본문 없이 304를 돌려줍니다.
+    """
     logger.info("디렉토리 정보 요청: %s, subpath: %s", name, subpath)
+    exts = ext.split(",") if ext else None
     try:
         # config에서 프로그램 정보 가져오기
         program_config = config.get_program(name)
@@ -70,15 +135,29 @@ def get_dirs(name: str, subpath: str = "", request: Request = None):
         # 경로 존재 여부 확인
         if not os.path.exists(path):
             raise HTTPException(status_code=404, detail=f"경로를 찾을 수 없습니다: {path}")
-        
+
+        if stream:
+            entries = iter_directory_entries(path, include_hidden=True, compute_size=True, exts=exts, pattern=glob)
+            return StreamingResponse(_ndjson_lines(entries), media_type="application/x-ndjson")
+
         # 디렉토리 정보 가져오기
         dir_info = get_directory_info(
             path, 
             recursive=False, 
             max_depth=3, 
             include_hidden=True, 
-            compute_size=True
+            compute_size=True,
+            sort=sort,
+            order=order,
+            exts=exts,
+            pattern=glob,
+            limit=limit,
+            cursor=cursor,
         )
+        # 검증자는 목록을 만든 같은 scan 결과로 만든다 (304여도 직렬화/전송만 아끼고 디렉토리를 두 번 훑지 않음)
+        etag = make_etag("dir", listing_signature(dir_info))
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
 
     except HTTPException:
         # HTTPException은 그대로 re-raise
@@ -86,38 +165,194 @@ def get_dirs(name: str, subpath: str = "", request: Request = None):
     except PermissionError as e:
         logger.warning("권한 오류: %s", e)
         raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception("디렉토리 정보 조회 실패: %s", e)
         raise HTTPException(status_code=500, detail="디렉토리 정보를 가져오는 데 실패했습니다.")
 
+    set_etag(response, etag)
     return dir_info  # OK: 200 + JSON (디렉토리 정보 직렬화)
 
-   
+def _ndjson_lines(entries):
+    """
+    항목을 NDJSON 줄로 바꾸어 내보낸다. 첫 화면이 빨리 뜨도록 처음에는 작게,
+    이후에는 크게 묶어서 보낸다. (한 줄씩 보내면 스레드 전환 비용이 항목 수만큼 든다)
+    """
+    batch, lines = 100, []
+    folders = files = 0
+    try:
+        for node in entries:
+            if node["is_dir"]:
+                folders += 1
+            else:
+                files += 1
+            lines.append(json.dumps(node, ensure_ascii=False))
+            if len(lines) >= batch:
+                yield "\n".join(lines) + "\n"
+                lines, batch = [], min(batch * 4, 5000)
+    except OSError as e:
+        lines.append(json.dumps({"type": "error", "detail": str(e)}, ensure_ascii=False))
+    else:
+        lines.append(json.dumps({"type": "end", "folders": folders, "files": files}))
+    yield "\n".join(lines) + "\n"
+
+def _program_file(program_name: str, file_path: str) -> str:
+    """
+    program_name 의 base_dir 기준 file_path 전체 경로 (허용 루트 밖이면 PermissionError).
+    program_name 이 batmon 이면 Batmon 로그 폴더(LOG_DIR) 안의 파일만 허용한다.
+    """
+    if program_name == "batmon":
+        log_dir = Path(config.LOG_DIR).resolve()
+        full_path = (log_dir / file_path).resolve()
+        if full_path != log_dir and log_dir not in full_path.parents:
+            raise PermissionError(f"Access denied outside log dir: {full_path}")
+        return str(full_path)
+
+    program_config = config.get_program(program_name)
+    if not program_config:
+        raise HTTPException(status_code=404, detail=f"프로그램 '{program_name}'을 찾을 수 없습니다.")
+    base_dir = program_config.get('base_dir', '')
+    if not base_dir:
+        raise HTTPException(status_code=400, detail=f"프로그램 '{program_name}'의 base_dir이 설정되지 않았습니다.")
+    return str(normalize_and_guard(os.path.join(base_dir, file_path)))
+
+@router.get("/text/{program_name}", response_model=TextWindow, include_in_schema=True)
+def text_window(program_name: str, file_path: str,
+                count: int = Query(200, ge=1, le=MAX_WINDOW_LINES, description="읽을 줄 수"),
+                start: Optional[int] = Query(None, ge=1, description="이 줄(1부터)부터 읽기"),
+                tail: bool = Query(False, description="마지막 count 줄"),
+                before: Optional[int] = Query(None, ge=0, description="이전 응답의 start_offset: 그 앞 count 줄"),
+                after: Optional[int] = Query(None, ge=0, description="이전 응답의 end_offset: 그 뒤 count 줄")):
+    """
+    텍스트 파일의 줄 구간을 반환합니다. 파일 전체를 읽지 않으므로 수 GB 로그도 바로 열립니다.
+    줄 번호 이동(start)은 희소 줄 색인을 쓰며, 색인이 없으면 만든 뒤 응답합니다.
+    tail/before/after 는 색인 없이 읽고, 색인은 백그라운드에서 만듭니다. (그동안 total_lines/first_line 은 null)
+    """
+    logger.info("텍스트 구간 요청: program=%s, path=%s, start=%s, tail=%s", program_name, file_path, start, tail)
+    try:
+        full_path = _program_file(program_name, file_path)
+        if not os.path.isfile(full_path):
+            raise HTTPException(status_code=404, detail=f"파일을 찾을 수 없습니다: {file_path}")
+        return read_window(full_path, count=count, start_line=start, tail=tail, before=before, after=after)
+    except HTTPException:
+        raise
+    except PermissionError as e:
+        logger.warning("권한 오류: %s", e)
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
+    except Exception as e:
+        logger.exception("텍스트 구간 읽기 실패: %s", e)
+        raise HTTPException(status_code=500, detail=f"파일을 읽는 데 실패했습니다: {str(e)}")
+
+@router.get("/excel/{program_name}", response_model=ExcelPage, include_in_schema=True)
+def excel_page(program_name: str, file_path: str,
+               sheet: Optional[str] = Query(None, description="시트 이름 (없으면 첫 시트)"),
+               offset: int = Query(0, ge=0, description="정렬/필터 결과에서 시작 위치 (0부터)"),
+               limit: int = Query(100, ge=1, le=EXCEL_MAX_PAGE_ROWS, description="읽을 행 수"),
+               sort: Optional[int] = Query(None, ge=0, description="정렬할 열 번호 (0부터)"),
+               desc: bool = Query(False, description="내림차순"),
+               q: str = Query("", description="포함 문자열 필터 (대소문자 무시)"),
+               column: Optional[int] = Query(None, ge=0, description="필터할 열 번호 (없으면 모든 열)")):
+    """
+    엑셀 파일의 행 구간을 반환합니다. 통합문서는 (경로, 수정시각)마다 한 번만 읽어 캐시하고,
+    정렬/필터는 서버에서 적용합니다. (모든 시트 지원)
+    """
+    logger.info("엑셀 구간 요청: program=%s, path=%s, sheet=%s, offset=%s, sort=%s, q=%s", program_name, file_path, sheet, offset, sort, q)
+    try:
+        full_path = _program_file(program_name, file_path)
+        if not os.path.isfile(full_path):
+            raise HTTPException(status_code=404, detail=f"파일을 찾을 수 없습니다: {file_path}")
+        return read_excel_page(full_path, sheet=sheet, offset=offset, limit=limit, sort=sort, desc=desc, query=q, column=column)
+    except HTTPException:
+        raise
+    except PermissionError as e:
+        logger.warning("권한 오류: %s", e)
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        logger.error(f"엑셀 라이브러리 ImportError: {e}")
+        raise HTTPException(status_code=500, detail="Excel 파일을 읽기 위한 라이브러리(pandas/openpyxl/xlrd)가 설치되지 않았습니다.")
+    except Exception as e:
+        logger.exception("엑셀 구간 읽기 실패: %s", e)
+        raise HTTPException(status_code=500, detail=f"Excel 파일 읽기 실패: {str(e)}")
+
+@router.get("/tail/{program_name}", include_in_schema=True)
+async def tail(program_name: str, file_path: str, request: Request,
+               lines: int = Query(100, ge=0, le=MAX_WINDOW_LINES, description="처음 접속 시 먼저 보낼 마지막 줄 수"),
+               offset: Optional[int] = Query(None, ge=0, description="이 위치(이전 응답의 end_offset 등)부터 이어서 받기"),
+               level: Optional[str] = Query(None, description="이 레벨 이상만 (D/I/W/E 또는 DEBUG/INFO/WARNING/ERROR)"),
+               regex: Optional[str] = Query(None, description="정규식에 맞는 줄만"),
+               last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """
+    로그 파일에 추가되는 줄을 Server-Sent Events로 보냅니다.
+    - event: lines (data: 줄 목록 JSON, id: "파일명:offset" → 재접속 시 Last-Event-ID 로 이어받기)
+    - event: rollover (날짜별 로그의 날짜가 바뀌어 새 파일로 넘어감), event: truncated (파일이 잘리거나 교체됨)
+    - 같은 파일을 보는 클라이언트들은 파일 감시자 하나를 공유하고, 레벨/정규식 필터는 서버에서 적용합니다.
+    """
+    logger.info("로그 tail 요청: program=%s, path=%s, level=%s, regex=%s", program_name, file_path, level, regex)
+    try:
+        full_path = _program_file(program_name, file_path)
+        tail_filter = TailFilter.create(level, regex)
+    except PermissionError as e:
+        logger.warning("권한 오류: %s", e)
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if os.path.isdir(full_path):
+        raise HTTPException(status_code=400, detail="디렉토리는 tail 할 수 없습니다.")
+
+    sub, position = await log_tailer.subscribe(full_path, tail_filter, offset=offset, resume_id=last_event_id)
+    try:
+        # 먼저 보낼 줄은 파일을 읽으므로 스레드풀에서
+        backlog = await run_in_threadpool(log_tailer.backlog, position, tail_filter, lines)
+    except Exception:
+        log_tailer.unsubscribe(full_path, sub)
+        raise
+
+    def fmt(event) -> str:
+        head = f"id: {event.id}\n" if event.id else ""
+        return f"{head}event: {event.event}\ndata: {event.data}\n\n"
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            for event in backlog:
+                yield fmt(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=config.SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is None:  # 서버 종료 또는 너무 밀려서 끊김
+                    break
+                if tail_filter.active:
+                    event = await run_in_threadpool(log_tailer.filtered, sub, event)
+                    if event is None:
+                        continue
+                yield fmt(event)
+        finally:
+            log_tailer.unsubscribe(full_path, sub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/download/{program_name}", include_in_schema=True)
 def file_download(program_name: str, file_path: str, request: Request):
-    """ 파일을 다운로드합니다. """
+    """
+    파일을 다운로드합니다.
+    Range 요청(이어받기, 여러 구간)과 ETag/Last-Modified 조건부 요청(304)을 지원합니다.
+    """
     logger.info("파일 다운로드 요청: program=%s, path=%s", program_name, file_path)
     
     try:
+        full_path = _program_file(program_name, file_path)
         if program_name == "batmon":
-            file_name = "batmon.log"
-            return FileResponse(
-                path=file_path,
-                filename=file_name,
-                media_type='text/plain'
-            )
-        # 프로그램 설정 가져오기
-        program_config = config.get_program(program_name)
-        if not program_config:
-            raise HTTPException(status_code=404, detail=f"프로그램 '{program_name}'을 찾을 수 없습니다.")
-        
-        base_dir = program_config.get('base_dir', '')
-        if not base_dir:
-            raise HTTPException(status_code=400, detail=f"프로그램 '{program_name}'의 base_dir이 설정되지 않았습니다.")
-        
-        # 전체 파일 경로 구성
-        full_path = os.path.join(base_dir, file_path)
+            return file_response(request, full_path, filename="batmon.log", media_type='text/plain')
         
         # 파일 존재 여부 확인
         if not os.path.exists(full_path):
@@ -131,35 +366,29 @@ def file_download(program_name: str, file_path: str, request: Request):
         if mime_type is None:
             mime_type = 'application/octet-stream'
         
-        return FileResponse(
-            path=full_path,
-            filename=Path(full_path).name,
-            media_type=mime_type
-        )
+        return file_response(request, full_path, filename=Path(full_path).name, media_type=mime_type)
     
     except HTTPException:
         raise
+    except PermissionError as e:
+        logger.warning("권한 오류: %s", e)
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"파일을 찾을 수 없습니다: {file_path}")
     except Exception as e:
         logger.exception("파일 다운로드 실패: %s", e)
         raise HTTPException(status_code=500, detail=f"파일 다운로드에 실패했습니다: {str(e)}")
 
 @router.get("/file/stream/{program_name}", include_in_schema=True)
 def stream_file(program_name: str, file_path: str, request: Request):
-    """ 파일을 스트림으로 서빙합니다 (이미지, PDF 등 브라우저에서 직접 표시용). """
+    """
+    파일을 스트림으로 서빙합니다 (이미지, PDF 등 브라우저에서 직접 표시용).
+    PDF 뷰어/동영상의 Range 요청에는 요청한 구간만 보내고(206), 바뀌지 않은 파일은 304로 응답합니다.
+    """
     logger.info("파일 스트림 요청: program=%s, file_path=%s", program_name, file_path)
     
     try:
-        # 프로그램 설정 가져오기
-        program_config = config.get_program(program_name)
-        if not program_config:
-            raise HTTPException(status_code=404, detail=f"프로그램 '{program_name}'을 찾을 수 없습니다.")
-        
-        base_dir = program_config.get('base_dir', '')
-        if not base_dir:
-            raise HTTPException(status_code=400, detail=f"프로그램 '{program_name}'의 base_dir이 설정되지 않았습니다.")
-        
-        # 전체 파일 경로 구성
-        full_path = os.path.join(base_dir, file_path)
+        full_path = _program_file(program_name, file_path)
         
         # 파일 존재 여부 확인
         if not os.path.exists(full_path):
@@ -173,22 +402,16 @@ def stream_file(program_name: str, file_path: str, request: Request):
         if mime_type is None:
             mime_type = 'application/octet-stream'
         
-        # 파일 스트리밍
-        def iterfile():
-            with open(full_path, "rb") as file_like:
-                yield from file_like
-        
-        return StreamingResponse(
-            iterfile(),
-            media_type=mime_type,
-            headers={
-                "Content-Disposition": "inline",  # 브라우저에서 직접 표시
-                "Cache-Control": "public, max-age=3600"  # 1시간 캐시
-            }
-        )
+        # 브라우저에서 직접 표시 (Content-Disposition: inline)
+        return file_response(request, full_path, filename=Path(full_path).name, media_type=mime_type, disposition="inline")
     
     except HTTPException:
         raise
+    except PermissionError as e:
+        logger.warning("권한 오류: %s", e)
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"파일을 찾을 수 없습니다: {file_path}")
     except Exception as e:
         logger.exception("파일 스트리밍 실패: %s", e)
         raise HTTPException(status_code=500, detail=f"파일 스트리밍에 실패했습니다: {str(e)}")
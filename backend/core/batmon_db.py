@@ -1,3 +1,283 @@
+# batmon_db.py
+"""
+모듈 설명:
+    - batmon 이력 저장소 (SQLite, WAL 모드, config.DB_PATH).
+    - 쓰기는 전용 writer 스레드 하나가 큐에 쌓인 작업을 모아서 한 트랜잭션으로 처리한다.
+      요청/점검 스레드는 큐에 넣기만 하므로 디스크를 기다리지 않는다.
+    - 읽기는 호출마다 별도 연결을 열어 수행한다. (WAL이므로 writer와 서로 막지 않음)
+    - 스키마는 PRAGMA user_version 기준으로 startup 시 MIGRATIONS를 차례로 적용한다.
+주요 기능:
+    - create_batmon_db: startup 이벤트에서 호출 (마이그레이션 + writer 시작)
+    - batmon_db.record_checks: 점검 결과 기록 (비동기)
+    - batmon_db.check_history: 프로그램별 점검 이력 조회
+    - batmon_db.record_job / job_history: 프로그램 실행 작업 이력 기록/조회
+"""
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.core.config import config
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# user_version 1부터 순서대로 적용되는 스키마 변경. 이미 배포된 항목은 수정하지 말고 뒤에 추가할 것.
+MIGRATIONS: List[str] = [
+    # 1: 점검 이력
+    """
+    CREATE TABLE check_history (
+        id              INTEGER PRIMARY KEY,
+        program         TEXT    NOT NULL,
+        checked_at      REAL    NOT NULL,   -- epoch 초
+        status          TEXT    NOT NULL,
+        message         TEXT,
+        last_log        TEXT,
+        last_log_time   TEXT,
+        log_error_count INTEGER,
+        last_error_line INTEGER
+    );
+    CREATE INDEX ix_check_history_program_time ON check_history (program, checked_at);
+    CREATE INDEX ix_check_history_time ON check_history (checked_at);
+    """,
+    # 2: 시스템 지표 집계 (step 초 단위 구간별 합계/최대값, 평균 = 합계 / n)
+    """
+    CREATE TABLE metrics_rollup (
+        step        INTEGER NOT NULL,   -- 60 | 300 | 3600
+        bucket      INTEGER NOT NULL,   -- 구간 시작 epoch 초
+        n           INTEGER NOT NULL,
+        cpu_sum     REAL NOT NULL, cpu_max     REAL NOT NULL,
+        mem_sum     REAL NOT NULL, mem_max     REAL NOT NULL,
+        disk_sum    REAL NOT NULL, disk_max    REAL NOT NULL,
+        read_sum    REAL NOT NULL, read_max    REAL NOT NULL,
+        write_sum   REAL NOT NULL, write_max   REAL NOT NULL,
+        PRIMARY KEY (step, bucket)
+    ) WITHOUT ROWID;
+    """,
+    # 3: 폴더 용량 인덱스 (dir_size_index.py)
+    """
+    CREATE TABLE dir_size_index (
+        path        TEXT    PRIMARY KEY,
+        mtime_ns    INTEGER NOT NULL,
+        files_size  INTEGER NOT NULL,
+        subdirs     TEXT    NOT NULL,   -- JSON 배열
+        total       INTEGER NOT NULL,
+        scanned_at  REAL    NOT NULL,
+        checked_at  REAL    NOT NULL
+    ) WITHOUT ROWID;
+    """,
+    # 4: 폴더 용량 부분 결과 표시 (제한 시간 초과/중단)
+    """
+    ALTER TABLE dir_size_index ADD COLUMN partial INTEGER NOT NULL DEFAULT 0;
+    """,
+    # 5: 프로그램 실행 작업 이력 (job_manager.py, 상태가 바뀔 때마다 같은 id 로 덮어씀)
+    """
+    CREATE TABLE job_history (
+        id              TEXT    PRIMARY KEY,
+        program         TEXT    NOT NULL,
+        command         TEXT    NOT NULL,
+        status          TEXT    NOT NULL,   -- QUEUED | RUNNING | SUCCEEDED | FAILED | CANCELLED | LOST
+        requested_at    REAL    NOT NULL,   -- epoch 초
+        started_at      REAL,
+        ended_at        REAL,
+        exit_code       INTEGER,
+        pid             INTEGER,
+        message         TEXT,
+        output_tail     TEXT                -- 마지막 출력 몇 줄
+    ) WITHOUT ROWID;
+    CREATE INDEX ix_job_history_program_time ON job_history (program, requested_at);
+    CREATE INDEX ix_job_history_time ON job_history (requested_at);
+    """,
+]
+
+# writer 큐 항목: (sql, 파라미터 목록) → executemany
+WriteJob = Tuple[str, Sequence[Sequence[Any]]]
+
+
+class BatmonDB:
+    # 큐가 넘치면 기록을 버리고 dropped를 센다 (요청 경로를 막지 않기 위해)
+    QUEUE_SIZE = 10000
+    # 한 트랜잭션에 모으는 최대 작업 수
+    BATCH_SIZE = 500
+    # 오래된 이력 정리 주기(초)
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self):
+        self.db_path: Optional[str] = None
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[WriteJob]]" = queue.Queue(self.QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+
+    # --- 수명주기 ------------------------------------------------------------
+    def open(self, db_path: str):
+        """마이그레이션을 적용하고 writer 스레드를 시작한다."""
+        if self._thread and self._thread.is_alive():
+            return
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._migrate(conn)
+        finally:
+            conn.close()
+        self._thread = threading.Thread(target=self._writer, name="batmon-db-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        """남은 작업을 모두 쓴 뒤 writer 스레드를 종료한다."""
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, script in enumerate(MIGRATIONS[current:], start=current + 1):
+            logger.info(f"DB 스키마 마이그레이션: {version - 1} → {version}")
+            conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;")
+
+    # --- 쓰기 ----------------------------------------------------------------
+    def submit(self, sql: str, rows: Sequence[Sequence[Any]]):
+        """writer 스레드에 쓰기 작업을 넘긴다. (기다리지 않음)"""
+        if not self._thread or not rows:
+            return
+        try:
+            self._queue.put_nowait((sql, rows))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"DB 쓰기 큐가 가득 차서 기록을 버렸습니다 (누적 {self.dropped}건)")
+
+    def record_checks(self, statuses: Sequence[Any], checked_at: Optional[float] = None):
+        """ServiceStatus 목록을 점검 이력으로 기록"""
+        checked_at = checked_at or time.time()
+        self.submit(
+            "INSERT INTO check_history (program, checked_at, status, message, last_log, last_log_time,"
+            " log_error_count, last_error_line) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (s.name, checked_at, s.status, s.message, s.last_log, s.last_log_time,
+                 s.log_error_count, s.last_error_line)
+                for s in statuses
+            ],
+        )
+
+    def record_job(self, row: Sequence[Any]):
+        """작업 상태 기록 (id 가 같으면 덮어씀). row 는 job_history 열 순서"""
+        self.submit(
+            "INSERT OR REPLACE INTO job_history (id, program, command, status, requested_at, started_at, ended_at,"
+            " exit_code, pid, message, output_tail) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [row],
+        )
+
+    def mark_lost_jobs(self):
+        """이전 실행에서 끝나지 않은 채 남은 작업을 LOST 로 (startup, 이번 실행의 작업이 생기기 전)"""
+        self.submit(
+            "UPDATE job_history SET status = 'LOST', message = 'batmon 재시작으로 결과를 알 수 없습니다.'"
+            " WHERE status IN ('QUEUED', 'RUNNING')",
+            [()],
+        )
+
+    def _writer(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        next_prune = 0.0
+        try:
+            while True:
+                job = self._queue.get()
+                stop = job is None
+                batch: List[WriteJob] = [] if stop else [job]
+                # 이미 쌓여 있는 작업을 한 트랜잭션으로 모은다
+                while not stop and len(batch) < self.BATCH_SIZE:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stop = True
+                    else:
+                        batch.append(job)
+                if batch:
+                    self._write(conn, batch)
+                if time.monotonic() >= next_prune:
+                    self._prune(conn)
+                    next_prune = time.monotonic() + self.PRUNE_INTERVAL
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, batch: List[WriteJob]):
+        try:
+            with conn:
+                for sql, rows in batch:
+                    conn.executemany(sql, rows)
+        except sqlite3.Error as e:
+            logger.exception(f"DB 쓰기 실패 ({len(batch)}건): {e}")
+
+    @staticmethod
+    def _prune(conn: sqlite3.Connection):
+        """HISTORY_RETENTION_DAYS 보다 오래된 이력(점검, 작업) 삭제"""
+        cutoff = time.time() - config.HISTORY_RETENTION_DAYS * 86400
+        try:
+            with conn:
+                deleted = conn.execute("DELETE FROM check_history WHERE checked_at < ?", (cutoff,)).rowcount
+                deleted += conn.execute("DELETE FROM job_history WHERE requested_at < ?", (cutoff,)).rowcount
+            if deleted:
+                logger.info(f"오래된 점검 이력 {deleted}건 삭제")
+        except sqlite3.Error as e:
+            logger.exception(f"점검 이력 정리 실패: {e}")
+
+    # --- 읽기 ----------------------------------------------------------------
+    def connect(self) -> sqlite3.Connection:
+        """조회용 연결 (호출한 쪽에서 close)"""
+        conn = sqlite3.connect(self.db_path or config.DB_PATH, timeout=5)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def check_history(self, program: str, since: float, until: float, limit: int = 1000) -> List[Dict[str, Any]]:
+        """[since, until) 구간의 점검 이력 (가장 최근 limit건, 시간 오름차순)"""
+        conn = self.connect()
+        try:
+            rows = conn.execute(
+                "SELECT program, checked_at, status, message, last_log, last_log_time, log_error_count, last_error_line"
+                " FROM check_history WHERE program = ? AND checked_at >= ? AND checked_at < ?"
+                " ORDER BY checked_at DESC LIMIT ?",
+                (program, since, until, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in reversed(rows)]
+
+    def job_history(self, program: Optional[str] = None, limit: int = 100, job_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """작업 이력 (최근 요청 순, program/job_id 가 없으면 전체)"""
+        conn = self.connect()
+        try:
+            conditions, params = [], []
+            if program:
+                conditions.append("program = ?")
+                params.append(program)
+            if job_id:
+                conditions.append("id = ?")
+                params.append(job_id)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            rows = conn.execute(
+                "SELECT id, program, command, status, requested_at, started_at, ended_at, exit_code, pid, message, output_tail"
+                f" FROM job_history {where} ORDER BY requested_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+
+# 단일톤
+batmon_db = BatmonDB()
+
 
 def create_batmon_db(db_path: str):
-    pass
\ No newline at end of file
+    batmon_db.open(db_path)
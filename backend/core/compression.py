@@ -0,0 +1,311 @@
+# compression.py
+"""
+모듈 설명:
+    - 응답 압축 ASGI 미들웨어. Accept-Encoding 에 따라 br(brotli 패키지가 있을 때) 또는 gzip 으로 압축한다.
+    - 텍스트 계열(HTML, JSON, NDJSON, JS/CSS, 로그 등)만 압축하고, 이미지/PDF/엑셀처럼 이미 압축된 형식은 그대로 보낸다.
+      SSE(text/event-stream), 206(Range), 304 응답과 COMPRESS_MIN_SIZE 보다 작은 응답도 그대로 보낸다.
+    - 여러 번에 나눠 보내는 응답(NDJSON 목록, 파일 스트림)은 조각마다 압축 후 flush 하므로 계속 스트리밍된다.
+    - 압축하면 ETag 를 weak(W/"...")로 바꾸고, 원본 기준인 Accept-Ranges 는 뺀다.
+      내용 버전은 같으므로 If-None-Match → 304 는 그대로 동작한다.
+    - _THREAD_MIN 이상인 조각은 스레드에서 압축한다. (큰 목록/텍스트가 이벤트 루프를 막지 않도록)
+    - 더 이상 바뀌지 않는 파일(Last-Modified 가 COMPRESS_CACHE_AGE 초보다 오래된 지난 로그/결과 파일)은
+      압축 결과를 (요청 경로+쿼리, ETag, 압축 방식)으로 캐시해서 다시 압축하지 않는다. (COMPRESS_CACHE_MB, LRU)
+      캐시 본문을 보낸 뒤에는 앱의 원 본문을 더 읽지 않고 멈춘다.
+주요 기능:
+    - CompressionMiddleware: app.add_middleware 로 등록
+    - choose_encoding: Accept-Encoding 헤더 → "br" / "gzip" / None
+"""
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core.config import config
+
+try:
+    import brotli  # 선택 패키지 (없으면 gzip 만)
+except ImportError:
+    brotli = None
+
+# 압축하는 content-type (text/* 는 SSE 를 빼고 모두)
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+_FILE_CHUNK = 1024 * 1024
+_THREAD_MIN = 64 * 1024     # 이보다 큰 조각은 anyio 스레드에서 압축
+_PATHSEND = "http.response.pathsend"
+_ZEROCOPY = "http.response.zerocopysend"
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding(q 값, * 포함) 중 지원하는 압축 방식. br 을 우선한다."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    for coding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if weights.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+class _Compressor:
+    """압축 방식별 스트리밍 압축기 (compress → flush(조각 끝) / finish(마지막))"""
+
+    def __init__(self, coding: str):
+        if coding == "br":
+            self._br = brotli.Compressor(quality=config.COMPRESS_BR_QUALITY)
+            self._gz = None
+        else:
+            self._br = None
+            self._gz = zlib.compressobj(config.COMPRESS_LEVEL, zlib.DEFLATED, 31)  # 31: gzip 헤더
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        if self._br is not None:
+            out = self._br.process(data) if data else b""
+            return out + (self._br.finish() if last else self._br.flush())
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class CompressCache:
+    """(요청 경로+쿼리, ETag, 압축 방식) → 압축된 본문. 전체 크기(bytes) 기준 LRU"""
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._items: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def entry_limit(self) -> int:
+        # 한 항목이 캐시를 통째로 밀어내지 않도록
+        return self._max_bytes // 4
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple[str, str, str], body: bytes):
+        if len(body) > self.entry_limit:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = body
+            self._bytes += len(body)
+            while self._bytes > self._max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+# 단일톤
+compress_cache = CompressCache(config.COMPRESS_CACHE_MB * 1024 * 1024)
+
+
+def _is_compressible(headers: Headers) -> bool:
+    media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type == "text/event-stream":
+        return False
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+def _cache_key(scope: Scope, headers: Headers, coding: str) -> Optional[Tuple[str, str, str]]:
+    """
+    바뀌지 않는 파일(Last-Modified 가 COMPRESS_CACHE_AGE 초 이전)이면 캐시 키.
+    ETag 가 같아도 다른 URL(다른 파일)의 본문을 돌려주지 않도록 요청 경로+쿼리를 함께 넣는다.
+    """
+    etag, last_modified = headers.get("etag"), headers.get("last-modified")
+    if not etag or not last_modified or etag.startswith("W/"):
+        return None
+    try:
+        modified = parsedate_to_datetime(last_modified).timestamp()
+    except (TypeError, ValueError):
+        return None
+    if time.time() - modified < config.COMPRESS_CACHE_AGE:
+        return None
+    query = scope.get("query_string", b"").decode("latin-1")
+    return f"{scope.get('path', '')}?{query}", etag, coding
+
+
+class _ResponseDone(Exception):
+    """캐시 본문을 이미 보냈으니 앱의 응답 생성을 멈춘다 (_CompressResponder 안에서만 쓰고 잡는다)"""
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressResponder(self.app, coding, send, scope)(scope, receive)
+
+
+class _CompressResponder:
+    """응답 하나의 압축 상태. mode: None(본문 대기) → pass(그대로) / compress / cached(캐시 본문 보냄, 원 본문 버림)"""
+
+    def __init__(self, app: ASGIApp, coding: str, send: Send, scope: Scope):
+        self.app = app
+        self.scope = scope
+        self.coding = coding
+        self.send = send
+        self.mode: Optional[str] = None
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.cache_key: Optional[Tuple[str, str, str]] = None
+        self.cache_parts: Optional[list] = None
+        self.cache_size = 0
+
+    async def __call__(self, scope: Scope, receive: Receive) -> None:
+        try:
+            await self.app(scope, receive, self.send_wrapper)
+        except _ResponseDone:
+            pass
+
+    async def send_wrapper(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            await self.on_start(message)
+        elif self.mode == "pass":
+            await self.send(message)
+        elif self.mode == "cached":
+            # 캐시 본문은 보냈음. 원 본문(파일 읽기/스트림)을 더 만들지 않도록 앱을 멈춘다
+            raise _ResponseDone()
+        elif kind == "http.response.body":
+            await self.on_body(message.get("body", b""), message.get("more_body", False))
+        elif kind in (_PATHSEND, _ZEROCOPY):
+            await self.on_file(message)
+        else:
+            await self.send(message)
+
+    async def on_start(self, message: Message):
+        headers = MutableHeaders(scope=message)
+        status = message["status"]
+        length = headers.get("content-length")
+        if (
+            not 200 <= status < 300 or status in (204, 206)
+            or "content-encoding" in headers
+            or not _is_compressible(headers)
+        ):
+            self.mode = "pass"
+            await self.send(message)
+            return
+        headers.add_vary_header("Accept-Encoding")
+        if length is not None and int(length) < config.COMPRESS_MIN_SIZE:
+            self.mode = "pass"
+            await self.send(message)
+            return
+
+        self.cache_key = _cache_key(self.scope, headers, self.coding)
+        if self.cache_key is not None:
+            body = compress_cache.get(self.cache_key)
+            if body is not None:
+                self.mode = "cached"
+                self.set_encoding(headers, len(body))
+                await self.send(message)
+                await self.send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+            self.cache_parts = []
+        self.start = message
+
+    def set_encoding(self, headers: MutableHeaders, length: Optional[int]):
+        headers["Content-Encoding"] = self.coding
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        # Range 는 압축 전 원본 기준이므로 압축한 응답에서는 광고하지 않는다
+        if "accept-ranges" in headers:
+            del headers["Accept-Ranges"]
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+
+    async def compress(self, body: bytes, last: bool) -> bytes:
+        """작은 조각은 바로, 큰 조각은 스레드에서 압축"""
+        if len(body) < _THREAD_MIN:
+            return self.compressor.compress(body, last)
+        return await anyio.to_thread.run_sync(self.compressor.compress, body, last)
+
+    async def on_body(self, body: bytes, more_body: bool):
+        if self.mode is None:
+            if not more_body and len(body) < config.COMPRESS_MIN_SIZE:
+                self.mode = "pass"
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+            self.mode = "compress"
+            self.compressor = _Compressor(self.coding)
+            headers = MutableHeaders(scope=self.start)
+            if not more_body:
+                # 본문이 한 번에 왔으면 압축 크기를 Content-Length 로
+                out = await self.compress(body, last=True)
+                self.set_encoding(headers, len(out))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": out, "more_body": False})
+                self.remember(out, last=True)
+                return
+            self.set_encoding(headers, None)
+            await self.send(self.start)
+        out = await self.compress(body, last=not more_body)
+        await self.send({"type": "http.response.body", "body": out, "more_body": more_body})
+        self.remember(out, last=not more_body)
+
+    async def on_file(self, message: Message):
+        """pathsend/zerocopysend(서버 zero-copy 전송)도 압축해야 하면 파일을 직접 읽어 압축한다"""
+        if message["type"] == _PATHSEND:
+            path, offset, count, more_body = message["path"], 0, None, False
+        else:
+            path = message["file"].name
+            offset, count, more_body = message.get("offset", 0) or 0, message.get("count"), message.get("more_body", False)
+        with open(path, "rb") as file:
+            await anyio.to_thread.run_sync(file.seek, offset)
+            remaining = count
+            while True:
+                size = _FILE_CHUNK if remaining is None else min(_FILE_CHUNK, remaining)
+                chunk = await anyio.to_thread.run_sync(file.read, size) if size else b""
+                if remaining is not None:
+                    remaining -= len(chunk)
+                done = not chunk or remaining == 0
+                await self.on_body(chunk, more_body=more_body or not done)
+                if done:
+                    break
+
+    def remember(self, out: bytes, last: bool):
+        if self.cache_parts is None:
+            return
+        self.cache_parts.append(out)
+        self.cache_size += len(out)
+        if self.cache_size > compress_cache.entry_limit:
+            self.cache_parts = None
+        elif last:
+            compress_cache.put(self.cache_key, b"".join(self.cache_parts))
+            self.cache_parts = None
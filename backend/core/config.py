@@ -1,12 +1,29 @@
 # config.py
 import os
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import yaml
 from dotenv import load_dotenv
 
 
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    BATMON.yml 한 버전의 불변 스냅샷.
+    다시 읽을 때는 새 스냅샷을 만들어 통째로 교체하므로, 읽는 쪽은 락 없이 그대로 순회해도 된다.
+    (programs 안의 dict는 읽기 전용으로 취급할 것)
+    """
+    version: int = 0                                        # BATMON.yml을 다시 읽을 때마다 1씩 증가
+    mtime: float = 0.0
+    programs: Tuple[Dict[str, Any], ...] = ()               # BATMON.yml 순서
+    index: Mapping[str, Dict[str, Any]] = field(default_factory=dict)  # name → program
+    agents: Tuple[Dict[str, Any], ...] = ()                 # 허브 모드: 조회할 다른 batmon (BATMON.yml agents)
+
+
 class Config:
     def __init__(self):
         # 1) 기존 .env 기반 설정 (유지)
@@ -18,38 +35,167 @@ class Config:
         # 2) 경로/로그 (유지)
         self.BASE_DIR = os.getenv('BASE_DIR', r'c:\batmon')
         self.DB_PATH = f'{self.BASE_DIR}/db/batmon.db'
+        self.LOG_CURSOR_PATH = f'{self.BASE_DIR}/db/log_cursor.json'  # 로그 점검 위치(커서) 저장 파일
+        self.HISTORY_RETENTION_DAYS = float(os.getenv('HISTORY_RETENTION_DAYS', 90))  # 점검 이력 보관 기간(일)
         os.makedirs(Path(self.DB_PATH).parent, exist_ok=True)
 
         self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
         self.LOG_DIR = os.getenv('LOG_DIR', f'{self.BASE_DIR}/logs')
         self.LOG_FILE = f'{self.LOG_DIR}/batmon.log'
+        # 로그는 큐에 넣고 쓰기 스레드 하나가 파일에 쓴다. 큐가 가득 차면 버리고 개수를 센다 (/api/v1/system/logging)
+        self.LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
         os.makedirs(Path(self.LOG_FILE).parent, exist_ok=True)
 
-        # 3) YAML 경로 및 로드
+        # 3) 서비스 점검(/api/v1/batmon/check)
+        #    - CHECK_MAX_WORKERS: 동시에 점검할 수 있는 최대 프로그램 수
+        #    - CHECK_TIMEOUT: 프로그램별 check_timeout이 없을 때 적용되는 기본 제한시간(초)
+        self.CHECK_MAX_WORKERS = int(os.getenv('CHECK_MAX_WORKERS', 4))
+        self.CHECK_TIMEOUT = float(os.getenv('CHECK_TIMEOUT', 10))
+        #    - CHECK_INTERVAL: 백그라운드 점검 주기(초), 프로그램별 check_interval로 오버라이드
+        self.CHECK_INTERVAL = float(os.getenv('CHECK_INTERVAL', 30))
+        #    - SSE_HEARTBEAT: /api/v1/batmon/stream 연결 유지용 heartbeat 간격(초)
+        self.SSE_HEARTBEAT = float(os.getenv('SSE_HEARTBEAT', 15))
+
+        #    시스템 지표(/api/v1/system/metrics)
+        #    - METRICS_INTERVAL: CPU/메모리/디스크 수집 주기(초)
+        #    - METRICS_BUFFER: 메모리(ring buffer)에 보관하는 최근 수집 개수 (기본 720 = 5초 x 1시간)
+        self.METRICS_INTERVAL = float(os.getenv('METRICS_INTERVAL', 5))
+        self.METRICS_BUFFER = int(os.getenv('METRICS_BUFFER', 720))
+        #    - STATIC_INFO_TTL: 호스트명/OS/IP/MAC 등 거의 바뀌지 않는 정보를 다시 수집하는 주기(초)
+        self.STATIC_INFO_TTL = float(os.getenv('STATIC_INFO_TTL', 3600))
+
+        #    폴더 용량 인덱스(/api/v1/system/dir)
+        #    - DIR_SIZE_FRESH: 이 시간(초) 안에 검증된 용량은 그대로 응답, 지나면 백그라운드 재계산
+        #    - DIR_SIZE_RESCAN: mtime이 그대로여도 이 시간(초)이 지난 폴더는 파일 용량을 다시 합산 (로그 append 등 반영)
+        self.DIR_SIZE_FRESH = float(os.getenv('DIR_SIZE_FRESH', 60))
+        self.DIR_SIZE_RESCAN = float(os.getenv('DIR_SIZE_RESCAN', 600))
+        #    - DIR_SIZE_WORKERS: 하위 폴더를 동시에 훑는 스레드 수 (네트워크 드라이브 지연을 겹쳐서 숨김)
+        #    - DIR_SIZE_DEADLINE: 재계산 1회 제한 시간(초). 넘으면 그때까지의 부분 결과를 저장하고 다음 조회 때 이어서 계산
+        self.DIR_SIZE_WORKERS = int(os.getenv('DIR_SIZE_WORKERS', 8))
+        self.DIR_SIZE_DEADLINE = float(os.getenv('DIR_SIZE_DEADLINE', 10))
+
+        #    로그 tail(/api/v1/system/tail)
+        #    - TAIL_POLL_INTERVAL: 따라가는 로그 파일들의 크기를 확인하는 주기(초). 파일 수와 관계없이 스레드 하나
+        self.TAIL_POLL_INTERVAL = float(os.getenv('TAIL_POLL_INTERVAL', 0.5))
+        #    - TAIL_REGEX_MAX: 정규식 필터의 최대 길이
+        #    - TAIL_FILTER_LINE_LIMIT: 정규식을 적용하는 줄 앞부분의 최대 글자 수 (그 뒤는 검사하지 않음)
+        self.TAIL_REGEX_MAX = int(os.getenv('TAIL_REGEX_MAX', 200))
+        self.TAIL_FILTER_LINE_LIMIT = int(os.getenv('TAIL_FILTER_LINE_LIMIT', 4096))
+
+        #    응답 압축(gzip, brotli 패키지가 있으면 br)
+        #    - COMPRESS_MIN_SIZE: 이보다 작은 응답(bytes)은 압축하지 않음
+        #    - COMPRESS_LEVEL / COMPRESS_BR_QUALITY: gzip 레벨(1~9) / brotli quality(0~11)
+        self.COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+        self.COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+        self.COMPRESS_BR_QUALITY = int(os.getenv('COMPRESS_BR_QUALITY', 4))
+        #    - COMPRESS_CACHE_MB: 더 이상 바뀌지 않는 파일(Last-Modified 가 COMPRESS_CACHE_AGE 초보다 오래됨)의 압축 결과 캐시 크기(MB)
+        self.COMPRESS_CACHE_MB = int(os.getenv('COMPRESS_CACHE_MB', 64))
+        self.COMPRESS_CACHE_AGE = float(os.getenv('COMPRESS_CACHE_AGE', 3600))
+
+        #    화면 템플릿(jinja2)
+        #    - TEMPLATE_AUTO_RELOAD: 템플릿 파일 변경 확인 (기본: local 프로필에서만). 끄면 시작 시 미리 컴파일한 것만 사용
+        #    - TEMPLATE_CACHE_DIR: 컴파일된 템플릿(bytecode) 저장 폴더. 재시작/PyInstaller 실행 시 다시 컴파일하지 않음
+        self.TEMPLATE_AUTO_RELOAD = os.getenv('TEMPLATE_AUTO_RELOAD', str(self.PROFILE_NAME == 'local')).lower() in ('1', 'true', 'yes')
+        self.TEMPLATE_CACHE_DIR = os.getenv('TEMPLATE_CACHE_DIR', f'{self.BASE_DIR}/cache/jinja')
+
+        #    시작 속도
+        #    - WARMUP_IMPORTS: 서버가 뜬 뒤 백그라운드에서 미리 import 할 무거운 모듈 (쉼표 구분, 비우면 하지 않음)
+        self.WARMUP_IMPORTS = os.getenv('WARMUP_IMPORTS', 'pandas,openpyxl')
+
+        #    프로그램 실행 작업(/api/v1/batmon/jobs)
+        #    - JOB_MAX_CONCURRENT: 동시에 실행하는 최대 작업 수 (넘으면 대기열에서 순서대로)
+        #    - JOB_MAX_PER_PROGRAM: 프로그램별 동시 실행 수, BATMON.yml max_concurrent 로 오버라이드 (넘는 요청은 실행 중인 작업을 돌려줌)
+        #    - JOB_QUEUE_SIZE: 대기열 최대 길이
+        #    - JOB_OUTPUT_LINES: 작업마다 메모리에 보관하는 최근 출력 줄 수
+        #    - JOB_KEEP: 메모리에 보관하는 끝난 작업 수 (그 이전 작업은 DB 이력으로 조회)
+        self.JOB_MAX_CONCURRENT = int(os.getenv('JOB_MAX_CONCURRENT', 2))
+        self.JOB_MAX_PER_PROGRAM = int(os.getenv('JOB_MAX_PER_PROGRAM', 1))
+        self.JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', 20))
+        self.JOB_OUTPUT_LINES = int(os.getenv('JOB_OUTPUT_LINES', 2000))
+        self.JOB_KEEP = int(os.getenv('JOB_KEEP', 50))
+
+        #    허브 모드 (BATMON.yml 의 agents 에 다른 batmon 주소를 적으면 /check 가 모든 에이전트 결과를 합쳐서 응답)
+        #    - HUB_INTERVAL: 에이전트별 조회 주기(초)
+        #    - HUB_TIMEOUT: agents[].timeout 이 없을 때 적용되는 에이전트별 제한시간(초, 연결/읽기 각각)
+        #    - HUB_STALE: 마지막 성공 조회가 이 시간(초)보다 오래되면 stale 로 표시
+        #    - HUB_MAX_WORKERS: 동시에 조회하는 최대 에이전트 수
+        self.HUB_INTERVAL = float(os.getenv('HUB_INTERVAL', 10))
+        self.HUB_TIMEOUT = float(os.getenv('HUB_TIMEOUT', 5))
+        self.HUB_STALE = float(os.getenv('HUB_STALE', 60))
+        self.HUB_MAX_WORKERS = int(os.getenv('HUB_MAX_WORKERS', 16))
+
+        # 4) YAML 경로 및 로드
         #    - 기본은 BASE_DIR/BATMON.yml
         #    - 환경변수 BATMON_YAML로 오버라이드 가능
+        #    - YAML_CHECK_INTERVAL: 변경 감지(stat) 최소 간격(초). 그 사이의 조회는 syscall 없이 스냅샷만 읽음
         self.YAML_PATH = Path(os.getenv('BATMON_YAML', f'{self.BASE_DIR}/BATMON.yml'))
-        self._yaml_mtime: float = 0.0
-        self.programs: List[Dict[str, Any]] = []  # 통합된 결과 보관
+        self.YAML_CHECK_INTERVAL = float(os.getenv('YAML_CHECK_INTERVAL', 2))
+        self._snapshot = ConfigSnapshot()  # 통합된 결과 보관 (교체만 하고 수정하지 않음)
+        self._reload_lock = threading.Lock()
+        self._next_check: float = 0.0      # time.monotonic() 기준 다음 변경 감지 시각
+        self._failed_mtime: float = 0.0    # 읽기에 실패한 BATMON.yml의 mtime
 
         self.reload_yaml(force=True)
 
+    @property
+    def programs(self) -> Tuple[Dict[str, Any], ...]:
+        return self._snapshot.programs
+
+    @property
+    def agents(self) -> Tuple[Dict[str, Any], ...]:
+        return self._snapshot.agents
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
 
     # --- YAML 처리부 ---------------------------------------------------------
     def reload_yaml(self, force: bool = False) -> bool:
-        """BATMON.yml 변경 시 다시 읽어들이고, programs에 반영"""
-        if not self.YAML_PATH.exists():
-            self.programs = []
-            return False
-
-        mtime = self.YAML_PATH.stat().st_mtime
-        if force or mtime > self._yaml_mtime:
-            with self.YAML_PATH.open('r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
-            self.programs = self._validate_and_normalize(data)
-            self._yaml_mtime = mtime
+        """BATMON.yml 변경 시 다시 읽어들이고, 새 스냅샷으로 교체"""
+        with self._reload_lock:
+            self._next_check = time.monotonic() + self.YAML_CHECK_INTERVAL
+            current = self._snapshot
+            if not self.YAML_PATH.exists():
+                if current.programs or current.agents:
+                    self._snapshot = ConfigSnapshot(version=current.version + 1)
+                return False
+
+            mtime = self.YAML_PATH.stat().st_mtime
+            if not (force or (mtime > current.mtime and mtime != self._failed_mtime)):
+                return False
+
+            try:
+                with self.YAML_PATH.open('r', encoding='utf-8') as f:
+                    data = yaml.safe_load(f) or {}
+                programs = tuple(self._validate_and_normalize(data))
+                agents = tuple(self._validate_agents(data))
+            except Exception:
+                self._failed_mtime = mtime  # 같은 내용을 계속 다시 읽지 않도록 기억
+                raise
+            self._snapshot = ConfigSnapshot(
+                version=current.version + 1,
+                mtime=mtime,
+                programs=programs,
+                index={p['name']: p for p in programs},
+                agents=agents,
+            )
             return True
 
+    def snapshot(self) -> ConfigSnapshot:
+        """
+        현재 설정 스냅샷. 변경 감지는 YAML_CHECK_INTERVAL 마다 한 번만 수행하고,
+        그 사이에는 stat 없이 메모리의 스냅샷을 그대로 돌려준다.
+        YAML이 잘못 수정되어 읽기에 실패하면 이전 스냅샷을 계속 사용한다.
+        """
+        if time.monotonic() >= self._next_check:
+            try:
+                self.reload_yaml()
+            except Exception as e:
+                from backend.core.logger import get_logger
+                get_logger(__name__).error(f"BATMON.yml 다시 읽기 실패, 이전 설정을 계속 사용합니다: {e}")
+        return self._snapshot
+
     def _validate_and_normalize(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """스키마 최소 검증 + 기본값 주입"""
         items = data.get('programs') or []
@@ -63,25 +209,78 @@ class Config:
 
             norm.append({
                 'name': name,
+                # 서비스 구현 선택 (service_registry.SERVICE_TYPES), 생략하면 name과 같은 type
+                'type': (raw.get('type') or name).strip(),
                 'description': raw.get('description', ''),
                 'base_dir': raw.get('base_dir', ''),
                 'scheduler': raw.get('scheduler', ''),   # e.g. "taskschd.msc" | "windows service"
                 'run_time': raw.get('run_time', []),     # e.g. ["0630","1830"] 또는 "*/5min" 등
                 'retry_program': raw.get('retry_program', ''), # e.g. "run_kindscrap.bat"
+                'check_timeout': self._to_seconds(raw.get('check_timeout'), f'programs[{i}].check_timeout'),
+                'check_interval': self._to_seconds(raw.get('check_interval'), f'programs[{i}].check_interval'),
+                'log_dir': raw.get('log_dir', ''),   # base_dir 기준 로그 폴더 (daily_log type), 기본 "log"
+                'log_file': raw.get('log_file', ''), # strftime 형식의 로그 파일명 (daily_log type), 기본 "{name}_%Y_%m_%d.log"
+                'max_concurrent': self._to_count(raw.get('max_concurrent'), f'programs[{i}].max_concurrent'), # 동시 실행 수, 기본 JOB_MAX_PER_PROGRAM
             })
         return norm
 
+    def _validate_agents(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """허브 모드 에이전트 목록. 항목은 URL 문자열 또는 {name, url, timeout}"""
+        items = data.get('agents') or []
+        norm: List[Dict[str, Any]] = []
+        names = set()
+        for i, raw in enumerate(items):
+            if isinstance(raw, str):
+                raw = {'url': raw}
+            if not isinstance(raw, dict):
+                raise ValueError(f'agents[{i}] 항목이 문자열이나 객체가 아닙니다.')
+            url = (raw.get('url') or '').strip().rstrip('/')
+            if not url.startswith(('http://', 'https://')):
+                raise ValueError(f'agents[{i}].url 은 http:// 또는 https:// 로 시작해야 합니다: {url!r}')
+            # 이름을 생략하면 host:port
+            name = (raw.get('name') or url.split('://', 1)[1].split('/', 1)[0]).strip()
+            if name in names:
+                raise ValueError(f'agents[{i}].name 중복: {name}')
+            names.add(name)
+            norm.append({
+                'name': name,
+                'url': url,
+                'timeout': self._to_seconds(raw.get('timeout'), f'agents[{i}].timeout') or self.HUB_TIMEOUT,
+            })
+        return norm
+
+    @staticmethod
+    def _to_seconds(value: Any, key: str) -> Optional[float]:
+        """초 단위 숫자 설정값 검증 (없으면 None)"""
+        if value is None or value == '':
+            return None
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{key} 값이 숫자가 아닙니다: {value!r}')
+        if seconds <= 0:
+            raise ValueError(f'{key} 값은 0보다 커야 합니다: {value!r}')
+        return seconds
+
+    @staticmethod
+    def _to_count(value: Any, key: str) -> Optional[int]:
+        """1 이상 정수 설정값 검증 (없으면 None)"""
+        if value is None or value == '':
+            return None
+        try:
+            count = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{key} 값이 정수가 아닙니다: {value!r}')
+        if count < 1:
+            raise ValueError(f'{key} 값은 1 이상이어야 합니다: {value!r}')
+        return count
+
     # --- 조회 헬퍼 -----------------------------------------------------------
-    def list_programs(self) -> List[Dict[str, Any]]:
-        self.reload_yaml()  # 변경 감지 후 필요 시 재로딩
-        return self.programs
+    def list_programs(self) -> Tuple[Dict[str, Any], ...]:
+        return self.snapshot().programs  # 변경 감지 후 필요 시 재로딩
 
     def get_program(self, name: str) -> Optional[Dict[str, Any]]:
-        self.reload_yaml()
-        for p in self.programs:
-            if p['name'] == name:
-                return p
-        return None
+        return self.snapshot().index.get(name)
 
 # 단일톤
 config = Config()
@@ -0,0 +1,228 @@
+# file_response.py
+"""
+모듈 설명:
+    - 파일 다운로드/스트리밍 응답 (/api/v1/system/download, /api/v1/system/file/stream).
+    - Starlette 공개 API(Response)만 써서 직접 처리한다. (FileResponse 내부 메서드에 기대지 않음)
+        · Range 요청: 206 단일 구간, multipart/byteranges 여러 구간(RFC 9110 14.6, CRLF 구분), If-Range, 416
+          겹치거나 붙은 구간은 합치고, MAX_RANGES 개를 넘으면 Range 를 무시하고 200 전체로 보낸다.
+        · 검증자: ETag(경로+inode+크기+mtime) / Last-Modified, If-None-Match / If-Modified-Since 가 맞으면 파일을 열지 않고 304
+        · 고정 크기(FILE_CHUNK_SIZE) 청크 전송
+주요 기능:
+    - file_response: 조건부 요청 처리 후 RangeFileResponse 또는 304 반환
+    - parse_range: Range 헤더 → 구간 목록
+"""
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from mimetypes import guess_type
+from secrets import token_hex
+from typing import List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request, Response
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+from backend.core.http_cache import REVALIDATE, is_not_modified, make_etag
+
+# 한 번에 보내는 크기 (Starlette 기본 64KB보다 크게 잡아 큰 PDF/엑셀의 스레드 왕복 횟수를 줄인다)
+FILE_CHUNK_SIZE = 1024 * 1024
+# 합친 뒤에도 구간이 이보다 많으면 Range 를 무시하고 전체를 보낸다 (작은 구간 수천 개로 요청을 부풀리지 않도록)
+MAX_RANGES = 32
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Range 헤더 → [(start, end), ...] (end 는 포함하지 않음, 정렬 후 겹치거나 붙은 구간은 합침).
+    - None: Range 가 없거나 bytes 단위가 아니거나 문법이 틀림 → 200 전체
+    - []: 만족하는 구간이 없음 → 416
+    """
+    if not header:
+        return None
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        return None
+    ranges: List[Tuple[int, int]] = []
+    for spec in specs.split(","):
+        first, dash, last = spec.strip().partition("-")
+        if not dash:
+            return None
+        first, last = first.strip(), last.strip()
+        try:
+            if first:
+                start = int(first)
+                end = int(last) + 1 if last else size
+                if start < 0 or (last and end <= start):
+                    return None
+            else:
+                suffix = int(last)   # 마지막 n 바이트
+                if suffix < 0:
+                    return None
+                start, end = max(0, size - suffix), size
+                if suffix == 0:
+                    continue
+        except ValueError:
+            return None
+        if start < size:
+            ranges.append((start, min(end, size)))
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RangeFileResponse(Response):
+    """파일 응답: 200 전체 / 206 단일 구간 / 206 multipart/byteranges / 416"""
+
+    chunk_size = FILE_CHUNK_SIZE
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+        disposition: str = "attachment",
+    ):
+        self.path = path
+        self.size = stat_result.st_size
+        self.status_code = 200
+        self.media_type = media_type or guess_type(filename or path)[0] or "text/plain"
+        self.background = None
+        self.init_headers(headers)
+        self.headers["accept-ranges"] = "bytes"
+        self.headers["content-length"] = str(self.size)
+        if filename is not None:
+            quoted = quote(filename)
+            if quoted != filename:
+                self.headers["content-disposition"] = f"{disposition}; filename*=utf-8''{quoted}"
+            else:
+                self.headers["content-disposition"] = f'{disposition}; filename="{filename}"'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        header_only = scope.get("method") == "HEAD"
+        ranges = None
+        if scope.get("method") in ("GET", "HEAD") and self._if_range_matches(request_headers.get("if-range")):
+            ranges = parse_range(request_headers.get("range"), self.size)
+            if ranges is not None and len(ranges) > MAX_RANGES:
+                ranges = None
+
+        if ranges is None:
+            await send({"type": "http.response.start", "status": 200, "headers": self.raw_headers})
+            if not header_only:
+                await self._send_file(send, 0, self.size)
+            else:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif not ranges:
+            self.headers["content-range"] = f"bytes */{self.size}"
+            self.headers["content-length"] = "0"
+            await send({"type": "http.response.start", "status": 416, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.headers["content-range"] = f"bytes {start}-{end - 1}/{self.size}"
+            self.headers["content-length"] = str(end - start)
+            await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+            if not header_only:
+                await self._send_file(send, start, end)
+            else:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self._send_multipart(send, ranges, header_only)
+
+    def _if_range_matches(self, if_range: Optional[str]) -> bool:
+        """If-Range 가 없거나 현재 ETag(strong 비교)/Last-Modified 와 같으면 True (다르면 Range 를 무시하고 전체)"""
+        if not if_range:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith(('"', "W/")):
+            return if_range == self.headers.get("etag")
+        return if_range == self.headers.get("last-modified")
+
+    async def _send_multipart(self, send: Send, ranges: List[Tuple[int, int]], header_only: bool):
+        """multipart/byteranges: 구간마다 --boundary, Content-Type, Content-Range, 빈 줄, 데이터, CRLF. 끝은 --boundary--"""
+        boundary = token_hex(13)
+        content_type = self.headers["content-type"]
+        part_headers = [
+            (f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+             f"Content-Range: bytes {start}-{end - 1}/{self.size}\r\n\r\n").encode("latin-1")
+            for start, end in ranges
+        ]
+        closing = f"--{boundary}--\r\n".encode("latin-1")
+        length = sum(len(h) + (end - start) + 2 for h, (start, end) in zip(part_headers, ranges)) + len(closing)
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(length)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        if header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for header, (start, end) in zip(part_headers, ranges):
+                await send({"type": "http.response.body", "body": header, "more_body": True})
+                await self._send_range(send, file, start, end)
+                await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+        await send({"type": "http.response.body", "body": closing, "more_body": False})
+
+    async def _send_file(self, send: Send, start: int, end: int):
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await self._send_range(send, file, start, end)
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _send_range(self, send: Send, file, start: int, end: int):
+        """[start, end) 를 청크로 보낸다 (그 사이 파일이 줄었으면 있는 만큼만)"""
+        await file.seek(start)
+        while start < end:
+            chunk = await file.read(min(self.chunk_size, end - start))
+            if not chunk:
+                break
+            start += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+
+def _not_modified_since(request: Request, mtime: float) -> bool:
+    """If-Modified-Since 이후 바뀌지 않았으면 True (If-None-Match 가 있으면 그쪽이 우선)"""
+    if request.headers.get("if-none-match"):
+        return False
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(mtime) <= since
+
+
+def file_response(
+    request: Request,
+    path: str,
+    *,
+    filename: Optional[str] = None,
+    media_type: Optional[str] = None,
+    disposition: str = "attachment",
+) -> Response:
+    """
+    path 파일 응답. ETag/Last-Modified 가 요청의 검증자와 맞으면 본문 없이 304.
+    Range 요청은 206(여러 구간이면 multipart/byteranges)으로 응답한다.
+    """
+    st = os.stat(path)
+    # 크기/mtime 이 같은 다른 파일과 구분되도록 경로와 inode 도 넣는다
+    etag = make_etag("file", os.path.abspath(path), st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    if is_not_modified(request, etag) or _not_modified_since(request, st.st_mtime):
+        return Response(status_code=304, headers={"ETag": etag, "Last-Modified": last_modified, "Cache-Control": REVALIDATE})
+    return RangeFileResponse(
+        path,
+        st,
+        filename=filename,
+        media_type=media_type,
+        disposition=disposition,
+        headers={"ETag": etag, "Last-Modified": last_modified, "Cache-Control": REVALIDATE},
+    )
@@ -0,0 +1,48 @@
+# http_cache.py
+"""
+모듈 설명:
+    - JSON API의 조건부 응답(ETag / If-None-Match → 304) 헬퍼.
+    - ETag는 응답 본문이 아니라 "내용 버전"(스냅샷 버전, 디렉토리 mtime, 설정 버전 등)으로 만들어서,
+      클라이언트 값과 같으면 조회/직렬화 없이 304를 바로 돌려줄 수 있게 한다.
+주요 기능:
+    - make_etag: 버전 값들로 ETag 생성 (weak=True 이면 W/"...")
+    - is_not_modified: 요청의 If-None-Match가 ETag와 일치하는지 판단
+    - not_modified_response: 304 응답 생성
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+# 브라우저 HTTP 캐시가 임의로 재사용하지 않고 항상 서버에 확인(재검증)하게 한다.
+REVALIDATE = "no-cache"
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """
+    버전 값들을 이어 붙여 해시한 ETag ("...").
+    버전이 같아도 본문 일부(응답 시각, 경과 시간 등)가 달라지는 응답은 weak(W/"...")로 만든다.
+    """
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:24]}"' if weak else f'"{digest[:24]}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match 헤더(쉼표 목록, *, W/ 접두어 허용)에 etag가 있으면 True"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
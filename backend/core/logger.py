@@ -1,23 +1,187 @@
+# logger.py
+"""
+모듈 설명:
+    - Batmon 자체 로그. 모든 모듈 logger 가 QueueHandler 하나를 함께 쓰고,
+      파일 쓰기는 백그라운드 QueueListener 스레드 하나가 한다. (요청 처리 스레드는 디스크를 기다리지 않음)
+    - 큐는 LOG_QUEUE_SIZE 개로 제한한다. 가득 차면 버리고 개수를 센다. (레벨별)
+      90% 이상 차면 WARNING 미만은 먼저 버려서 경고/오류가 들어갈 자리를 남긴다.
+    - 쓰기 스레드는 쌓인 레코드를 모아(LOG_BATCH) 한 번에 쓰고 flush 한다. (파일 잠금/flush 도 묶음당 한 번)
+주요 기능:
+    - get_logger: 모듈 logger (처음 부를 때 큐/쓰기 스레드 시작)
+    - log_stats: 큐 길이, 버린 개수(레벨별), 쓴 개수/묶음 수
+    - stop_logging: 남은 로그를 모두 쓰고 쓰기 스레드 종료 (shutdown, 프로세스 종료 시)
+"""
+import atexit
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
 from concurrent_log_handler import ConcurrentRotatingFileHandler
 
+LOG_BATCH = 256             # 한 번에 쓰는 최대 로그 수
+LOW_PRIORITY_RATIO = 0.9    # 큐가 이만큼 차면 WARNING 미만은 버림
+
+
+def _format_line(created: float, msecs: float, name: str, levelname: str, levelno: int, message: str) -> str:
+    """기존 포맷 "%(asctime)s - %(name)s - %(levelname)s - %(message)s" 과 같은 한 줄"""
+    asctime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))
+    return f"{asctime},{int(msecs):03d} - {name} - {levelname} - {message}"
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """큐가 차면 기다리지 않고 버리고 레벨별로 센다"""
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped: Dict[str, int] = {}
+        self._high_water = max(1, int(log_queue.maxsize * LOW_PRIORITY_RATIO))
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> tuple:
+        """
+        큐에는 레코드 대신 (created, msecs, name, levelname, 메시지) 만 넣는다.
+        args 는 여기서 합쳐서(나중에 바뀌는 객체 대비) 넣고, 시각 포맷은 쓰기 스레드에서 한다.
+        """
+        message = record.getMessage()
+        if record.exc_info or record.exc_text or record.stack_info:
+            text = record.exc_text or (self.formatter.formatException(record.exc_info) if record.exc_info else "")
+            if text:
+                message = f"{message}\n{text}"
+            if record.stack_info:
+                message = f"{message}\n{record.stack_info}"
+        return record.created, record.msecs, record.name, record.levelname, record.levelno, message
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            item = self.prepare(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if record.levelno < logging.WARNING and self.queue.qsize() >= self._high_water:
+            self._drop(record)
+            return
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self._drop(record)
+
+    def _drop(self, record: logging.LogRecord):
+        with self._drop_lock:
+            self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+
+class _BatchListener(QueueListener):
+    """큐에서 꺼낸 로그를 모아 두었다가 큐가 비거나 LOG_BATCH 개가 되면 한 번에 쓴다"""
+
+    def __init__(self, log_queue: "queue.Queue", *handlers: logging.Handler):
+        super().__init__(log_queue, *handlers, respect_handler_level=False)
+        self._batch = []
+        self.written = 0
+        self.batches = 0
+        self.running = False
+
+    def start(self):
+        super().start()
+        self.running = True
+
+    def enqueue_sentinel(self):
+        # 큐가 가득 차 있어도 종료 신호는 넣는다 (쓰기 스레드가 비우는 동안 기다림)
+        self.queue.put(self._sentinel, timeout=5)
+
+    def handle(self, item: tuple):
+        self._batch.append(item)
+        if len(self._batch) >= LOG_BATCH or self.queue.empty():
+            self.flush_batch()
+
+    def flush_batch(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        levelno = max(item[4] for item in batch)
+        combined = logging.makeLogRecord({
+            "name": "batmon",
+            "msg": "\n".join(_format_line(*item) for item in batch),
+            "levelno": levelno,
+            "levelname": logging.getLevelName(levelno),
+        })
+        for handler in self.handlers:
+            try:
+                handler.handle(combined)
+            except Exception:
+                handler.handleError(combined)
+        self.written += len(batch)
+        self.batches += 1
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        super().stop()
+        self.flush_batch()
+
+
+_lock = threading.Lock()
+_handler: Optional[_DroppingQueueHandler] = None
+_listener: Optional[_BatchListener] = None
+
+
+def _start():
+    """큐 + 쓰기 스레드 시작 (프로세스에 한 번)"""
+    global _handler, _listener
+    from backend.core.config import config
+
+    log_queue: "queue.Queue" = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    # 파일 최대 크기 5MB, 최대 7개 보관. 쓰기 스레드 하나만 쓰므로 포맷은 메시지 그대로
+    file_handler = ConcurrentRotatingFileHandler(config.LOG_FILE, "a", 5*1024*1024, 7, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+    handlers = [file_handler]
+    if config.PROFILE_NAME == "local":
+        # 콘솔에도 로그 메시지 출력
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(console_handler)
+
+    handler = _DroppingQueueHandler(log_queue)
+    handler.setFormatter(logging.Formatter())   # 예외 traceback 포맷용
+    listener = _BatchListener(log_queue, *handlers)
+    listener.start()
+    _handler, _listener = handler, listener
+    atexit.register(stop_logging)
+
+
 def get_logger(name):
     from backend.core.config import config
+    if _handler is None:
+        with _lock:
+            if _handler is None:
+                _start()
     logger = logging.getLogger(name)
     logger.setLevel(config.LOG_LEVEL)
-    LOG_FILE = config.LOG_FILE
-    if not logger.handlers:
-        # 매일 자정에 로그 파일을 회전, 최대 7개의 파일 보관
-        # 파일의 최대 크기는 예시로 5MB로 설정하였습니다. 필요에 따라 조절하십시오.
-        file_handler = ConcurrentRotatingFileHandler(LOG_FILE, "a", 5*1024*1024, 7, encoding='utf-8')
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        
-        if config.PROFILE_NAME == "local":
-            # 콘솔에도 로그 메시지 출력
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
-
-    return logger
\ No newline at end of file
+    if _handler not in logger.handlers:
+        logger.addHandler(_handler)
+    return logger
+
+
+def log_stats() -> dict:
+    if _handler is None or _listener is None:
+        return {"queued": 0, "capacity": 0, "dropped": 0, "dropped_by_level": {}, "written": 0, "batches": 0}
+    with _handler._drop_lock:
+        dropped = dict(_handler.dropped)
+    return {
+        "queued": _handler.queue.qsize(),
+        "capacity": _handler.queue.maxsize,
+        "dropped": sum(dropped.values()),
+        "dropped_by_level": dropped,
+        "written": _listener.written,
+        "batches": _listener.batches,
+    }
+
+
+def stop_logging():
+    """남은 로그를 모두 쓰고 쓰기 스레드를 멈춘다. 다시 불러도 된다"""
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
@@ -0,0 +1,188 @@
+# startup_profile.py
+"""
+모듈 설명:
+    - 시작 시간 측정 (batmon --profile-startup, python -m backend.main --profile-startup)
+    - 모듈별 import 시간(self: 자기 코드만, 누적: 하위 import 포함)과
+      프로세스 시작 → import 완료 → 앱 생성 → startup 완료 → 첫 요청 응답까지의 시간을 출력한다.
+    - install() 은 다른 모듈을 import 하기 전에 불러야 하므로 이 모듈은 표준 라이브러리만 쓴다.
+    - 측정 모드가 아니면 mark() 등은 아무것도 하지 않는다.
+주요 기능:
+    - install: import 시간 측정 시작 (sys.meta_path 맨 앞에 측정용 finder 추가)
+    - mark: 구간 기록 (imports / app / startup)
+    - FirstRequestTimer: 첫 요청 응답이 끝나면 보고서를 출력하는 ASGI 미들웨어
+    - probe: startup 직후 스스로 첫 요청(GET /main)을 보내 측정을 끝낸다
+"""
+import importlib.abc
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+_enabled = False
+_started = time.perf_counter()      # install() 시각 (프로세스 시작 시각을 모르면 기준)
+_marks: List[Tuple[str, float]] = []
+_imports: Dict[str, List[float]] = {}   # name → [self, 누적, 메인 스레드 여부]
+_local = threading.local()
+_reported = threading.Event()
+
+TOP_MODULES = 25
+
+_MARK_LABELS = {
+    "imports": "import 완료",
+    "app": "앱 생성",
+    "startup": "startup 완료",
+    "first_request": "첫 요청 응답",
+}
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """원래 loader 에 위임하면서 create_module + exec_module 시간을 잰다"""
+
+    def __init__(self, name: str, loader):
+        self._name = name
+        self._loader = loader
+        self._create_time = 0.0
+
+    def __getattr__(self, attr):
+        # get_resource_reader, get_source 등은 원래 loader 로
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        started = time.perf_counter()
+        try:
+            create = getattr(self._loader, "create_module", None)
+            return create(spec) if create else None
+        finally:
+            self._create_time = time.perf_counter() - started
+
+    def exec_module(self, module):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        frame = [0.0]   # 하위 import 누적 시간
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - started + self._create_time
+            stack.pop()
+            if stack:
+                stack[-1][0] += total
+            main = threading.current_thread() is threading.main_thread()
+            _imports[self._name] = [total - frame[0], total, main]
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """다른 finder 들이 찾은 spec 의 loader 를 _TimingLoader 로 감싼다"""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimingLoader(fullname, spec.loader)
+                return spec
+        return None
+
+
+def install():
+    global _enabled, _started
+    if _enabled:
+        return
+    _enabled = True
+    _started = time.perf_counter()
+    sys.meta_path.insert(0, _TimingFinder())
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def mark(name: str):
+    if _enabled:
+        _marks.append((name, time.perf_counter()))
+
+
+def _process_offset() -> Tuple[float, str]:
+    """(프로세스 시작 → install() 까지 걸린 시간, 기준 설명)"""
+    try:
+        import psutil
+        created = psutil.Process().create_time()
+        elapsed_since_install = time.perf_counter() - _started
+        return max(0.0, time.time() - created - elapsed_since_install), "프로세스 시작"
+    except Exception:
+        return 0.0, "측정 시작"
+
+
+def report(request_line: str = "") -> str:
+    offset, origin = _process_offset()
+    lines = ["=" * 64, "batmon 시작 프로파일", "=" * 64]
+    lines.append(f"{origin} → 측정 시작            {offset * 1000:10.1f} ms  (인터프리터/PyInstaller 준비)")
+    for name, at in _marks:
+        label = _MARK_LABELS.get(name, name)
+        extra = f"  ({request_line})" if name == "first_request" and request_line else ""
+        lines.append(f"{origin} → {label:<18}{(offset + at - _started) * 1000:10.1f} ms{extra}")
+
+    main = {name: v for name, v in _imports.items() if v[2]}
+    background = {name: v for name, v in _imports.items() if not v[2]}
+    packages: Dict[str, float] = {}
+    for name, (own, _, _) in main.items():
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0.0) + own
+    lines.append("-" * 64)
+    lines.append(f"패키지별 import (self 합계, 메인 스레드 모듈 {len(main)}개, 합계 {sum(packages.values()) * 1000:.1f} ms)")
+    for top, own in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:TOP_MODULES]:
+        lines.append(f"  {top:<40}{own * 1000:10.1f} ms")
+    lines.append("-" * 64)
+    lines.append(f"모듈별 import 상위 {TOP_MODULES}개 (self / 누적)")
+    for name, (own, total, _) in sorted(main.items(), key=lambda kv: kv[1][0], reverse=True)[:TOP_MODULES]:
+        lines.append(f"  {name:<40}{own * 1000:10.1f} ms {total * 1000:10.1f} ms")
+    if background:
+        total = sum(v[0] for v in background.values())
+        lines.append("-" * 64)
+        lines.append(f"백그라운드 스레드 import (warm-up 등) {len(background)}개, {total * 1000:.1f} ms")
+    lines.append("=" * 64)
+    return "\n".join(lines)
+
+
+class FirstRequestTimer:
+    """첫 HTTP 응답이 끝나면 first_request 를 기록하고 보고서를 출력한다"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _reported.is_set():
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not _reported.is_set():
+                _reported.set()
+                mark("first_request")
+                print(report(f"{scope.get('method')} {scope.get('path')}"), flush=True)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def probe(port: int, path: str = "/main"):
+    """서버가 요청을 받기 시작하면 GET path 를 한 번 보낸다 (아직 다른 요청이 없었을 때만)"""
+    import http.client
+
+    def run():
+        deadline = time.monotonic() + 30
+        while not _reported.is_set() and time.monotonic() < deadline:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                conn.request("GET", path)
+                conn.getresponse().read()
+                conn.close()
+                return
+            except OSError:
+                time.sleep(0.05)
+
+    threading.Thread(target=run, name="batmon-startup-probe", daemon=True).start()
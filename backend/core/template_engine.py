@@ -1,46 +1,118 @@
 # template_engine.py
 """
-모듈 설명: 
-    - jinja2 템플릿 엔진을 사용하여 HTML 템플릿을 렌더링하는 모듈 
+모듈 설명:
+    - jinja2 템플릿 엔진을 사용하여 HTML 템플릿을 렌더링하는 모듈
+    - 컴파일된 템플릿은 TEMPLATE_CACHE_DIR 에 bytecode 로 저장해서 재시작(PyInstaller 포함) 때 다시 컴파일하지 않는다.
+    - TEMPLATE_AUTO_RELOAD 가 꺼져 있으면(운영) 템플릿 파일 변경을 확인하지 않고, 시작 시 미리 컴파일한 것만 쓴다.
+    - 공통 화면 조각(nav_right, 알림/로딩 등 페이지 데이터를 쓰지 않는 것)은 fragment() 로 넣고 _version 별로 한 번만 렌더링한다.
 주요 기능:
     - render_template: 템플릿 파일을 렌더링하여 HTML 문자열을 반환
+    - stream_template: 템플릿을 조각씩 렌더링(generate)하는 bytes 제너레이터 (StreamingResponse 용)
+    - precompile_templates: 모든 템플릿을 미리 컴파일 (startup)
 
 작성자: 김도영
 작성일: 2024-07-18
 버전: 1.0
 """
 import os
-import re
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+import threading
+import time
+from typing import Dict, Iterator, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, pass_context, select_autoescape
+from markupsafe import Markup
+
+from backend.core.config import config
 from backend.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# stream_template 이 한 번에 보내는 최소 크기 (렌더링 조각이 작으므로 모아서 보낸다)
+STREAM_CHUNK_SIZE = 16 * 1024
+
 # 프로젝트 루트 디렉토리를 기반으로 템플릿 디렉토리 설정
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 template_dir = os.path.join(BASE_DIR, 'frontend', 'views')
 logger.debug("------------------------------------------------")
 logger.debug(f"template_dir: {template_dir}")
 logger.debug("------------------------------------------------")
+os.makedirs(config.TEMPLATE_CACHE_DIR, exist_ok=True)
 # Jinja2 환경 설정
 env = Environment(
     loader=FileSystemLoader(template_dir),
     autoescape=select_autoescape(['html', 'xml']),
+    auto_reload=config.TEMPLATE_AUTO_RELOAD,
+    bytecode_cache=FileSystemBytecodeCache(config.TEMPLATE_CACHE_DIR),
 )
 
+_fragments: Dict[Tuple[str, str], Markup] = {}
+_fragments_lock = threading.Lock()
+
+
+@pass_context
+def fragment(ctx, template_name: str) -> Markup:
+    """
+    페이지 데이터를 쓰지 않는 공통 조각. (템플릿, _version)마다 한 번만 렌더링한다.
+    조각 안에서는 _version 만 쓸 수 있다. auto_reload 중에는 캐시하지 않는다. (템플릿 수정 즉시 반영)
+    """
+    version = str(ctx.get("_version", ""))
+    if env.auto_reload:
+        return Markup(env.get_template(template_name).render(_version=version))
+    key = (template_name, version)
+    html = _fragments.get(key)
+    if html is None:
+        html = Markup(env.get_template(template_name).render(_version=version))
+        with _fragments_lock:
+            _fragments[key] = html
+    return html
+
+
+env.globals["fragment"] = fragment
+
+
+def precompile_templates() -> int:
+    """모든 .html 템플릿을 미리 컴파일해서 env 캐시에 올린다. (bytecode 캐시도 채워짐)"""
+    started = time.perf_counter()
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        try:
+            env.get_template(name)
+        except Exception as e:
+            logger.error(f"템플릿 컴파일 실패: {name}: {e}")
+    logger.info(f"템플릿 {len(names)}개 컴파일 완료 ({(time.perf_counter() - started) * 1000:.0f}ms, auto_reload={env.auto_reload})")
+    return len(names)
+
+
 def render_template(template_name, context={}):
     template = env.get_template(template_name)
     return template.render(context)
 
 
+def stream_template(template_name, context={}) -> Iterator[bytes]:
+    """템플릿을 generate()로 렌더링하면서 STREAM_CHUNK_SIZE 이상 모이면 보낸다"""
+    template = env.get_template(template_name)
+    buffer, size = [], 0
+    for part in template.generate(context):
+        buffer.append(part)
+        size += len(part)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
 def get_template_html(template_name):
     # 템플릿 로드
     template = env.get_template(template_name)
     template_str = template.render()  # 템플릿을 문자열로 렌더링
 
-    # 정규 표현식을 사용하여 <body> 태그 안의 내용 추출
-    if template_str.find('<body') != -1:
-        body_content = re.search(r'<body[^>]*>(.*?)</body>', template_str, re.DOTALL).group(1)
-    else:
-        body_content = template_str
-    return body_content.strip()
+    # <body> 태그 안의 내용 추출 (정규식 없이 태그 위치만 찾는다)
+    start = template_str.find('<body')
+    if start == -1:
+        return template_str.strip()
+    start = template_str.find('>', start) + 1
+    end = template_str.rfind('</body>')
+    if end < start:
+        end = len(template_str)
+    return template_str[start:end].strip()
@@ -0,0 +1,40 @@
+# warmup.py
+"""
+모듈 설명:
+    - 무거운 선택 의존성(pandas/openpyxl 등)은 필요한 요청에서 처음 import 한다. (시작 시간에 포함되지 않음)
+    - 대신 서버가 뜬 뒤 백그라운드 스레드에서 미리 import 해 두어, 첫 엑셀 보기 등이 import 를 기다리지 않게 한다.
+    - 대상은 WARMUP_IMPORTS (쉼표 구분, 비우면 하지 않음). 설치되지 않은 모듈은 건너뛴다.
+주요 기능:
+    - start_warmup: 백그라운드 import 시작
+"""
+import importlib
+import threading
+import time
+from typing import Optional
+
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _warm_up(modules):
+    started = time.perf_counter()
+    for name in modules:
+        t = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            logger.debug(f"warm-up import: {name} ({(time.perf_counter() - t) * 1000:.0f}ms)")
+        except ImportError as e:
+            logger.debug(f"warm-up 건너뜀: {name}: {e}")
+        except Exception as e:
+            logger.warning(f"warm-up 실패: {name}: {e}")
+    logger.info(f"warm-up 완료: {', '.join(modules)} ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+
+def start_warmup(modules: str) -> Optional[threading.Thread]:
+    names = [m.strip() for m in (modules or "").split(",") if m.strip()]
+    if not names:
+        return None
+    thread = threading.Thread(target=_warm_up, args=(names,), name="batmon-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -3,11 +3,13 @@ from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel
 
+from backend.domains.system_schema import SystemSummary
+
 
 class ServiceStatus(BaseModel):
     name: str
     description: str
-    status: str  # "OK", "ERROR", "WARNING"
+    status: str  # "OK", "ERROR", "WARNING", "TIMEOUT"
     message: str
     last_log: Optional[str] = None
     last_log_time: Optional[str] = None
@@ -17,6 +19,31 @@ class ServiceStatus(BaseModel):
     run_time: List[str]
     retry_program: str # fullpath
     retry_program_name: str # 프로그램 이름
+    age_seconds: Optional[float] = None # 점검 결과가 만들어진 뒤 지난 시간(초)
+    checked_at: Optional[datetime] = None # 점검 결과가 만들어진 시각 (304 로 본문을 재사용해도 이 값으로 경과 시간을 계산)
+    # 로그 검사 결과 (로그를 검사하는 서비스만)
+    log_error_count: Optional[int] = None    # ERROR가 포함된 줄 수
+    first_error_line: Optional[int] = None   # 첫 ERROR 줄 번호 (1부터)
+    first_error_offset: Optional[int] = None # 첫 ERROR 줄의 byte 위치
+    last_error_line: Optional[int] = None
+    last_error_offset: Optional[int] = None
+    error_context: List[str] = []            # 마지막 ERROR 줄과 앞뒤 줄
+    # 허브 모드 (다른 batmon 에이전트에서 받은 결과만)
+    host: Optional[str] = None               # 결과를 보낸 에이전트 이름
+    stale: Optional[bool] = None             # 에이전트 조회가 실패했거나 HUB_STALE 보다 오래된 결과
+
+class AgentStatus(BaseModel):
+    name: str
+    url: str
+    status: str  # "OK", "STALE"(마지막 결과가 오래됨), "ERROR"(받은 결과 없음)
+    message: Optional[str] = None           # 마지막 조회 오류
+    stale: bool = False
+    latency_ms: Optional[float] = None      # 마지막 조회에 걸린 시간
+    age_seconds: Optional[float] = None     # 마지막 성공 조회 뒤 지난 시간(초)
+    fetched_at: Optional[datetime] = None   # 마지막 성공 조회 시각
+    skipped: int = 0                        # 이전 조회가 끝나지 않아 건너뛴 횟수 (느린 에이전트)
+    snapshot_version: Optional[int] = None  # 에이전트의 점검 스냅샷 버전
+    system: Optional[SystemSummary] = None  # 에이전트의 /api/v1/system/info
 
 class HealthCheckResponse(BaseModel):
     timestamp: datetime
@@ -26,3 +53,37 @@ class HealthCheckResponse(BaseModel):
     total_services: int
     ok_count: int
     error_count: int
+    snapshot_version: Optional[int] = None # 백그라운드 점검 스냅샷 버전
+    agents: Optional[List[AgentStatus]] = None # 허브 모드에서만: 에이전트별 조회 상태
+
+class CheckHistory(BaseModel):
+    program: str
+    checked_at: datetime
+    status: str
+    message: Optional[str] = None
+    last_log: Optional[str] = None
+    last_log_time: Optional[str] = None
+    log_error_count: Optional[int] = None
+    last_error_line: Optional[int] = None
+
+class JobOutputLine(BaseModel):
+    seq: int        # 작업 안에서 1부터 증가하는 줄 번호 (SSE id)
+    stream: str     # "stdout" | "stderr"
+    text: str
+
+class JobInfo(BaseModel):
+    id: str
+    program: str
+    command: str
+    status: str  # "QUEUED", "RUNNING", "SUCCEEDED", "FAILED", "CANCELLED", "LOST"(batmon 재시작으로 결과를 모름)
+    requested_at: datetime
+    started_at: Optional[datetime] = None
+    ended_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    exit_code: Optional[int] = None
+    pid: Optional[int] = None
+    message: Optional[str] = None
+    queue_position: Optional[int] = None       # 대기 중이면 대기열에서 몇 번째 (1부터)
+    duplicate: bool = False                    # 같은 프로그램이 이미 실행/대기 중이어서 그 작업을 돌려줌
+    output: Optional[List[JobOutputLine]] = None  # 최근 출력 (/jobs/{id} 에서만)
+    output_tail: Optional[str] = None          # DB 에 남은 마지막 출력 몇 줄 (메모리에 없는 지난 작업)
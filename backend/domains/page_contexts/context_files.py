@@ -21,28 +21,17 @@ def files_tree(context):
         "description": program_config.get("description", ""),
     }
 def batmon_log(file_path):
-    try:
-        # full_path = os.path.join("c:\\batmon", file_path)
-        full_path = file_path
-        with open(full_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except UnicodeDecodeError:
-        # UTF-8로 읽기 실패시 다른 인코딩 시도
-        try:
-            with open(full_path, 'r', encoding='cp949') as f:
-                content = f.read()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"파일 인코딩 오류: {str(e)}")    
+    """Batmon 로그 보기. 내용은 화면에서 /api/v1/system/text/batmon 으로 구간씩 읽는다. (LOG_DIR 기준 경로)"""
     return {
             "title" : "Batmon로그",
-            "file_name": "batmon.log",
+            "file_name": Path(file_path).name or "batmon.log",
             "file_type": "text",
-            "content": content,
+            "content": "",
             "program_name": "batmon",
             "file_path": file_path,
             "file_ext": ".log",
             "file_size": 0,
-            "base_dir": "c:\\batmon"
+            "base_dir": config.LOG_DIR
     }
 def files_view(context):
     """파일 보기 페이지용 컨텍스트 데이터를 생성합니다."""
@@ -90,48 +79,12 @@ def files_view(context):
         file_type = "unknown"
         
         if file_ext in ['.xls', '.xlsx']:
-            # Excel 파일 처리
-            logger.debug(f"Excel 파일 처리 시작: {full_path}")
-            try:
-                import pandas as pd
-                logger.debug("pandas 임포트 성공")
-                
-                df = pd.read_excel(full_path, sheet_name=0)
-                logger.debug(f"Excel 파일 읽기 성공: {df.shape} 크기")
-                
-                # HTML 테이블로 변환
-                content = df.to_html(
-                    classes='table table-striped table-hover table-sm',
-                    escape=False,
-                    table_id='excel-table'
-                )
-                file_type = "excel"
-                logger.debug("Excel 파일을 HTML로 변환 완료")
-            except ImportError as e:
-                logger.error(f"pandas ImportError: {e}")
-                raise HTTPException(status_code=500, detail="Excel 파일을 읽기 위한 pandas가 설치되지 않았습니다.")
-            except Exception as e:
-                logger.error(f"Excel 파일 읽기 실패: {e}")
-                raise HTTPException(status_code=500, detail=f"Excel 파일 읽기 실패: {str(e)}")
+            # Excel 파일 처리 - 내용은 화면에서 /api/v1/system/excel 로 시트/행 구간씩 읽는다 (정렬/필터는 서버)
+            file_type = "excel"
         
         elif file_ext in ['.txt', '.log', '.bat', '.json', '.xml', '.html', '.htm', '.css', '.js', '.py', '.java', '.cpp', '.c', '.h', '.md', '.csv', '.ini', '.conf', '.cfg', '.yml', '.yaml']:
-            # 텍스트 파일 처리
-            try:
-                # 파일 크기 확인 (10MB 제한)
-                if file_size > 10 * 1024 * 1024:
-                    raise HTTPException(status_code=413, detail="파일이 너무 큽니다 (10MB 초과). 다운로드를 이용해주세요.")
-                
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                file_type = "text"
-            except UnicodeDecodeError:
-                # UTF-8로 읽기 실패시 다른 인코딩 시도
-                try:
-                    with open(full_path, 'r', encoding='cp949') as f:
-                        content = f.read()
-                    file_type = "text"
-                except Exception as e:
-                    raise HTTPException(status_code=500, detail=f"파일 인코딩 오류: {str(e)}")
+            # 텍스트 파일 처리 - 내용은 화면에서 /api/v1/system/text 로 필요한 줄 구간만 읽는다 (크기 제한 없음)
+            file_type = "text"
         
         elif file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp']:
             # 이미지 파일 처리 - 스트리밍 엔드포인트 사용
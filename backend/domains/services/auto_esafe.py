@@ -11,8 +11,8 @@ from backend.domains.services.base_service import BaseService
 logger = get_logger(__name__)
 
 class AutoEsafeService(BaseService):
-    def __init__(self, program_name: str = "auto_esafe"):
-        super().__init__(program_name)
+    def __init__(self, program_name: str = "auto_esafe", program_config: Optional[dict] = None):
+        super().__init__(program_name, program_config)
     
     def check(self) -> ServiceStatus:
         """
@@ -33,35 +33,18 @@ class AutoEsafeService(BaseService):
             last_log_file = self._get_last_log()
             if not last_log_file or not os.path.exists(last_log_file):
                 return self.error_status(f"생성되어야 할 로그파일을 찾지 못함 : {last_log_file}"  )
-            result = self.result_of_logfile(last_log_file)
-            if result == "ERROR":
-                return self.error_status(f"로그파일에서 ERROR 발견: {last_log_file}")
+            scan = self.scan_logfile(last_log_file)
+            last_log_time = self.get_last_log_time(last_log_file)
+            if scan.error_count > 0:
+                return self.error_status(f"로그파일에서 ERROR 발견: {last_log_file} ({scan.error_count}건, 마지막 {scan.last_error_line}번째 줄)",
+                                         os.path.basename(last_log_file), last_log_time, scan)
             else:
-                last_log_time = self.get_last_log_time(last_log_file)
                 last_log_file = os.path.basename(last_log_file) if last_log_file else None
-                return self.success_status("Auto_Esafe는 정상동작 중입니다.", last_log_file, last_log_time)
+                return self.success_status("Auto_Esafe는 정상동작 중입니다.", last_log_file, last_log_time, scan)
 
         except Exception as e:
             return self.error_status(f"Error checking service: {str(e)}")
 
-    def rerun(self) -> ServiceStatus:
-        """
-        Auto Esafe 서비스를 재실행합니다.
-        """
-        try:
-            logger.info("auto_esafe 서비스 재실행 시작")
-            program = self.retry_program
-            if not program or not os.path.exists(program):
-                return self.error_status(f"재실행할 프로그램이 설정되지 않았거나 존재하지 않습니다: {program}")
-            is_running = self._process_is_running(program)
-            if is_running:
-                return self.success_status("Auto_Esafe 서비스가 이미 실행 중입니다.")
-            self._run()
-            logger.info("auto_esafe 서비스 재실행 완료")
-            return self.success_status("Auto_Esafe 서비스가 재실행되었습니다.")
-        except Exception as e:
-            return self.error_status(f"프로그램 실행 실패: {str(e)}")
-
     def _get_last_log(self) -> Optional[str]:
         """마지막 로그를 가져옵니다."""
         ymd = datetime.now().strftime('%Y_%m_%d')
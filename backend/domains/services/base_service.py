@@ -1,26 +1,29 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 import os
-import subprocess
 from typing import Optional
 
 from pathlib import Path
 from backend.core.config import config
 from backend.domains.batmon_schema import ServiceStatus
 from backend.core.logger import get_logger
+from backend.utils.log_cursor import log_cursor_store
+from backend.utils.log_scanner import LogScanResult
 
 logger = get_logger(__name__)
 
 class BaseService(ABC):
-    def __init__(self, program_name: str):
+    def __init__(self, program_name: str, program_config: Optional[dict] = None):
         self.program_name = program_name
         
-        # config에서 프로그램 설정 가져오기
-        program_config = config.get_program(program_name)
+        # config에서 프로그램 설정 가져오기 (service_registry는 BATMON.yml 항목을 직접 넘겨준다)
+        if program_config is None:
+            program_config = config.get_program(program_name)
         if not program_config:
             raise ValueError(f"Program '{program_name}' not found in config")
         
         self.name = program_config.get('name', program_name)
+        self.type = program_config.get('type', program_name)
         self.description = program_config.get('description', '')
         self.base_dir = program_config.get('base_dir', '')
         self.scheduler = program_config.get('scheduler', '')
@@ -28,9 +31,26 @@ class BaseService(ABC):
         self.retry_program_name = program_config.get('retry_program', '')
         self.retry_program = os.path.join(self.base_dir, self.retry_program_name) if self.retry_program_name else ''
         self.log_dir = os.path.join(self.base_dir, "log")
+        # 점검 제한시간(초): BATMON.yml의 check_timeout, 없으면 .env의 CHECK_TIMEOUT
+        self.check_timeout = program_config.get('check_timeout') or config.CHECK_TIMEOUT
+        # 백그라운드 점검 주기(초): BATMON.yml의 check_interval, 없으면 .env의 CHECK_INTERVAL
+        self.check_interval = program_config.get('check_interval') or config.CHECK_INTERVAL
+        # 동시 실행 수: BATMON.yml의 max_concurrent, 없으면 .env의 JOB_MAX_PER_PROGRAM
+        self.max_concurrent = program_config.get('max_concurrent') or config.JOB_MAX_PER_PROGRAM
 
-    def _create_status(self, status: str, message: str, last_log: Optional[str] = None, last_log_time: Optional[str] = None) -> ServiceStatus:
-        """공통 ServiceStatus 생성 헬퍼 메소드"""
+    def _create_status(self, status: str, message: str, last_log: Optional[str] = None, last_log_time: Optional[str] = None,
+                       scan: Optional[LogScanResult] = None) -> ServiceStatus:
+        """공통 ServiceStatus 생성 헬퍼 메소드 (scan이 있으면 ERROR 위치 정보 포함)"""
+        log_fields = {}
+        if scan is not None:
+            log_fields = dict(
+                log_error_count=scan.error_count,
+                first_error_line=scan.first_error_line,
+                first_error_offset=scan.first_error_offset,
+                last_error_line=scan.last_error_line,
+                last_error_offset=scan.last_error_offset,
+                error_context=scan.error_context,
+            )
         return ServiceStatus(
             name=self.name,
             description=self.description,
@@ -43,26 +63,33 @@ class BaseService(ABC):
             scheduler=self.scheduler,
             run_time=self.run_time,
             retry_program=self.retry_program,
-            retry_program_name=self.retry_program_name
+            retry_program_name=self.retry_program_name,
+            **log_fields
         )
     
-    def success_status(self, message: str = "Service is running properly", last_log: Optional[str] = None, last_log_time:Optional[str]=None) -> ServiceStatus:
+    def success_status(self, message: str = "Service is running properly", last_log: Optional[str] = None, last_log_time:Optional[str]=None,
+                       scan: Optional[LogScanResult] = None) -> ServiceStatus:
         """OK 상태의 ServiceStatus 생성"""
-        return self._create_status("OK", message, last_log, last_log_time)
+        return self._create_status("OK", message, last_log, last_log_time, scan)
 
-    def error_status(self, message: str, last_log: Optional[str] = None, last_log_time: Optional[str] = None) -> ServiceStatus:
+    def error_status(self, message: str, last_log: Optional[str] = None, last_log_time: Optional[str] = None,
+                     scan: Optional[LogScanResult] = None) -> ServiceStatus:
         """ERROR 상태의 ServiceStatus 생성"""
-        return self._create_status("ERROR", message, last_log, last_log_time)
+        return self._create_status("ERROR", message, last_log, last_log_time, scan)
+
+    def timeout_status(self, message: str) -> ServiceStatus:
+        """TIMEOUT 상태의 ServiceStatus 생성 (제한시간 내에 check가 끝나지 않음)"""
+        return self._create_status("TIMEOUT", message)
+
+    def scan_logfile(self, log_file: str) -> LogScanResult:
+        '''log_file의 ERROR 건수와 첫/마지막 ERROR 위치, 마지막 ERROR 주변 줄을 반환합니다.
+        지난 점검 이후 추가된 부분만 읽고, 이전까지의 결과는 커서에 누적되어 있습니다.'''
+        return log_cursor_store.scan(log_file)
 
     def result_of_logfile(self, log_file):
         '''log_file을 읽어서 ERROR가 있으면 ERROR, 없으면 OK를 반환합니다.'''
         try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                for line in lines:
-                    if "ERROR" in line:
-                        return "ERROR"
-                return "OK"
+            return "ERROR" if self.scan_logfile(log_file).error_count > 0 else "OK"
         except Exception as e:
             return f"Error reading log file: {str(e)}"
 
@@ -86,33 +113,46 @@ class BaseService(ABC):
         except Exception:
             return None
 
-    def _process_is_running(self, program: str):
-            """
-            주어진 프로그램이 현재 실행 중인지 확인합니다.
-            """
-            try:
-                # tasklist 명령어로 현재 실행 중인 프로세스 목록 가져오기
-                result = subprocess.run(
-                    ['tasklist', '/FI', f'IMAGENAME eq {os.path.basename(program)}'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0:
-                    output = result.stdout.lower()
-                    return os.path.basename(program).lower() in output
-                
-                return False
-                
-            except Exception as e:
-                logger.error(f"Error checking process: {str(e)}")
-                return False
-        
-    def _run(self):
-        """ 프로그램을 실행한다. """
-        program = self.retry_program
+    def _process_is_running(self, program: str) -> bool:
+        """
+        batmon 밖에서(작업 스케줄러 등) program 이 실행 중인지 확인합니다.
+        프로세스 명령줄에 program 경로가 있는지로 판단합니다. (.bat 은 cmd.exe 의 인자로 나타남)
+        """
+        import psutil
+
+        target = os.path.normcase(os.path.abspath(program))
+        folder, name = os.path.split(target)
+        try:
+            for proc in psutil.process_iter(["cmdline"]):
+                for arg in proc.info.get("cmdline") or []:
+                    arg = os.path.normcase(arg)
+                    if os.path.basename(arg) != name:
+                        continue
+                    if os.path.isabs(arg):
+                        if os.path.abspath(arg) == target:
+                            return True
+                        continue
+                    # 상대 경로로 실행했으면 작업 폴더로 확인
+                    try:
+                        if os.path.normcase(proc.cwd()) == folder:
+                            return True
+                    except (psutil.AccessDenied, psutil.NoSuchProcess):
+                        continue
+            return False
+        except Exception as e:
+            logger.error(f"Error checking process: {str(e)}")
+            return False
+
+    def start_job(self):
+        """
+        retry_program 을 작업 관리자(job_manager)로 실행한다. → (작업, 새로 만들었는지)
+        batmon 이 실행한 같은 프로그램이 대기/실행 중이면 그 작업을 돌려준다.
+        batmon 밖에서 실행 중이면 JobError, 프로그램이 없으면 ValueError/FileNotFoundError.
+        """
+        # health_check → base_service 순환 import 를 피하려고 여기서 import
+        from backend.domains.services.job_manager import JobError, job_manager
 
+        program = self.retry_program
         if not program:
             raise ValueError("실행할 프로그램이 지정되지 않았습니다.")
 
@@ -120,17 +160,26 @@ class BaseService(ABC):
         if not program_path.exists():
             raise FileNotFoundError(f"실행할 프로그램이 존재하지 않습니다: {program_path}")
 
+        active = job_manager.active(self.name)
+        if not active and self._process_is_running(program):
+            raise JobError(f"{self.name} 프로그램이 batmon 밖에서 이미 실행 중입니다.")
+        return job_manager.submit(self.name, str(program_path), self.max_concurrent)
+
+    def rerun(self) -> ServiceStatus:
+        """
+        retry_program을 재실행합니다. (작업 관리자로 실행, 진행/출력은 /api/v1/batmon/jobs)
+        """
         try:
-            subprocess.Popen(
-                ["cmd", "/c", str(program_path)],
-                cwd=program_path.parent,
-                shell=False,
-                close_fds=True,
-                creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
-            )
-            return
+            logger.info(f"{self.name} 서비스 재실행 요청")
+            job, created = self.start_job()
+            if not created:
+                state = "대기 중" if job.status == "QUEUED" else "실행 중"
+                return self.success_status(f"{self.name} 서비스가 이미 {state}입니다. (작업 {job.id})")
+            if job.status == "QUEUED":
+                return self.success_status(f"{self.name} 서비스 재실행이 대기열에 들어갔습니다. (작업 {job.id})")
+            return self.success_status(f"{self.name} 서비스가 재실행되었습니다. (작업 {job.id})")
         except Exception as e:
-            raise RuntimeError(f"실행 실패: {program_path} ({e})")
+            return self.error_status(f"프로그램 실행 실패: {str(e)}")
 
     @abstractmethod
     def check(self) -> ServiceStatus:
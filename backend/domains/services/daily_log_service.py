@@ -0,0 +1,55 @@
+import os
+from datetime import datetime
+from typing import Optional
+
+from backend.core.logger import get_logger
+from backend.domains.batmon_schema import ServiceStatus
+from backend.domains.services.base_service import BaseService
+
+logger = get_logger(__name__)
+
+class DailyLogService(BaseService):
+    """
+    날짜별 로그파일을 남기는 일반 배치 프로그램용 서비스 (BATMON.yml type: "daily_log").
+    코드 수정 없이 BATMON.yml 설정만으로 프로그램을 추가할 수 있다.
+
+        - name: "my_batch"
+          type: "daily_log"
+          base_dir: "c:\\my_batch"
+          log_dir: "log"                       # 생략 시 "log"
+          log_file: "my_batch_%Y_%m_%d.log"    # 생략 시 "{name}_%Y_%m_%d.log"
+    """
+    def __init__(self, program_name: str, program_config: Optional[dict] = None):
+        super().__init__(program_name, program_config)
+        program_config = program_config or {}
+        self.log_dir = os.path.join(self.base_dir, program_config.get('log_dir') or "log")
+        self.log_file_format = program_config.get('log_file') or f"{self.name}_%Y_%m_%d.log"
+
+    def check(self) -> ServiceStatus:
+        """
+        오늘 날짜의 로그파일이 있는지, 그 안에 ERROR가 있는지 체크합니다.
+        """
+        try:
+            logger.info(f"{self.name} 서비스 상태 체크 시작")
+            if not os.path.exists(self.base_dir):
+                return self.error_status(f"설치 폴더가 존재하지 않습니다: {self.base_dir}")
+            if not os.path.exists(self.log_dir):
+                return self.error_status(f"로그 폴더가 존재하지 않습니다: {self.log_dir}")
+
+            last_log_file = self._get_last_log()
+            if not os.path.exists(last_log_file):
+                return self.error_status(f"오늘의 로그 파일을 찾을 수 없습니다: {last_log_file}")
+
+            scan = self.scan_logfile(last_log_file)
+            last_log_time = self.get_last_log_time(last_log_file)
+            if scan.error_count > 0:
+                return self.error_status(f"로그 파일에서 오류를 발견했습니다: {last_log_file} ({scan.error_count}건, 마지막 {scan.last_error_line}번째 줄)",
+                                         os.path.basename(last_log_file), last_log_time, scan)
+            return self.success_status(f"{self.name} 정상동작 중입니다", os.path.basename(last_log_file), last_log_time, scan)
+
+        except Exception as e:
+            return self.error_status(f"Error checking service: {str(e)}")
+
+    def _get_last_log(self) -> str:
+        """오늘 날짜의 로그파일 경로"""
+        return os.path.join(self.log_dir, datetime.now().strftime(self.log_file_format))
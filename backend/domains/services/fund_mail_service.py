@@ -10,8 +10,8 @@ from backend.domains.services.base_service import BaseService
 logger = get_logger(__name__)
 
 class FundMailService(BaseService):
-    def __init__(self, program_name: str = "fund_mail"):
-        super().__init__(program_name)
+    def __init__(self, program_name: str = "fund_mail", program_config: Optional[dict] = None):
+        super().__init__(program_name, program_config)
         self.log_dir = os.path.join(self.base_dir, "logs")
         self.data_dir = os.path.join(self.base_dir, "data")
     
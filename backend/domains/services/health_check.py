@@ -0,0 +1,100 @@
+# health_check.py
+"""
+모듈 설명:
+    - 여러 프로그램의 check()를 제한된 스레드풀에서 동시에 수행한다.
+    - 프로그램별 제한시간(check_timeout)을 넘기면 TIMEOUT ServiceStatus로 대체한다.
+주요 기능:
+    - run_checks: 서비스 목록을 동시에 점검하여 ServiceStatus 목록을 반환
+    - build_health_response: ServiceStatus 목록을 HealthCheckResponse로 집계
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from backend.core.config import config
+from backend.core.logger import get_logger
+from backend.domains.batmon_schema import HealthCheckResponse, ServiceStatus
+from backend.domains.services.base_service import BaseService
+
+logger = get_logger(__name__)
+
+KST = timezone(timedelta(hours=9))
+
+# 점검 전용 스레드풀 (FastAPI 요청 스레드풀과 분리)
+_executor = ThreadPoolExecutor(max_workers=config.CHECK_MAX_WORKERS, thread_name_prefix="batmon-check")
+
+# 프로그램별로 아직 끝나지 않은 check (멈춘 check가 풀을 계속 차지하지 않도록 중복 제출을 막는다)
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _submit(service: BaseService) -> Future:
+    """서비스의 check()를 스레드풀에 제출. 이전 check가 아직 실행 중이면 그 Future를 재사용"""
+    with _inflight_lock:
+        future = _inflight.get(service.name)
+        if future is not None and not future.done():
+            logger.warning(f"{service.name}: 이전 check가 아직 끝나지 않아 결과를 기다립니다.")
+            return future
+        future = _executor.submit(service.check)
+        _inflight[service.name] = future
+        return future
+
+
+def run_checks(services: List[BaseService]) -> List[ServiceStatus]:
+    """
+    서비스들의 check()를 동시에 수행한다.
+    - 전체 소요시간은 가장 느린 check 정도가 된다.
+    - 각 check는 요청 시작 시점부터 자신의 check_timeout 안에 끝나야 하며,
+      넘기면 TIMEOUT 상태를 돌려준다. (멈춘 check는 백그라운드에서 계속 실행됨)
+    """
+    started = time.monotonic()
+    futures = [(service, _submit(service)) for service in services]
+
+    results: List[ServiceStatus] = []
+    for service, future in futures:
+        remaining = service.check_timeout - (time.monotonic() - started)
+        try:
+            results.append(future.result(timeout=max(0.0, remaining)))
+        except FutureTimeoutError:
+            logger.error(f"{service.name}: check 제한시간({service.check_timeout}초) 초과")
+            results.append(service.timeout_status(f"상태 점검이 제한시간({service.check_timeout:g}초) 안에 끝나지 않았습니다."))
+        except Exception as e:
+            logger.exception(f"{service.name}: check 실패: {e}")
+            results.append(service.error_status(f"Error checking service: {str(e)}"))
+    return results
+
+
+def build_health_response(services: List[ServiceStatus], snapshot_version: Optional[int] = None) -> HealthCheckResponse:
+    """ServiceStatus 목록으로 전체 상태를 집계한다."""
+    ok_count = sum(1 for service in services if service.status == "OK")
+    # TIMEOUT도 정상 확인이 안 된 것이므로 오류로 집계
+    error_count = sum(1 for service in services if service.status in ("ERROR", "TIMEOUT"))
+    total_services = len(services)
+
+    # 허브 모드: 에이전트에서 새 결과를 받지 못한 서비스
+    stale_count = sum(1 for service in services if service.stale)
+
+    # 전체 상태 판단
+    if error_count > 0:
+        overall_status = "ERROR"
+        summary = f"{error_count}개의 서비스에서 오류가 발생했습니다."
+    elif stale_count > 0:
+        overall_status = "WARNING"
+        summary = f"{stale_count}개 서비스의 결과가 오래되었습니다. (에이전트 응답 없음)"
+    else:
+        overall_status = "OK"
+        summary = "모든 서비스가 정상적으로 동작 중입니다."
+
+    return HealthCheckResponse(
+        timestamp=datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S"),
+        overall_status=overall_status,
+        services=services,
+        summary=summary,
+        total_services=total_services,
+        ok_count=ok_count,
+        error_count=error_count,
+        snapshot_version=snapshot_version
+    )
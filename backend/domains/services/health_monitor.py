@@ -0,0 +1,236 @@
+# health_monitor.py
+"""
+모듈 설명:
+    - 백그라운드 스레드에서 프로그램별 주기(check_interval)로 check를 수행하고
+      최신 ServiceStatus를 메모리 스냅샷으로 보관한다. 모든 점검 결과는 batmon_db에 이력으로 남긴다.
+    - /api/v1/batmon/check 는 파일시스템을 다시 읽지 않고 스냅샷만 읽어서 응답한다.
+    - 점검 결과가 바뀐 프로그램은 이벤트로 만들어 구독자(/api/v1/batmon/stream)에게 바로 보낸다.
+주요 기능:
+    - HealthMonitor.start / stop: startup/shutdown 이벤트에서 호출
+    - HealthMonitor.snapshot: (버전, 점검 결과 목록) 반환, 각 결과에는 checked_at(점검 시각)과 age_seconds 포함
+    - HealthMonitor.version: 스냅샷 버전 (/check 의 ETag). 점검 결과가 바뀔 때만 증가 (checked_at/age_seconds 는 제외)
+    - HealthMonitor.refresh: 동기 점검 후 스냅샷 갱신 (?fresh=1)
+    - HealthMonitor.subscribe / unsubscribe: 변경 이벤트 구독 (Last-Event-ID 이후 이벤트 재전송)
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from backend.core.batmon_db import batmon_db
+from backend.core.config import config
+from backend.core.logger import get_logger
+from backend.domains.batmon_schema import ServiceStatus
+from backend.domains.services.base_service import BaseService
+from backend.domains.services.health_check import KST, build_health_response, run_checks
+from backend.domains.services.service_registry import service_registry
+
+logger = get_logger(__name__)
+
+# 변경 여부 비교에서 제외하는 필드 (점검할 때마다 바뀌는 값)
+_VOLATILE_FIELDS = {"last_updated", "age_seconds", "checked_at"}
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    status: ServiceStatus
+    checked_at: float  # time.monotonic() 기준
+
+
+@dataclass(frozen=True)
+class HealthEvent:
+    id: int      # 이벤트 순번 (SSE id)
+    event: str   # "status" | "removed" | "snapshot"
+    data: str    # JSON 문자열
+
+
+@dataclass
+class Subscription:
+    loop: asyncio.AbstractEventLoop
+    queue: "asyncio.Queue[Optional[HealthEvent]]"
+
+
+class HealthMonitor:
+    # 다음 점검 시각까지 기다리는 최대 시간(초). BATMON.yml 변경을 이 주기로 반영한다.
+    MAX_SLEEP = 1.0
+    # 재접속(Last-Event-ID) 시 다시 보내줄 수 있도록 보관하는 최근 이벤트 수
+    EVENT_BUFFER = 256
+    # 구독자별 미전송 이벤트 상한 (넘치면 구독을 끊고, 클라이언트는 재접속해서 따라잡는다)
+    SUBSCRIBER_QUEUE = 256
+
+    def __init__(self):
+        self._entries: Dict[str, SnapshotEntry] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._next_due: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # 변경 이벤트
+        self._event_id = 0
+        self._events: Deque[HealthEvent] = deque(maxlen=self.EVENT_BUFFER)
+        self._subscribers: List[Subscription] = []
+
+    # --- 수명주기 ------------------------------------------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="batmon-health-monitor", daemon=True)
+        self._thread.start()
+        logger.info("백그라운드 상태 점검 시작")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        # 열려 있는 스트림 종료
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for sub in subscribers:
+            self._deliver(sub, None)
+        logger.info("백그라운드 상태 점검 종료")
+
+    # --- 조회 ----------------------------------------------------------------
+    @property
+    def version(self) -> int:
+        """점검 결과가 바뀔 때마다(프로그램 추가/삭제 포함) 1씩 증가하는 스냅샷 버전"""
+        return self._version
+
+    def snapshot(self) -> Tuple[int, List[ServiceStatus]]:
+        """
+        (스냅샷 버전, BATMON.yml 순서의 ServiceStatus 목록)을 반환.
+        아직 한 번도 점검되지 않은 프로그램은 이 자리에서 동기로 점검한다.
+        """
+        names = [p["name"] for p in config.list_programs()]
+        entries = self._entries
+        missing = [name for name in names if name not in entries]
+        if missing:
+            self._check(missing)
+            entries = self._entries
+
+        now = time.monotonic()
+        statuses = [
+            entries[name].status.model_copy(update={"age_seconds": round(now - entries[name].checked_at, 3)})
+            for name in names if name in entries
+        ]
+        return self._version, statuses
+
+    def refresh(self) -> Tuple[int, List[ServiceStatus]]:
+        """모든 프로그램을 지금 점검하여 스냅샷을 갱신한 뒤 반환 (?fresh=1)"""
+        self._check([p["name"] for p in config.list_programs()])
+        return self.snapshot()
+
+    # --- 변경 이벤트 구독 ------------------------------------------------------
+    def subscribe(self, last_event_id: Optional[int] = None) -> Tuple[Subscription, List[HealthEvent]]:
+        """
+        구독을 등록하고 (구독, 먼저 보내야 할 이벤트 목록)을 반환. 이벤트 루프 안에서 호출할 것.
+        - last_event_id 이후 이벤트가 버퍼에 모두 남아 있으면 그 이벤트들만 돌려준다.
+        - 처음 접속이거나 너무 오래되어 버퍼에 없으면 현재 전체 상태(snapshot 이벤트)를 돌려준다.
+        """
+        sub = Subscription(asyncio.get_running_loop(), asyncio.Queue(self.SUBSCRIBER_QUEUE))
+        with self._lock:
+            self._subscribers.append(sub)
+            oldest = self._events[0].id if self._events else self._event_id + 1
+            if last_event_id is not None and oldest <= last_event_id + 1 and last_event_id <= self._event_id:
+                return sub, [e for e in self._events if e.id > last_event_id]
+            event_id, entries = self._event_id, self._entries
+
+        names = [p["name"] for p in config.list_programs()]
+        now = time.monotonic()
+        statuses = [
+            entries[name].status.model_copy(update={"age_seconds": round(now - entries[name].checked_at, 3)})
+            for name in names if name in entries
+        ]
+        response = build_health_response(statuses, snapshot_version=self._version)
+        return sub, [HealthEvent(event_id, "snapshot", response.model_dump_json())]
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def _deliver(self, sub: Subscription, event: Optional[HealthEvent]):
+        """다른 스레드에서 구독자의 asyncio.Queue에 안전하게 넣는다."""
+        def put():
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 너무 밀린 구독자는 끊는다 (재접속 시 Last-Event-ID로 따라잡음)
+                self.unsubscribe(sub)
+                sub.queue.get_nowait()
+                sub.queue.put_nowait(None)
+        try:
+            sub.loop.call_soon_threadsafe(put)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힘
+            self.unsubscribe(sub)
+
+    def _publish(self, events: List[Tuple[str, str]]):
+        """(event, data) 목록에 순번을 붙여 버퍼에 보관하고 구독자에게 보낸다. self._lock 안에서 호출"""
+        for name, data in events:
+            self._event_id += 1
+            event = HealthEvent(self._event_id, name, data)
+            self._events.append(event)
+            for sub in list(self._subscribers):
+                self._deliver(sub, event)
+
+    # --- 내부 ----------------------------------------------------------------
+    def _check(self, names: List[str]):
+        """names에 해당하는 프로그램들을 동시에 점검하고 스냅샷에 반영"""
+        services: List[BaseService] = [s for s in (service_registry.get(name) for name in names) if s is not None]
+        if not services:
+            return
+
+        checked_wall = datetime.now(KST)
+        statuses = [status.model_copy(update={"checked_at": checked_wall}) for status in run_checks(services)]
+        checked_at = time.monotonic()
+        batmon_db.record_checks(statuses)
+        valid = {p["name"] for p in config.list_programs()}
+        with self._lock:
+            events: List[Tuple[str, str]] = []
+            entries = {}
+            for name, entry in self._entries.items():
+                if name in valid:
+                    entries[name] = entry
+                else:
+                    events.append(("removed", json.dumps({"name": name})))
+            for service, status in zip(services, statuses):
+                previous = entries.get(service.name)
+                if previous is None or self._changed(previous.status, status):
+                    events.append(("status", status.model_copy(update={"age_seconds": 0.0}).model_dump_json()))
+                entries[service.name] = SnapshotEntry(status, checked_at)
+                self._next_due[service.name] = checked_at + service.check_interval
+            # 통째로 교체하므로 읽는 쪽은 락 없이 참조만 가져가면 된다.
+            self._entries = entries
+            # 결과가 바뀌었거나 프로그램이 추가/삭제되었을 때만 버전을 올린다 (/check 의 304 가 유지되도록)
+            if events:
+                self._version += 1
+                self._publish(events)
+
+    @staticmethod
+    def _changed(old: ServiceStatus, new: ServiceStatus) -> bool:
+        return old.model_dump(exclude=_VOLATILE_FIELDS) != new.model_dump(exclude=_VOLATILE_FIELDS)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            names: List[str] = []
+            try:
+                names = [p["name"] for p in config.list_programs()]
+                now = time.monotonic()
+                due = [name for name in names if self._next_due.get(name, 0) <= now]
+                if due:
+                    self._check(due)
+            except Exception as e:
+                logger.exception(f"백그라운드 상태 점검 실패: {e}")
+
+            next_due = min((self._next_due.get(name, 0) for name in names), default=time.monotonic() + self.MAX_SLEEP)
+            self._stop.wait(min(self.MAX_SLEEP, max(0.05, next_due - time.monotonic())))
+
+
+# 단일톤
+health_monitor = HealthMonitor()
@@ -0,0 +1,414 @@
+# hub_poller.py
+"""
+모듈 설명:
+    - 허브 모드: BATMON.yml agents 에 적힌 다른 batmon(에이전트)의 /api/v1/batmon/check 와 /api/v1/system/info 를
+      백그라운드에서 주기(HUB_INTERVAL)마다 조회해서 마지막 결과를 보관한다. /check 는 이 결과를 합쳐서 응답한다.
+    - 에이전트들은 스레드풀(HUB_MAX_WORKERS)에서 동시에 조회하므로, 전체를 새로 받는 데 가장 느린 에이전트 하나의 시간만 걸린다.
+      한 에이전트의 check 와 info 도 두 연결로 동시에 조회한다. (info 는 별도 스레드풀)
+    - 에이전트마다 keep-alive 연결(http.client)을 재사용하고, ETag(If-None-Match)로 바뀌지 않은 결과는 304 로 받는다.
+    - 이전 조회가 끝나지 않은 에이전트는 새로 조회하지 않고 건너뛴다(skipped). 느린 에이전트가 스레드를 쌓지 않는다.
+    - 조회가 실패했거나 마지막 성공이 HUB_STALE 초보다 오래되면 그 에이전트의 결과는 stale 로 표시한다.
+    - 에이전트는 ?local=1 로 조회하므로 허브끼리 서로 등록해도 결과가 되풀이되지 않는다.
+    - /check 는 조회를 기다리지 않는다. 아직 응답을 받지 못한 에이전트는 ERROR("아직 응답을 받지 못했습니다.")로 보여준다.
+주요 기능:
+    - HubPoller.start / stop: startup/shutdown 이벤트에서 호출
+    - HubPoller.active: BATMON.yml 에 agents 가 있는지 (허브 모드)
+    - HubPoller.merged: (버전, 에이전트 서비스 목록, 에이전트 상태 목록)
+    - HubPoller.refresh: 모든 에이전트를 지금 조회하고 끝날 때까지 기다린 뒤 merged (?fresh=1)
+    - HubPoller.version: 에이전트 결과가 바뀔 때마다 1씩 증가 (/check 의 ETag)
+"""
+import gzip
+import http.client
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from backend.core.config import config
+from backend.core.logger import get_logger
+from backend.domains.batmon_schema import AgentStatus, HealthCheckResponse, ServiceStatus
+from backend.domains.services.health_check import KST
+from backend.domains.system_schema import SystemSummary
+
+logger = get_logger(__name__)
+
+CHECK_PATH = "/api/v1/batmon/check?local=1"
+INFO_PATH = "/api/v1/system/info"
+
+
+class AgentError(Exception):
+    """에이전트가 200/304 가 아닌 응답을 보냄"""
+
+
+class _ConnectionPool:
+    """
+    에이전트 하나의 keep-alive 연결 모음. 다 쓴 연결은 돌려놓았다가 다음 조회에서 다시 쓴다.
+    에이전트마다 동시에 한 번만 조회하고 그 안에서 check/info 를 동시에 받으므로 연결 두 개면 충분하다. (MAX_IDLE 개까지 보관)
+    """
+    MAX_IDLE = 2
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path.rstrip("/")
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def get(self, path: str, timeout: float, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """GET → (status, 소문자 헤더, 본문). gzip 본문은 풀어서 돌려준다"""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = self._connection_class(self._host, self._port, timeout=timeout)
+            else:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+            try:
+                conn.request("GET", self._prefix + path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except Exception as e:
+                conn.close()
+                # 쉬는 동안 에이전트가 닫은 keep-alive 연결이면 새 연결로 한 번 더
+                if reused and isinstance(e, (ConnectionResetError, BrokenPipeError)):
+                    conn, reused = None, False
+                    continue
+                raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                if len(self._idle) < self.MAX_IDLE:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+        response_headers = {k.lower(): v for k, v in response.getheaders()}
+        if response_headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        return response.status, response_headers, body
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+@dataclass(eq=False)
+class _Agent:
+    name: str
+    url: str
+    timeout: float
+    pool: _ConnectionPool
+    check: Optional[HealthCheckResponse] = None
+    info: Optional[SystemSummary] = None
+    etags: Dict[str, str] = field(default_factory=dict)  # 경로 → 마지막 ETag
+    fetched_at: Optional[float] = None      # 마지막 성공 조회 시각 (time.monotonic())
+    fetched_wall: Optional[datetime] = None # 마지막 성공 조회 시각 (AgentStatus.fetched_at)
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None             # 마지막 조회 오류 (성공하면 None)
+    timed_out: bool = False
+    skipped: int = 0
+    stale: bool = True
+    next_due: float = 0.0
+    future: Optional[Future] = None         # 진행 중인 조회
+
+    def is_stale(self, now: float) -> bool:
+        return self.error is not None or self.fetched_at is None or now - self.fetched_at > config.HUB_STALE
+
+    def busy(self) -> bool:
+        return self.future is not None and not self.future.done()
+
+
+def _describe(e: Exception, timeout: float) -> str:
+    if isinstance(e, (socket.timeout, TimeoutError)):
+        return f"{timeout:g}초 안에 응답이 없습니다."
+    if isinstance(e, ConnectionRefusedError):
+        return "연결이 거부되었습니다. (batmon 이 실행 중인지 확인)"
+    return f"{type(e).__name__}: {e}"
+
+
+class HubPoller:
+    # 다음 조회 시각까지 기다리는 최대 시간(초). BATMON.yml agents 변경을 이 주기로 반영한다.
+    MAX_SLEEP = 1.0
+
+    def __init__(self):
+        self._agents: Dict[str, _Agent] = {}    # BATMON.yml 순서
+        self._key: tuple = ()                   # 현재 _agents 를 만든 설정 (name, url, timeout)
+        self._version = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._info_executor: Optional[ThreadPoolExecutor] = None   # check 와 동시에 받는 info
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- 수명주기 ------------------------------------------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        # agents 가 없으면 스레드풀은 스레드를 만들지 않는다 (BATMON.yml 에 나중에 추가해도 반영)
+        self._executor = ThreadPoolExecutor(max_workers=config.HUB_MAX_WORKERS, thread_name_prefix="batmon-hub")
+        self._info_executor = ThreadPoolExecutor(max_workers=config.HUB_MAX_WORKERS, thread_name_prefix="batmon-hub-info")
+        self._thread = threading.Thread(target=self._loop, name="batmon-hub-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        for executor in (self._executor, self._info_executor):
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._info_executor = None
+        with self._lock:
+            agents, self._agents, self._key = list(self._agents.values()), {}, ()
+        for agent in agents:
+            agent.pool.close()
+
+    # --- 조회 ----------------------------------------------------------------
+    @property
+    def active(self) -> bool:
+        return bool(config.snapshot().agents)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def merged(self) -> Tuple[int, List[ServiceStatus], List[AgentStatus]]:
+        """
+        (버전, 에이전트별 서비스 목록, 에이전트 상태 목록). 서비스에는 host(에이전트 이름)와 stale 을 붙인다.
+        조회를 기다리지 않는다. 아직 한 번도 조회하지 않은 에이전트(시작 직후, 새로 추가)는 조회만 시작해 두고,
+        결과를 하나도 받지 못한 에이전트는 에이전트 자체를 ERROR/TIMEOUT 서비스 하나로 보여준다.
+        (조회가 끝나면 버전이 바뀌므로 다음 /check 에서 결과가 보인다)
+        """
+        agents = self._sync()
+        now = time.monotonic()
+        for agent in agents:
+            if agent.fetched_at is None and agent.error is None:
+                self._submit(agent, now)
+
+        services: List[ServiceStatus] = []
+        statuses: List[AgentStatus] = []
+        with self._lock:
+            version = self._version
+            for agent in agents:
+                stale = agent.is_stale(now)
+                age = None if agent.fetched_at is None else round(now - agent.fetched_at, 3)
+                if agent.check is not None:
+                    for service in agent.check.services:
+                        services.append(service.model_copy(update={
+                            "host": agent.name,
+                            "stale": stale,
+                            # 에이전트가 점검한 뒤 지난 시간 + 허브가 받은 뒤 지난 시간
+                            "age_seconds": None if service.age_seconds is None else round(service.age_seconds + age, 3),
+                        }))
+                else:
+                    services.append(ServiceStatus(
+                        name=agent.name,
+                        description=f"batmon 에이전트 {agent.url}",
+                        status="TIMEOUT" if agent.timed_out else "ERROR",
+                        message=agent.error or "아직 응답을 받지 못했습니다.",
+                        base_dir=agent.url,
+                        scheduler="",
+                        run_time=[],
+                        retry_program="",
+                        retry_program_name="",
+                        host=agent.name,
+                        stale=True,
+                    ))
+                statuses.append(AgentStatus(
+                    name=agent.name,
+                    url=agent.url,
+                    status="OK" if not stale else ("STALE" if agent.check is not None else "ERROR"),
+                    message=agent.error,
+                    stale=stale,
+                    latency_ms=agent.latency_ms,
+                    age_seconds=age,
+                    fetched_at=agent.fetched_wall,
+                    skipped=agent.skipped,
+                    snapshot_version=agent.check.snapshot_version if agent.check is not None else None,
+                    system=agent.info,
+                ))
+        return version, services, statuses
+
+    def refresh(self) -> Tuple[int, List[ServiceStatus], List[AgentStatus]]:
+        """모든 에이전트를 지금 조회하고(진행 중이면 그 조회를) 기다린 뒤 merged (?fresh=1)"""
+        self._wait(self._sync())
+        return self.merged()
+
+    # --- 내부 ----------------------------------------------------------------
+    def _sync(self) -> List[_Agent]:
+        """BATMON.yml agents 와 맞춘다. 주소가 그대로인 에이전트는 결과와 연결을 유지한다."""
+        items = config.snapshot().agents
+        key = tuple((a["name"], a["url"], a["timeout"]) for a in items)
+        with self._lock:
+            if key != self._key:
+                current = self._agents
+                agents: Dict[str, _Agent] = {}
+                for item in items:
+                    agent = current.get(item["name"])
+                    if agent is None or agent.url != item["url"]:
+                        agent = _Agent(item["name"], item["url"], item["timeout"], _ConnectionPool(item["url"]))
+                    agent.timeout = item["timeout"]
+                    agents[item["name"]] = agent
+                for name, agent in current.items():
+                    if agents.get(name) is not agent:
+                        agent.pool.close()
+                self._agents, self._key = agents, key
+                self._version += 1
+                if agents:
+                    logger.info(f"허브 모드: 에이전트 {len(agents)}개 조회 ({', '.join(agents)})")
+            return list(self._agents.values())
+
+    def _submit(self, agent: _Agent, now: float, background: bool = False) -> Optional[Future]:
+        """
+        조회를 시작한다. 이전 조회가 아직 진행 중이면 새로 시작하지 않고 그 Future 를 돌려준다.
+        (background 이면 건너뛴 횟수를 센다)
+        """
+        with self._lock:
+            executor = self._executor
+            if executor is None:
+                return None
+            if agent.busy():
+                if background:
+                    agent.skipped += 1
+                    agent.next_due = now + config.HUB_INTERVAL
+                    logger.debug(f"에이전트 조회 건너뜀 (이전 조회 진행 중): {agent.name}")
+                return agent.future
+            agent.next_due = now + config.HUB_INTERVAL
+            agent.future = executor.submit(self._poll, agent)
+            return agent.future
+
+    def _wait(self, agents: List[_Agent]):
+        """agents 를 동시에 조회하고 끝날 때까지 기다린다 (가장 느린 에이전트의 제한시간까지)"""
+        now = time.monotonic()
+        futures = [f for f in (self._submit(agent, now) for agent in agents) if f is not None]
+        if futures:
+            # check 와 info 는 동시에 받으므로 제한시간 + 여유
+            wait(futures, timeout=max(agent.timeout for agent in agents) + 1)
+
+    def _fetch(self, agent: _Agent, path: str, model):
+        """200 이면 model 로 읽은 값, 304(바뀌지 않음)이면 None"""
+        headers = {"Accept": "application/json", "Accept-Encoding": "gzip"}
+        etag = agent.etags.get(path)
+        if etag:
+            headers["If-None-Match"] = etag
+        status, response_headers, body = agent.pool.get(path, agent.timeout, headers)
+        if status == 304:
+            return None
+        if status != 200:
+            raise AgentError(f"{path.split('?')[0]} 응답 코드 {status}")
+        value = model.model_validate_json(body)
+        if "etag" in response_headers:
+            agent.etags[path] = response_headers["etag"]
+        return value
+
+    def _fetch_info(self, agent: _Agent) -> Optional[Future]:
+        """info 조회를 별도 스레드풀에서 시작 (종료 중이면 None)"""
+        executor = self._info_executor
+        if executor is None:
+            return None
+        try:
+            return executor.submit(self._fetch, agent, INFO_PATH, SystemSummary)
+        except RuntimeError:
+            return None     # stop() 과 겹침
+
+    @staticmethod
+    def _info_result(agent: _Agent, future: Optional[Future]) -> Optional[SystemSummary]:
+        """info 조회 결과. 304/실패이면 None (이전 값을 유지)"""
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=agent.timeout + 1)
+        except Exception as e:
+            logger.debug(f"에이전트 시스템 정보 조회 실패: {agent.name}: {_describe(e, agent.timeout)}")
+            return None
+
+    def _poll(self, agent: _Agent):
+        """
+        에이전트 하나 조회 (스레드풀). check 와 info 를 동시에 받는다.
+        check 가 실패하면 에이전트 오류, info 실패는 이전 값을 유지
+        """
+        started = time.monotonic()
+        info_future = self._fetch_info(agent)
+        try:
+            check = self._fetch(agent, CHECK_PATH, HealthCheckResponse)
+        except Exception as e:
+            error = _describe(e, agent.timeout)
+            # info 는 받았으면 보관 (ETag 가 이미 갱신되어 다음 조회는 304 이므로)
+            info = self._info_result(agent, info_future)
+            with self._lock:
+                if info is not None:
+                    agent.info = info
+                    self._version += 1
+                agent.latency_ms = round((time.monotonic() - started) * 1000, 1)
+                agent.timed_out = isinstance(e, (socket.timeout, TimeoutError))
+                if agent.error != error:
+                    logger.warning(f"에이전트 조회 실패: {agent.name} ({agent.url}): {error}")
+                    agent.error = error
+                    agent.stale = True
+                    self._version += 1
+            return
+
+        info = self._info_result(agent, info_future)
+        with self._lock:
+            changed = check is not None or info is not None or agent.stale
+            if check is not None:
+                agent.check = check
+            if info is not None:
+                agent.info = info
+            if agent.error is not None:
+                logger.info(f"에이전트 조회 복구: {agent.name} ({agent.url})")
+            agent.error = None
+            agent.timed_out = False
+            agent.stale = False
+            agent.fetched_at = time.monotonic()
+            agent.fetched_wall = datetime.now(KST)
+            agent.latency_ms = round((agent.fetched_at - started) * 1000, 1)
+            if changed:
+                self._version += 1
+
+    def _mark_stale(self, agents: List[_Agent], now: float):
+        """HUB_STALE 이 지난 에이전트를 stale 로 바꾼다 (/check 의 ETag 가 바뀌도록 버전 증가)"""
+        with self._lock:
+            for agent in agents:
+                stale = agent.is_stale(now)
+                if stale != agent.stale:
+                    agent.stale = stale
+                    self._version += 1
+
+    def _loop(self):
+        while not self._stop.is_set():
+            agents: List[_Agent] = []
+            try:
+                agents = self._sync()
+                now = time.monotonic()
+                for agent in agents:
+                    if agent.next_due <= now:
+                        self._submit(agent, now, background=True)
+                self._mark_stale(agents, now)
+            except Exception as e:
+                logger.exception(f"에이전트 조회 실패: {e}")
+
+            now = time.monotonic()
+            next_due = min((agent.next_due for agent in agents), default=now + self.MAX_SLEEP)
+            self._stop.wait(min(self.MAX_SLEEP, max(0.05, next_due - now)))
+
+
+# 단일톤
+hub_poller = HubPoller()
@@ -0,0 +1,514 @@
+# job_manager.py
+"""
+모듈 설명:
+    - 프로그램 실행(retry_program) 작업 관리자. 실행 요청은 작업(Job)이 되고, 프로세스/출력/종료 코드를 추적한다.
+    - 동시에 실행하는 작업 수를 전체(JOB_MAX_CONCURRENT)와 프로그램별(BATMON.yml max_concurrent, 기본 JOB_MAX_PER_PROGRAM)로 제한한다.
+      전체 한도가 차면 대기열(JOB_QUEUE_SIZE)에 넣어 두었다가 자리가 나면 요청 순서대로 실행한다.
+    - 같은 프로그램이 이미 대기 중이거나 프로그램별 한도만큼 실행 중이면 새로 만들지 않고 그 작업을 돌려준다. (중복 실행 방지)
+    - stdout/stderr 는 파이프가 아니라 작업별 파일(LOG_DIR/jobs/<id>.stdout.log, <id>.stderr.log)로 보낸다.
+      batmon 이 먼저 종료되어도 프로세스가 SIGPIPE 없이 끝까지 실행되고 출력도 파일에 남는다.
+      작업 스레드가 그 파일을 따라 읽어(tail) 최근 JOB_OUTPUT_LINES 줄만 메모리(ring buffer)에 두고, 구독자(/jobs/{id}/stream)에게 알린다.
+    - 상태가 바뀔 때마다 batmon_db(job_history)에 기록한다. (시작/종료 시각, 종료 코드, 마지막 출력 몇 줄)
+      batmon 이 재시작되면 끝나지 않은 채 남은 기록은 LOST 로 바꾸고, 조회할 때 출력 파일의 마지막 몇 줄을 보여 준다.
+      출력 파일은 HISTORY_RETENTION_DAYS 가 지나면 startup 때 지운다.
+    - Windows 는 .bat/.cmd 를 cmd /c 로 실행하고, 그 외 OS 는 스크립트를 직접(실행 권한이 없으면 /bin/sh 로) 실행한다.
+      (리눅스에서 .sh 대역 스크립트로 시험할 수 있도록)
+주요 기능:
+    - job_manager.submit: 실행 요청 → (작업, 새로 만들었는지)
+    - job_manager.get / jobs / active: 메모리의 최근 작업 조회
+    - job_manager.cancel: 대기 중이면 취소, 실행 중이면 프로세스(자식 포함) 종료 (SIGTERM, KILL_GRACE 초 뒤 SIGKILL)
+    - job_manager.info: Job → JobInfo (대기 순서, 출력 포함)
+    - Job.subscribe / read_output: 출력 구독 (SSE)
+    - build_command: 실행 파일 → OS별 명령
+"""
+import asyncio
+import locale
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, List, Optional, Tuple
+
+from backend.core.batmon_db import batmon_db
+from backend.core.config import config
+from backend.core.logger import get_logger
+from backend.domains.batmon_schema import JobInfo, JobOutputLine
+from backend.utils.sys_util import KST
+
+logger = get_logger(__name__)
+
+ACTIVE = ("QUEUED", "RUNNING")
+READ_SIZE = 64 * 1024   # 한 번에 읽는 최대 크기 (줄바꿈 없는 긴 출력은 나눠서 한 줄씩)
+MAX_LINE = 4096         # 보관하는 한 줄 최대 길이 (넘으면 자름)
+TAIL_LINES = 20         # 끝난 작업의 DB 기록에 남기는 마지막 출력 줄 수
+TAIL_INTERVAL = 0.2     # 실행 중 출력 파일을 다시 읽는 간격(초)
+KILL_GRACE = 5.0        # 취소할 때 SIGTERM 뒤 SIGKILL 까지 기다리는 시간(초)
+
+
+class JobError(Exception):
+    """작업을 만들 수 없음 (대기열이 가득 참, 종료 중)"""
+
+
+def build_command(program: str) -> List[str]:
+    """실행 파일 경로 → Popen 명령"""
+    ext = os.path.splitext(program)[1].lower()
+    if os.name == "nt":
+        if ext == ".exe":
+            return [program]
+        if ext == ".ps1":
+            return ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-File", program]
+        return ["cmd", "/c", program]
+    if os.access(program, os.X_OK):
+        return [program]
+    return ["/bin/sh", program]
+
+
+def _decode(raw: bytes) -> str:
+    """출력 한 줄. UTF-8 이 아니면 시스템 인코딩(한글 Windows 는 cp949)으로 읽는다"""
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        text = raw.decode(locale.getpreferredencoding(False), errors="replace")
+    text = text.rstrip("\r\n")
+    return text if len(text) <= MAX_LINE else text[:MAX_LINE] + " …"
+
+
+def _kill_tree(process: subprocess.Popen):
+    """
+    프로세스와 그 자식들을 종료 (.bat 은 cmd 아래에서 실제 프로그램이 돈다).
+    POSIX 는 프로세스 그룹에 SIGTERM 을 보내고, KILL_GRACE 초 뒤에도 남아 있으면 SIGKILL.
+    """
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(process.pid)], capture_output=True, timeout=10)
+        else:
+            os.killpg(process.pid, signal.SIGTERM)   # start_new_session 이므로 pgid == pid
+            timer = threading.Timer(KILL_GRACE, _force_kill, args=(process.pid,))
+            timer.daemon = True
+            timer.start()
+    except (ProcessLookupError, subprocess.SubprocessError, OSError) as e:
+        logger.warning(f"작업 프로세스 종료 실패: pid={process.pid}: {e}")
+
+
+def _force_kill(pgid: int):
+    """SIGTERM 을 무시하고 남은 프로세스 그룹을 SIGKILL (그룹이 이미 없으면 아무것도 하지 않음)"""
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        return
+    except OSError as e:
+        logger.warning(f"작업 프로세스 강제 종료 실패: pgid={pgid}: {e}")
+        return
+    logger.warning(f"작업 프로세스가 {KILL_GRACE:g}초 안에 끝나지 않아 강제 종료했습니다: pgid={pgid}")
+
+
+def _log_dir() -> str:
+    return os.path.join(config.LOG_DIR, "jobs")
+
+
+def _log_paths(job_id: str) -> Tuple[str, str]:
+    """작업 출력 파일 (stdout, stderr)"""
+    return (os.path.join(_log_dir(), f"{job_id}.stdout.log"),
+            os.path.join(_log_dir(), f"{job_id}.stderr.log"))
+
+
+def _read_log_tail(job_id: str, count: int = TAIL_LINES) -> Optional[str]:
+    """출력 파일의 마지막 몇 줄 (stdout 다음 stderr). 파일이 없으면 None"""
+    lines: List[str] = []
+    found = False
+    for path in _log_paths(job_id):
+        try:
+            with open(path, "rb") as f:
+                f.seek(max(0, os.fstat(f.fileno()).st_size - READ_SIZE))
+                data = f.read()
+        except OSError:
+            continue
+        found = True
+        lines += [_decode(raw) for raw in data.splitlines()[-count:]]
+    return "\n".join(lines[-count:]) if found else None
+
+
+class _LogTail:
+    """실행 중인 작업의 출력 파일 하나를 따라 읽는다 (tail -f). 줄바꿈이 오기 전 조각은 모아 두었다가 한 줄로"""
+
+    def __init__(self, path: str, stream: str):
+        self.file = open(path, "rb")
+        self.stream = stream
+        self.partial = b""
+
+    def drain(self, job: "Job", final: bool = False):
+        """지금까지 쓰인 만큼 읽어 job 출력에 추가. final 이면 줄바꿈 없는 마지막 조각도"""
+        while True:
+            chunk = self.file.read(READ_SIZE)
+            if not chunk:
+                break
+            lines = (self.partial + chunk).split(b"\n")
+            self.partial = lines.pop()
+            for raw in lines:
+                job.append(self.stream, _decode(raw))
+            # 줄바꿈 없는 긴 출력은 나눠서 한 줄씩
+            while len(self.partial) >= READ_SIZE:
+                job.append(self.stream, _decode(self.partial[:READ_SIZE]))
+                self.partial = self.partial[READ_SIZE:]
+        if final and self.partial:
+            job.append(self.stream, _decode(self.partial))
+            self.partial = b""
+
+    def close(self):
+        self.file.close()
+
+
+def _to_datetime(epoch: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(epoch, KST) if epoch is not None else None
+
+
+@dataclass(eq=False)
+class Job:
+    id: str
+    program: str
+    command: List[str]
+    cwd: str
+    max_concurrent: int
+    requested_at: float = field(default_factory=time.time)
+    status: str = "QUEUED"
+    started_at: Optional[float] = None
+    ended_at: Optional[float] = None
+    exit_code: Optional[int] = None
+    pid: Optional[int] = None
+    message: Optional[str] = None
+    cancelled: bool = False
+    process: Optional[subprocess.Popen] = field(default=None, repr=False)
+    output: Deque[JobOutputLine] = field(default_factory=lambda: deque(maxlen=config.JOB_OUTPUT_LINES), repr=False)
+    _seq: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = field(default_factory=list, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status not in ACTIVE
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return round((self.ended_at or time.time()) - self.started_at, 3)
+
+    @property
+    def command_line(self) -> str:
+        return subprocess.list2cmdline(self.command) if os.name == "nt" else " ".join(self.command)
+
+    # --- 출력 ----------------------------------------------------------------
+    def append(self, stream: str, text: str):
+        with self._lock:
+            self._seq += 1
+            self.output.append(JobOutputLine(seq=self._seq, stream=stream, text=text))
+        self.notify()
+
+    def read_output(self, after: int = 0) -> Tuple[List[JobOutputLine], int]:
+        """(after 번 이후의 줄, 그 사이 ring buffer 에서 밀려나 못 보내는 줄 수)"""
+        with self._lock:
+            lines = [line for line in self.output if line.seq > after]
+        skipped = lines[0].seq - after - 1 if lines else 0
+        return lines, skipped
+
+    def tail(self, count: int = TAIL_LINES) -> str:
+        with self._lock:
+            lines = list(self.output)[-count:]
+        return "\n".join(line.text for line in lines)
+
+    # --- 구독 (이벤트 루프 안에서 호출) -------------------------------------------
+    def subscribe(self) -> asyncio.Event:
+        """출력이 늘거나 작업이 끝나면 set 되는 Event. 받은 쪽이 clear 한다"""
+        event = asyncio.Event()
+        with self._lock:
+            self._waiters.append((asyncio.get_running_loop(), event))
+        return event
+
+    def unsubscribe(self, event: asyncio.Event):
+        with self._lock:
+            self._waiters = [w for w in self._waiters if w[1] is not event]
+
+    def notify(self):
+        """다른 스레드에서 구독자 Event 를 set (이미 set 이면 건너뜀 → 출력이 많아도 깨우기는 한 번)"""
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            if event.is_set():
+                continue
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힘
+                self.unsubscribe(event)
+
+
+class JobManager:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()    # 요청 순
+        self._queue: Deque[Job] = deque()
+        self._accepting = True
+
+    # --- 수명주기 ------------------------------------------------------------
+    def start(self):
+        """startup: 이전 실행에서 끝나지 않은 작업 기록을 LOST 로, 오래된 출력 파일 정리"""
+        self._accepting = True
+        batmon_db.mark_lost_jobs()
+        self._prune_logs()
+
+    def stop(self):
+        """shutdown: 대기 중인 작업은 취소. 실행 중인 프로세스는 종료하지 않는다 (배치 작업을 끊지 않도록, 출력은 파일에 계속 쓰인다)"""
+        with self._lock:
+            self._accepting = False
+            queued = list(self._queue)
+            self._queue.clear()
+            running = [job for job in self._jobs.values() if job.status == "RUNNING"]
+        for job in queued:
+            self._finish(job, "CANCELLED", message="batmon 종료로 취소되었습니다.", dispatch=False)
+        if running:
+            logger.warning(f"실행 중인 작업 {len(running)}개는 계속 실행되지만 종료 코드는 기록되지 않습니다 (출력: {_log_dir()}): "
+                           f"{', '.join(f'{job.program}({job.pid})' for job in running)}")
+
+    # --- 요청 ----------------------------------------------------------------
+    def submit(self, program: str, path: str, max_concurrent: Optional[int] = None) -> Tuple[Job, bool]:
+        """
+        path 를 실행하는 작업을 만든다. → (작업, 새로 만들었는지)
+        같은 프로그램이 이미 대기 중이거나 max_concurrent 만큼 실행 중이면 그 작업을 돌려준다.
+        대기열이 가득 차면 JobError.
+        """
+        limit = max_concurrent or config.JOB_MAX_PER_PROGRAM
+        with self._lock:
+            if not self._accepting:
+                raise JobError("batmon 이 종료 중입니다.")
+            active = [job for job in self._jobs.values() if job.program == program and job.status in ACTIVE]
+            queued = [job for job in active if job.status == "QUEUED"]
+            if queued:
+                return queued[0], False
+            if len(active) >= limit:
+                return active[-1], False
+            if len(self._queue) >= config.JOB_QUEUE_SIZE:
+                raise JobError(f"실행 대기열이 가득 찼습니다. ({config.JOB_QUEUE_SIZE}개) 잠시 후 다시 시도하세요.")
+            job = Job(uuid.uuid4().hex[:12], program, build_command(path), os.path.dirname(path), limit)
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._trim()
+        logger.info(f"작업 요청: {program} ({job.id}) {job.command_line}")
+        self._record(job)
+        self._dispatch()
+        return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self, program: Optional[str] = None) -> List[Job]:
+        """메모리의 작업 (최근 요청 순)"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in reversed(jobs) if program is None or job.program == program]
+
+    def active(self, program: str) -> List[Job]:
+        return [job for job in self.jobs(program) if job.status in ACTIVE]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        대기 중이면 바로 취소, 실행 중이면 프로세스를 종료(끝나면 CANCELLED). 없는 작업이면 None.
+        실행 직전(RUNNING 이지만 아직 프로세스가 없음)이면 표시만 해 두고, 작업 스레드가 프로세스를 만든 직후 종료한다.
+        """
+        process = None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == "QUEUED":
+                self._queue.remove(job)
+            elif job.status == "RUNNING":
+                job.cancelled = True
+                process = job.process
+                if process is None:
+                    logger.info(f"작업 종료 요청 (실행 직전): {job.program} ({job.id})")
+                    return job
+            else:
+                return job
+        if process is None:
+            self._finish(job, "CANCELLED", message="요청으로 취소되었습니다.")
+        else:
+            logger.info(f"작업 종료 요청: {job.program} ({job.id}) pid={job.pid}")
+            _kill_tree(process)
+        return job
+
+    def info(self, job: Job, with_output: bool = False, duplicate: bool = False) -> JobInfo:
+        position = None
+        status = job.status
+        if status == "RUNNING" and job.pid is None:
+            # 실행 직전 (작업 스레드가 아직 프로세스를 만들지 않음): pid 가 생길 때까지 QUEUED 로 보인다
+            status = "QUEUED"
+        if job.status == "QUEUED":
+            with self._lock:
+                position = next((i for i, queued in enumerate(self._queue, 1) if queued is job), None)
+        return JobInfo(
+            id=job.id,
+            program=job.program,
+            command=job.command_line,
+            status=status,
+            requested_at=_to_datetime(job.requested_at),
+            started_at=_to_datetime(job.started_at),
+            ended_at=_to_datetime(job.ended_at),
+            duration_seconds=job.duration,
+            exit_code=job.exit_code,
+            pid=job.pid,
+            message=job.message,
+            queue_position=position,
+            duplicate=duplicate,
+            output=job.read_output()[0] if with_output else None,
+        )
+
+    @staticmethod
+    def history_info(row: dict) -> JobInfo:
+        """batmon_db.job_history 한 행 → JobInfo (메모리에 없는 지난 작업). LOST 는 출력 파일에서 마지막 몇 줄을 읽는다"""
+        started, ended = row["started_at"], row["ended_at"]
+        output_tail = row["output_tail"]
+        if output_tail is None and row["status"] == "LOST":
+            output_tail = _read_log_tail(row["id"])
+        return JobInfo(
+            id=row["id"],
+            program=row["program"],
+            command=row["command"],
+            status=row["status"],
+            requested_at=_to_datetime(row["requested_at"]),
+            started_at=_to_datetime(started),
+            ended_at=_to_datetime(ended),
+            duration_seconds=round(ended - started, 3) if started is not None and ended is not None else None,
+            exit_code=row["exit_code"],
+            pid=row["pid"],
+            message=row["message"],
+            output_tail=output_tail,
+        )
+
+    # --- 내부 ----------------------------------------------------------------
+    def _trim(self):
+        """끝난 작업은 JOB_KEEP 개까지만 메모리에 둔다 (오래된 것부터). self._lock 안에서 호출"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - config.JOB_KEEP)]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _prune_logs():
+        """HISTORY_RETENTION_DAYS 보다 오래된 작업 출력 파일 삭제 (DB 이력과 같은 기준)"""
+        cutoff = time.time() - config.HISTORY_RETENTION_DAYS * 86400
+        deleted = 0
+        try:
+            with os.scandir(_log_dir()) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(".log") and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        deleted += 1
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"작업 출력 파일 정리 실패: {e}")
+        if deleted:
+            logger.info(f"오래된 작업 출력 파일 {deleted}개 삭제")
+
+    def _record(self, job: Job):
+        batmon_db.record_job((
+            job.id, job.program, job.command_line, job.status, job.requested_at, job.started_at, job.ended_at,
+            job.exit_code, job.pid, job.message, job.tail() if job.finished else None,
+        ))
+
+    def _dispatch(self):
+        """전체/프로그램별 한도 안에서 대기열 앞에서부터 실행 (한도가 찬 프로그램의 작업은 건너뛰고 다음 작업)"""
+        started: List[Job] = []
+        with self._lock:
+            if not self._accepting:
+                return
+            running = [job for job in self._jobs.values() if job.status == "RUNNING"]
+            free = config.JOB_MAX_CONCURRENT - len(running)
+            per_program = Counter(job.program for job in running)
+            for job in list(self._queue):
+                if free <= 0:
+                    break
+                if per_program[job.program] >= job.max_concurrent:
+                    continue
+                self._queue.remove(job)
+                job.status = "RUNNING"
+                job.started_at = time.time()
+                per_program[job.program] += 1
+                free -= 1
+                started.append(job)
+        for job in started:
+            threading.Thread(target=self._run, args=(job,), name=f"batmon-job-{job.id}", daemon=True).start()
+
+    def _run(self, job: Job):
+        """작업 스레드: 프로세스 실행 → 출력 파일 따라 읽기 → 종료 코드 기록 → 다음 작업 실행"""
+        options = dict(cwd=job.cwd or None, stdin=subprocess.DEVNULL, close_fds=True)
+        if os.name == "nt":
+            options["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            options["start_new_session"] = True
+        out_path, err_path = _log_paths(job.id)
+        try:
+            os.makedirs(_log_dir(), exist_ok=True)
+            # 자식이 핸들을 물려받으므로 여기서는 Popen 뒤에 바로 닫는다
+            with open(out_path, "wb") as stdout, open(err_path, "wb") as stderr:
+                process = subprocess.Popen(job.command, stdout=stdout, stderr=stderr, **options)
+        except Exception as e:
+            logger.error(f"작업 실행 실패: {job.program} ({job.id}): {e}")
+            self._finish(job, "FAILED", message=f"실행 실패: {e}")
+            return
+
+        with self._lock:
+            job.process, job.pid = process, process.pid
+            cancelled = job.cancelled
+        logger.info(f"작업 시작: {job.program} ({job.id}) pid={process.pid}")
+        if cancelled:
+            # 프로세스를 만드는 사이에 취소 요청이 옴
+            logger.info(f"작업 종료 요청: {job.program} ({job.id}) pid={process.pid}")
+            _kill_tree(process)
+        self._record(job)
+        job.notify()
+
+        # 프로세스가 끝날 때까지 TAIL_INTERVAL 마다 출력 파일을 읽는다. 끝나면 남은 것까지 읽고 멈춤
+        # (손자 프로세스가 이후에 쓰는 출력은 파일에만 남는다)
+        tails = [_LogTail(out_path, "stdout"), _LogTail(err_path, "stderr")]
+        try:
+            while True:
+                try:
+                    exit_code = process.wait(TAIL_INTERVAL)
+                except subprocess.TimeoutExpired:
+                    exit_code = None
+                for tail in tails:
+                    tail.drain(job, final=exit_code is not None)
+                if exit_code is not None:
+                    break
+        finally:
+            for tail in tails:
+                tail.close()
+
+        if job.cancelled:
+            self._finish(job, "CANCELLED", exit_code=exit_code, message="요청으로 종료되었습니다.")
+        else:
+            self._finish(job, "SUCCEEDED" if exit_code == 0 else "FAILED", exit_code=exit_code)
+
+    def _finish(self, job: Job, status: str, exit_code: Optional[int] = None, message: Optional[str] = None,
+                dispatch: bool = True):
+        with self._lock:
+            job.status = status
+            job.ended_at = time.time()
+            job.exit_code = exit_code
+            job.message = message or job.message
+            job.process = None
+            self._trim()
+        logger.info(f"작업 종료: {job.program} ({job.id}) {status} exit_code={exit_code} ({job.duration}초)")
+        self._record(job)
+        job.notify()
+        if dispatch:
+            self._dispatch()
+
+
+# 단일톤
+job_manager = JobManager()
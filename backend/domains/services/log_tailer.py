@@ -0,0 +1,398 @@
+# log_tailer.py
+"""
+모듈 설명:
+    - 로그 파일에 새로 추가되는 줄을 구독자(/api/v1/system/tail SSE)에게 보내는 tail 서비스.
+    - 같은 파일을 여러 화면에서 따라가도 파일 감시자(TailWatcher)는 하나만 두고,
+      백그라운드 스레드 하나가 TAIL_POLL_INTERVAL 마다 모든 감시 파일의 크기만 확인해서 늘어난 부분만 읽는다.
+    - 날짜별 로그(예: kindscrap_2025_07_15.log)는 날짜가 바뀌어 오늘 파일이 생기면 이전 파일의 남은 줄을 마저 보낸 뒤
+      새 파일로 넘어간다. (event: rollover)
+    - 파일이 작아지거나 다른 파일로 교체되면 처음부터 다시 읽는다. (event: truncated)
+    - 레벨/정규식 필터는 구독자별로 서버에서 적용하므로 걸러진 줄은 전송되지 않는다.
+      레벨이 없는 줄(스택 트레이스 등)은 바로 앞 줄의 레벨을 따른다.
+      필터는 감시 스레드가 아니라 구독자 쪽(스레드풀)에서 적용하므로, 느린 정규식은 그 구독자만 늦춘다.
+      정규식 길이(TAIL_REGEX_MAX)와 검사하는 줄 길이(TAIL_FILTER_LINE_LIMIT)도 제한한다.
+주요 기능:
+    - log_tailer.subscribe / unsubscribe: 구독 (offset 이후 줄부터 또는 마지막 N줄부터)
+    - log_tailer.filtered: 구독 큐에서 꺼낸 이벤트에 구독자 필터 적용 (스레드풀에서 호출)
+    - log_tailer.stop: shutdown 이벤트에서 호출 (열린 스트림 종료)
+    - TailFilter: 레벨/정규식 필터
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Pattern, Tuple
+
+import anyio
+
+from backend.core.config import config
+from backend.core.logger import get_logger
+from backend.utils.line_index import MAX_LINE_BYTES, SAMPLE_SIZE, detect_encoding, read_window
+
+logger = get_logger(__name__)
+
+# 한 번의 확인에서 파일 하나당 읽는 최대 크기 (나머지는 다음 확인 때)
+READ_LIMIT = 4 * 1024 * 1024
+# 재접속(offset) 시 다시 보내는 최대 크기
+CATCH_UP_LIMIT = 8 * 1024 * 1024
+
+# 날짜별 로그 파일명의 날짜 부분 → strftime 형식
+_DATE_PATTERNS = (
+    (re.compile(r"\d{4}_\d{2}_\d{2}"), "%Y_%m_%d"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}"), "%Y-%m-%d"),
+    (re.compile(r"(?<!\d)\d{8}(?!\d)"), "%Y%m%d"),
+)
+
+# 레벨 순서와 로그에서 레벨을 찾는 패턴 ('[E]' 같은 한 글자 표기와 'ERROR' 같은 단어 표기)
+LEVELS = ("D", "I", "W", "E")
+_LEVEL_RE = re.compile(r"\[([DIWEC])\]|\b(DEBUG|INFO|WARN|WARNING|ERROR|CRITICAL|FATAL)\b")
+_LEVEL_WORDS = {"DEBUG": "D", "INFO": "I", "WARN": "W", "WARNING": "W", "ERROR": "E", "CRITICAL": "E", "FATAL": "E", "C": "E"}
+
+
+def _line_level(line: str) -> Optional[str]:
+    m = _LEVEL_RE.search(line)
+    if not m:
+        return None
+    level = m.group(1) or m.group(2)
+    return _LEVEL_WORDS.get(level, level)
+
+
+@dataclass
+class TailFilter:
+    level: Optional[str] = None             # 이 레벨 이상만 (D/I/W/E)
+    pattern: Optional[Pattern[str]] = None  # 정규식에 맞는 줄만
+    last_level: Optional[str] = None        # 레벨이 없는 줄에 적용할 직전 레벨
+
+    @classmethod
+    def create(cls, level: Optional[str], regex: Optional[str]) -> "TailFilter":
+        """잘못된 레벨/정규식이면 ValueError"""
+        if level:
+            level = _LEVEL_WORDS.get(level.upper(), level.upper()[:1])
+            if level not in LEVELS:
+                raise ValueError(f"level 은 {'/'.join(LEVELS)} 중 하나여야 합니다: {level}")
+        if regex and len(regex) > config.TAIL_REGEX_MAX:
+            raise ValueError(f"정규식이 너무 깁니다. (최대 {config.TAIL_REGEX_MAX}자)")
+        try:
+            pattern = re.compile(regex) if regex else None
+        except re.error as e:
+            raise ValueError(f"정규식 오류: {e}")
+        return cls(level or None, pattern)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.level or self.pattern)
+
+    def apply(self, lines: List[str]) -> List[str]:
+        if not self.active:
+            return lines
+        min_rank = LEVELS.index(self.level) if self.level else 0
+        limit = config.TAIL_FILTER_LINE_LIMIT
+        result = []
+        for line in lines:
+            level = _line_level(line) or self.last_level
+            self.last_level = level
+            if self.level and (level is None or LEVELS.index(level) < min_rank):
+                continue
+            if self.pattern and not self.pattern.search(line, 0, limit):
+                continue
+            result.append(line)
+        return result
+
+
+@dataclass(frozen=True)
+class TailEvent:
+    id: Optional[str]  # "파일명:offset" (재접속 시 Last-Event-ID), 위치와 무관한 이벤트는 None
+    event: str         # "lines" | "rollover" | "truncated"
+    data: str          # JSON 문자열
+    lines: Tuple[str, ...] = ()  # event == "lines" 일 때 필터 적용 전 줄들 (구독자별 필터용)
+
+
+@dataclass
+class TailPosition:
+    path: str                # 구독 시점에 따라가던 파일
+    end: int                 # 구독 시점의 감시 위치 (이후 줄은 구독 큐로 온다)
+    encoding: str
+    offset: Optional[int]    # 이어받을 위치 (없으면 마지막 N줄)
+
+
+@dataclass
+class TailSubscription:
+    loop: asyncio.AbstractEventLoop
+    queue: "asyncio.Queue[Optional[TailEvent]]"
+    filter: TailFilter
+
+
+def event_id(path: str, offset: int) -> str:
+    return f"{os.path.basename(path)}:{offset}"
+
+
+def _daily_template(path: str) -> Optional[str]:
+    """오늘 날짜가 들어간 파일명이면 그 날짜를 strftime 형식으로 바꾼 경로 (예: .../kindscrap_%Y_%m_%d.log)"""
+    name = os.path.basename(path)
+    for regex, fmt in _DATE_PATTERNS:
+        m = regex.search(name)
+        if m:
+            try:
+                datetime.strptime(m.group(0), fmt)
+            except ValueError:
+                continue
+            template = os.path.join(os.path.dirname(path).replace("%", "%%"),
+                                    name[:m.start()].replace("%", "%%") + fmt + name[m.end():].replace("%", "%%"))
+            # 오늘 날짜의 로그를 따라갈 때만 날짜 변경을 따라간다 (지난 로그는 그 파일만)
+            return template if datetime.now().strftime(template) == path else None
+    return None
+
+
+def _split_lines(data: bytes, encoding: str) -> List[str]:
+    return [line[:MAX_LINE_BYTES].decode(encoding, errors="replace").rstrip("\r") for line in data.split(b"\n")]
+
+
+class TailWatcher:
+    """파일 하나(날짜별 로그면 그 날의 파일)를 따라가는 감시자. 구독자들이 공유한다."""
+
+    def __init__(self, key: str, path: str):
+        self.key = key                          # 구독 시 요청한 경로 (감시자 공유 키)
+        self.path = path                        # 지금 따라가는 파일
+        self.template = _daily_template(path)   # 날짜별 로그 파일명 형식 (없으면 rollover 없음)
+        self.subscribers: List[TailSubscription] = []
+        self.lock = threading.Lock()
+        self.offset = 0                         # 구독자에게 보낸 마지막 완결된 줄 다음 위치
+        self.identity: Optional[Tuple[int, int]] = None  # (st_dev, st_ino) 교체 확인용
+        self.encoding = "utf-8"
+        self.pending = b""                      # 아직 줄바꿈이 오지 않은 마지막 줄
+        self._open_at_end()
+
+    def _open_at_end(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.offset, self.identity = 0, None
+            return
+        self.offset = st.st_size
+        self.identity = (st.st_dev, st.st_ino)
+        self._detect_encoding()
+
+    def _detect_encoding(self):
+        try:
+            with open(self.path, "rb") as f:
+                self.encoding = detect_encoding(f.read(SAMPLE_SIZE))
+        except OSError:
+            pass
+
+    # --- 확인 (감시 스레드) ----------------------------------------------------
+    def poll(self) -> List[TailEvent]:
+        """늘어난 줄/rollover/truncate를 이벤트로 만든다. 구독자 전달은 호출하는 쪽에서"""
+        events: List[TailEvent] = []
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            st = None
+
+        if st is not None:
+            identity = (st.st_dev, st.st_ino)
+            if self.identity is not None and (identity != self.identity or st.st_size < self.offset):
+                # 잘림 또는 다른 파일로 교체 → 처음부터
+                events.append(TailEvent(None, "truncated", json.dumps({"file": os.path.basename(self.path)}, ensure_ascii=False)))
+                self.offset, self.pending = 0, b""
+                self._detect_encoding()
+            elif self.identity is None:
+                # 없던 파일이 생김 → 처음부터
+                self.offset, self.pending = 0, b""
+                self._detect_encoding()
+            self.identity = identity
+            if st.st_size > self.offset + len(self.pending):
+                events.extend(self._read_new(st.st_size))
+
+        if self.template:
+            today = datetime.now().strftime(self.template)
+            if today != self.path and os.path.exists(today):
+                # 날짜가 바뀜: 이전 파일의 남은 줄(줄바꿈 없는 마지막 줄 포함)을 보내고 새 파일 처음부터
+                if self.pending:
+                    events.append(self._lines_event(_split_lines(self.pending, self.encoding), self.offset + len(self.pending)))
+                self.path, self.offset, self.pending, self.identity = today, 0, b"", None
+                events.append(TailEvent(None, "rollover", json.dumps({"file": os.path.basename(today)}, ensure_ascii=False)))
+                events.extend(self.poll())
+        return events
+
+    def _read_new(self, size: int) -> List[TailEvent]:
+        start = self.offset + len(self.pending)
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                data = self.pending + f.read(min(size - start, READ_LIMIT))
+        except OSError as e:
+            logger.warning(f"tail 읽기 실패: {self.path}: {e}")
+            return []
+        end = data.rfind(b"\n")
+        if end == -1:
+            self.pending = data
+            return []
+        self.pending = data[end + 1:]
+        complete = data[:end]
+        self.offset += end + 1
+        return [self._lines_event(_split_lines(complete, self.encoding), self.offset)]
+
+    def _lines_event(self, lines: List[str], offset: int) -> TailEvent:
+        return TailEvent(event_id(self.path, offset), "lines", json.dumps(lines, ensure_ascii=False), tuple(lines))
+
+
+class LogTailer:
+    # 구독자별 미전송 이벤트 상한 (넘치면 구독을 끊고, 클라이언트는 Last-Event-ID로 재접속해서 따라잡는다)
+    SUBSCRIBER_QUEUE = 256
+
+    def __init__(self):
+        self._watchers: Dict[str, TailWatcher] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- 구독 ----------------------------------------------------------------
+    async def subscribe(
+        self,
+        path: str,
+        tail_filter: TailFilter,
+        *,
+        offset: Optional[int] = None,
+        resume_id: Optional[str] = None,
+    ) -> Tuple[TailSubscription, TailPosition]:
+        """
+        구독을 등록하고 (구독, 구독 시점의 감시 위치)를 반환.
+        새 감시자는 파일을 확인(stat, 인코딩 감지)하므로 락 밖에서 스레드풀로 만든다.
+        이후 감시자가 보내는 줄은 구독 큐로 오고, 그 앞의 줄은 backlog 로 읽는다. (빠지거나 겹치는 줄 없음)
+        resume_id(Last-Event-ID)가 지금 파일의 위치면 offset 대신 그 위치부터 이어받는다.
+        """
+        sub = TailSubscription(asyncio.get_running_loop(), asyncio.Queue(self.SUBSCRIBER_QUEUE), tail_filter)
+        created: Optional[TailWatcher] = None
+        while True:
+            with self._lock:
+                # 만드는 사이 다른 구독이 같은 파일의 감시자를 만들었으면 그쪽을 쓴다
+                watcher = self._watchers.get(path)
+                if watcher is None and created is not None:
+                    watcher = self._watchers[path] = created
+                if watcher is not None:
+                    with watcher.lock:
+                        watcher.subscribers.append(sub)
+                        position = TailPosition(watcher.path, watcher.offset, watcher.encoding, offset)
+                    self._ensure_thread()
+                    break
+            created = await anyio.to_thread.run_sync(TailWatcher, path, path)
+
+        if resume_id:
+            name, _, value = resume_id.rpartition(":")
+            if name == os.path.basename(position.path) and value.isdigit():
+                position.offset = int(value)
+        return sub, position
+
+    def unsubscribe(self, path: str, sub: TailSubscription):
+        with self._lock:
+            watcher = self._watchers.get(path)
+            if watcher is None:
+                return
+            with watcher.lock:
+                if sub in watcher.subscribers:
+                    watcher.subscribers.remove(sub)
+                if not watcher.subscribers:
+                    # 마지막 구독자가 나가면 감시 중단
+                    del self._watchers[path]
+
+    @staticmethod
+    def backlog(position: TailPosition, tail_filter: TailFilter, lines: int) -> List[TailEvent]:
+        """
+        구독 전에 먼저 보낼 줄 (파일을 읽으므로 스레드풀에서 호출).
+        position.offset 이 있으면 그 위치부터 감시 위치까지 (CATCH_UP_LIMIT 이내), 아니면 감시 위치 앞의 lines 줄.
+        """
+        path, end, offset = position.path, position.end, position.offset
+        if not os.path.exists(path):
+            return []
+        if offset is not None and 0 <= offset <= end and end - offset <= CATCH_UP_LIMIT:
+            if offset == end:
+                return []
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(end - offset)
+            text = _split_lines(data[:-1] if data.endswith(b"\n") else data, position.encoding)
+        elif lines > 0 and end > 0:
+            text = read_window(path, count=lines, before=end).lines
+        else:
+            return []
+        return [TailEvent(event_id(path, end), "lines", json.dumps(tail_filter.apply(text), ensure_ascii=False))]
+
+    @staticmethod
+    def filtered(sub: TailSubscription, event: TailEvent) -> Optional[TailEvent]:
+        """
+        구독 큐에서 꺼낸 이벤트에 구독자 필터를 적용 (정규식이 느릴 수 있으므로 스레드풀에서 호출).
+        남는 줄이 없으면 None.
+        """
+        if event.event != "lines":
+            # 파일이 바뀌면 직전 레벨을 이어받지 않는다
+            sub.filter.last_level = None
+        elif sub.filter.active:
+            lines = sub.filter.apply(list(event.lines))
+            if not lines:
+                return None
+            event = TailEvent(event.id, event.event, json.dumps(lines, ensure_ascii=False))
+        return event
+
+    # --- 감시 스레드 ------------------------------------------------------------
+    def _ensure_thread(self):
+        """self._lock 안에서 호출"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="batmon-log-tailer", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(config.TAIL_POLL_INTERVAL):
+            with self._lock:
+                watchers = list(self._watchers.values())
+                if not watchers:
+                    # 감시할 파일이 없으면 스레드 종료 (다음 구독 때 다시 시작)
+                    self._thread = None
+                    return
+            for watcher in watchers:
+                try:
+                    with watcher.lock:
+                        events = watcher.poll()
+                        subscribers = list(watcher.subscribers)
+                    for event in events:
+                        for sub in subscribers:
+                            self._deliver(watcher, sub, event)
+                except Exception as e:
+                    logger.exception(f"tail 확인 실패: {watcher.path}: {e}")
+
+    def _deliver(self, watcher: TailWatcher, sub: TailSubscription, event: TailEvent):
+        """다른 스레드에서 구독자의 asyncio.Queue에 안전하게 넣는다. (필터는 구독자 쪽 filtered 에서)"""
+        def put():
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 너무 밀린 구독자는 끊는다 (재접속 시 Last-Event-ID로 따라잡음)
+                self.unsubscribe(watcher.key, sub)
+                sub.queue.get_nowait()
+                sub.queue.put_nowait(None)
+        try:
+            sub.loop.call_soon_threadsafe(put)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힘
+            self.unsubscribe(watcher.key, sub)
+
+    def stop(self):
+        """열려 있는 스트림을 모두 종료"""
+        self._stop.set()
+        with self._lock:
+            watchers, self._watchers = list(self._watchers.values()), {}
+        for watcher in watchers:
+            for sub in watcher.subscribers:
+                try:
+                    sub.loop.call_soon_threadsafe(sub.queue.put_nowait, None)
+                except RuntimeError:
+                    pass
+        logger.info("로그 tail 종료")
+
+
+# 단일톤
+log_tailer = LogTailer()
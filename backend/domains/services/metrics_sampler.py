@@ -0,0 +1,189 @@
+# metrics_sampler.py
+"""
+모듈 설명:
+    - 백그라운드 스레드에서 METRICS_INTERVAL 마다 CPU/메모리/디스크 사용률과 디스크 I/O 속도를 수집한다.
+    - 최근 수집값은 메모리 ring buffer(METRICS_BUFFER 개)에 두고,
+      1분/5분/1시간 구간 집계는 batmon_db(metrics_rollup)에 upsert 한다.
+    - /api/v1/system/metrics 는 요청한 step에 맞는 집계 테이블만 읽어서 다시 묶으므로 원본 수집값을 훑지 않는다.
+주요 기능:
+    - MetricsSampler.start / stop: startup/shutdown 이벤트에서 호출
+    - MetricsSampler.latest: 가장 최근 수집값
+    - MetricsSampler.series: [since, until) 구간을 step 초 간격으로 묶은 시계열
+"""
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+import psutil
+
+from backend.core.batmon_db import batmon_db
+from backend.core.config import config
+from backend.core.logger import get_logger
+from backend.utils.sys_util import system_drive
+
+logger = get_logger(__name__)
+
+# 집계 대상 (MetricSample 속성 이름 = metrics_rollup 컬럼 접두어)
+_FIELDS = ("cpu", "mem", "disk", "read", "write")
+
+_UPSERT_SQL = (
+    "INSERT INTO metrics_rollup (step, bucket, n, "
+    + ", ".join(f"{f}_sum, {f}_max" for f in _FIELDS)
+    + ") VALUES (?, ?, 1, " + ", ".join("?, ?" for _ in _FIELDS) + ")"
+    + " ON CONFLICT (step, bucket) DO UPDATE SET n = n + 1, "
+    + ", ".join(f"{f}_sum = {f}_sum + excluded.{f}_sum, {f}_max = max({f}_max, excluded.{f}_max)" for f in _FIELDS)
+)
+
+
+@dataclass(frozen=True)
+class MetricSample:
+    ts: float       # epoch 초
+    cpu: float      # CPU 사용률(%)
+    mem: float      # 메모리 사용률(%)
+    disk: float     # 시스템 드라이브 사용률(%)
+    read: float     # 디스크 읽기 bytes/s
+    write: float    # 디스크 쓰기 bytes/s
+
+
+class MetricsSampler:
+    # 집계 구간(초)과 보관 기간(초)
+    ROLLUP_STEPS = (60, 300, 3600)
+    RETENTION = {60: 7 * 86400, 300: 30 * 86400, 3600: 365 * 86400}
+    PRUNE_INTERVAL = 3600
+    # step을 지정하지 않았을 때 이 개수를 넘지 않도록 step을 고른다
+    MAX_POINTS = 1000
+
+    def __init__(self):
+        self._samples: Deque[MetricSample] = deque(maxlen=config.METRICS_BUFFER)
+        self._last_io: Optional[Tuple[float, int, int]] = None  # (monotonic, read_bytes, write_bytes)
+        self._drive = system_drive()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- 수명주기 ------------------------------------------------------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="batmon-metrics-sampler", daemon=True)
+        self._thread.start()
+        logger.info("시스템 지표 수집 시작")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("시스템 지표 수집 종료")
+
+    # --- 조회 ----------------------------------------------------------------
+    def latest(self) -> Optional[MetricSample]:
+        return self._samples[-1] if self._samples else None
+
+    def series(self, since: float, until: float, step: Optional[int] = None) -> Tuple[int, str, List[Dict[str, float]]]:
+        """
+        [since, until) 구간을 step초 간격으로 묶은 (step, source, points)를 반환.
+        - step < 60: 메모리의 최근 수집값을 묶는다 (source="raw", 최근 METRICS_BUFFER 개 범위만)
+        - 그 외: step 이하 중 가장 큰 집계 테이블을 골라 SQL로 다시 묶는다 (source="60s" 등)
+        step을 생략하면 점 개수가 MAX_POINTS 이하가 되는 가장 작은 step을 고른다.
+        """
+        if not step:
+            step = max(int(config.METRICS_INTERVAL), math.ceil((until - since) / self.MAX_POINTS))
+        if step < self.ROLLUP_STEPS[0]:
+            step = max(step, math.ceil(config.METRICS_INTERVAL))
+            return step, "raw", self._raw_series(since, until, step)
+
+        base = max(s for s in self.ROLLUP_STEPS if s <= step)
+        step = math.ceil(step / base) * base  # 집계 구간 경계에 맞춘다
+        return step, f"{base}s", self._rollup_series(since, until, step, base)
+
+    def _raw_series(self, since: float, until: float, step: int) -> List[Dict[str, float]]:
+        buckets: Dict[int, List[MetricSample]] = {}
+        for s in list(self._samples):
+            if since <= s.ts < until:
+                buckets.setdefault(int(s.ts // step * step), []).append(s)
+        points = []
+        for t, samples in sorted(buckets.items()):
+            point: Dict[str, float] = {"time": t, "samples": len(samples)}
+            for f in _FIELDS:
+                values = [getattr(s, f) for s in samples]
+                point[f"{f}_avg"] = sum(values) / len(values)
+                point[f"{f}_max"] = max(values)
+            points.append(point)
+        return points
+
+    @staticmethod
+    def _rollup_series(since: float, until: float, step: int, base: int) -> List[Dict[str, float]]:
+        columns = ", ".join(f"SUM({f}_sum) AS {f}_sum, MAX({f}_max) AS {f}_max" for f in _FIELDS)
+        conn = batmon_db.connect()
+        try:
+            rows = conn.execute(
+                f"SELECT (bucket / ?) * ? AS t, SUM(n) AS n, {columns} FROM metrics_rollup"
+                " WHERE step = ? AND bucket >= ? AND bucket < ? GROUP BY t ORDER BY t",
+                (step, step, base, int(since // base * base), until),
+            ).fetchall()
+        finally:
+            conn.close()
+        points = []
+        for row in rows:
+            point: Dict[str, float] = {"time": row["t"], "samples": row["n"]}
+            for f in _FIELDS:
+                point[f"{f}_avg"] = row[f"{f}_sum"] / row["n"]
+                point[f"{f}_max"] = row[f"{f}_max"]
+            points.append(point)
+        return points
+
+    # --- 수집 ----------------------------------------------------------------
+    def sample(self) -> MetricSample:
+        now = time.monotonic()
+        cpu = psutil.cpu_percent(interval=None)  # 직전 호출 이후 평균 (기다리지 않음)
+        mem = psutil.virtual_memory().percent
+        try:
+            disk = psutil.disk_usage(self._drive).percent
+        except OSError:
+            disk = 0.0
+
+        read = write = 0.0
+        try:
+            io = psutil.disk_io_counters()
+        except Exception:
+            io = None
+        if io is not None:
+            if self._last_io and now > self._last_io[0]:
+                elapsed = now - self._last_io[0]
+                read = max(0.0, (io.read_bytes - self._last_io[1]) / elapsed)
+                write = max(0.0, (io.write_bytes - self._last_io[2]) / elapsed)
+            self._last_io = (now, io.read_bytes, io.write_bytes)
+        return MetricSample(time.time(), cpu, mem, disk, read, write)
+
+    def _record(self, s: MetricSample):
+        self._samples.append(s)
+        values = [v for f in _FIELDS for v in (getattr(s, f), getattr(s, f))]
+        batmon_db.submit(_UPSERT_SQL, [(step, int(s.ts // step * step), *values) for step in self.ROLLUP_STEPS])
+
+    def _prune(self):
+        now = time.time()
+        batmon_db.submit(
+            "DELETE FROM metrics_rollup WHERE step = ? AND bucket < ?",
+            [(step, int(now - keep)) for step, keep in self.RETENTION.items()],
+        )
+
+    def _loop(self):
+        # cpu_percent / disk_io_counters 기준점 (첫 값은 의미 없음)
+        self.sample()
+        next_prune = 0.0
+        while not self._stop.wait(config.METRICS_INTERVAL):
+            try:
+                self._record(self.sample())
+                if time.monotonic() >= next_prune:
+                    self._prune()
+                    next_prune = time.monotonic() + self.PRUNE_INTERVAL
+            except Exception as e:
+                logger.exception(f"시스템 지표 수집 실패: {e}")
+
+
+# 단일톤
+metrics_sampler = MetricsSampler()
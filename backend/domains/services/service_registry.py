@@ -0,0 +1,91 @@
+# service_registry.py
+"""
+모듈 설명:
+    - BATMON.yml programs[].type 값으로 서비스 클래스를 찾아 서비스 객체를 만드는 레지스트리.
+    - 서비스 객체는 설정 버전(config.version)마다 한 번만 만들고 요청 간에 재사용하며,
+      BATMON.yml에서 해당 항목이 바뀐 경우에만 다시 만든다.
+주요 기능:
+    - SERVICE_TYPES: type → 서비스 클래스
+    - service_registry.get(name): 이름으로 서비스 객체 조회
+    - service_registry.all(): BATMON.yml 순서의 전체 서비스 객체 목록
+"""
+import threading
+from typing import Dict, List, Optional, Tuple, Type
+
+from backend.core.config import config
+from backend.core.logger import get_logger
+from backend.domains.batmon_schema import ServiceStatus
+from backend.domains.services.auto_esafe import AutoEsafeService
+from backend.domains.services.base_service import BaseService
+from backend.domains.services.daily_log_service import DailyLogService
+from backend.domains.services.fund_mail_service import FundMailService
+from backend.domains.services.kindscrap_service import KindscrapService
+
+logger = get_logger(__name__)
+
+SERVICE_TYPES: Dict[str, Type[BaseService]] = {
+    "kindscrap": KindscrapService,
+    "auto_esafe": AutoEsafeService,
+    "fund_mail": FundMailService,
+    "daily_log": DailyLogService,
+}
+
+
+class UnknownTypeService(BaseService):
+    """type이 SERVICE_TYPES에 없는 프로그램. 점검하면 항상 설정 오류를 돌려준다."""
+
+    def check(self) -> ServiceStatus:
+        return self.error_status(f"알 수 없는 type 입니다: '{self.type}' (사용 가능: {', '.join(SERVICE_TYPES)})")
+
+    def rerun(self) -> ServiceStatus:
+        return self.check()
+
+
+class ServiceRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = -1
+        # name → (BATMON.yml 항목, 서비스 객체)
+        self._services: Dict[str, Tuple[dict, BaseService]] = {}
+        self._ordered: List[BaseService] = []
+
+    def get(self, name: str) -> Optional[BaseService]:
+        """name에 해당하는 서비스 객체 (BATMON.yml에 없으면 None)"""
+        self._sync()
+        entry = self._services.get(name)
+        return entry[1] if entry else None
+
+    def all(self) -> List[BaseService]:
+        """BATMON.yml 순서의 전체 서비스 객체 목록"""
+        self._sync()
+        return self._ordered
+
+    def _sync(self):
+        """설정 버전이 바뀌었으면 바뀐 항목의 서비스 객체만 다시 만든다."""
+        snap = config.snapshot()
+        if snap.version == self._version:
+            return
+        with self._lock:
+            if snap.version == self._version:
+                return
+            services: Dict[str, Tuple[dict, BaseService]] = {}
+            for program in snap.programs:
+                name = program["name"]
+                cached = self._services.get(name)
+                if cached and cached[0] == program:
+                    services[name] = cached
+                    continue
+                services[name] = (program, self._build(program))
+                logger.info(f"서비스 객체 생성: {name} (type={program['type']})")
+            self._services = services
+            self._ordered = [service for _, service in services.values()]
+            self._version = snap.version
+
+    @staticmethod
+    def _build(program: dict) -> BaseService:
+        service_cls = SERVICE_TYPES.get(program["type"], UnknownTypeService)
+        return service_cls(program["name"], program)
+
+
+# 단일톤
+service_registry = ServiceRegistry()
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -47,3 +47,53 @@ class SystemSummary(BaseModel):
     disk: DiskInfo
     network: NetworkInfo
     stats: SystemStats
+
+class MetricPoint(BaseModel):
+    time: datetime                      # 구간 시작 시각
+    samples: int                        # 구간에 포함된 수집 횟수
+    cpu_avg: float
+    cpu_max: float
+    mem_avg: float
+    mem_max: float
+    disk_avg: float
+    disk_max: float
+    read_avg: float = Field(..., description="디스크 읽기 bytes/s")
+    read_max: float
+    write_avg: float = Field(..., description="디스크 쓰기 bytes/s")
+    write_max: float
+
+class MetricSeries(BaseModel):
+    step: int = Field(..., description="점 사이 간격(초)")
+    source: str = Field(..., description="raw(메모리 최근 수집값) 또는 집계 테이블 구간(60s/300s/3600s)")
+    points: List[MetricPoint]
+
+class TextWindow(BaseModel):
+    encoding: str
+    size: int = Field(..., description="읽은 시점의 파일 크기(bytes)")
+    total_lines: Optional[int] = Field(None, description="전체 줄 수 (색인 전이면 None)")
+    indexing: bool = Field(..., description="줄 색인을 백그라운드에서 만드는 중")
+    first_line: Optional[int] = Field(None, description="lines[0]의 줄 번호 (1부터, 색인 전이면 None)")
+    start_offset: int = Field(..., description="lines[0]의 시작 위치 (이전 구간 요청의 before 값)")
+    end_offset: int = Field(..., description="마지막 줄 다음 위치 (다음 구간 요청의 after 값)")
+    bof: bool = Field(..., description="파일 처음부터 읽었는지")
+    eof: bool = Field(..., description="파일 끝까지 읽었는지")
+    lines: List[str]
+
+class ExcelPage(BaseModel):
+    sheets: List[str] = Field(..., description="통합문서의 시트 이름들")
+    sheet: str
+    columns: List[str]
+    total_rows: int = Field(..., description="시트 전체 행 수 (머리글 제외)")
+    matched_rows: int = Field(..., description="필터에 맞는 행 수")
+    offset: int = Field(..., description="정렬/필터 결과에서 rows[0]의 위치 (0부터)")
+    row_numbers: List[int] = Field(..., description="rows 각 행의 원래 행 번호 (1부터, 머리글 제외)")
+    rows: List[List[Optional[str]]]
+    cached: bool = Field(..., description="캐시된 통합문서로 응답했는지 (False면 이번 요청에서 파일을 읽음)")
+
+class LogStats(BaseModel):
+    queued: int = Field(..., description="파일에 쓰기를 기다리는 로그 수")
+    capacity: int = Field(..., description="로그 큐 크기 (LOG_QUEUE_SIZE)")
+    dropped: int = Field(..., description="큐가 가득 차서 버린 로그 수 (시작 이후 누적)")
+    dropped_by_level: Dict[str, int] = Field(..., description="레벨별 버린 로그 수")
+    written: int = Field(..., description="파일에 쓴 로그 수")
+    batches: int = Field(..., description="쓰기 횟수 (여러 로그를 묶어서 한 번에 씀)")
@@ -1,6 +1,12 @@
 import os
 import sys
 
+# --profile-startup: 모듈별 import 시간을 재려면 다른 모듈을 import 하기 전에 시작해야 한다
+from backend.core import startup_profile
+
+if "--profile-startup" in sys.argv:
+    startup_profile.install()
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
@@ -8,20 +14,34 @@ from backend.api.v1.endpoints.batmon_routes import router as batmon_router
 from backend.api.v1.endpoints.home_routes import router as home_router
 from backend.api.v1.endpoints.system_routes import router as system_router
 from backend.core.batmon_db import (
+    batmon_db,
     create_batmon_db,  # Add this import (adjust path if needed)
 )
+from backend.core.compression import CompressionMiddleware
 from backend.core.config import config
 from backend.core.exception_handler import add_exception_handlers
-from backend.core.logger import get_logger
+from backend.core.logger import get_logger, stop_logging
+from backend.core.template_engine import precompile_templates
+from backend.core.warmup import start_warmup
+from backend.domains.services.health_monitor import health_monitor
+from backend.domains.services.hub_poller import hub_poller
+from backend.domains.services.job_manager import job_manager
+from backend.domains.services.log_tailer import log_tailer
+from backend.domains.services.metrics_sampler import metrics_sampler
+from backend.utils.dir_size_index import dir_size_index
+from backend.utils.sys_util import prime_host_facts
 
 logger = get_logger(__name__)
+startup_profile.mark("imports")
 
 def create_app() -> FastAPI:
     app = FastAPI(title="Batmon - 배치프로그램 모니터링", version="0.0.1")
     add_routes(app)
+    add_middlewares(app)
     add_event_handlers(app)
     add_static_files(app)
     add_exception_handlers(app)
+    startup_profile.mark("app")
     return app
 
 
@@ -31,6 +51,13 @@ def add_routes(app: FastAPI):
     app.include_router(batmon_router, prefix="/api/v1/batmon", tags=["batmon"])
     app.include_router(system_router, prefix="/api/v1/system", tags=["system"])
 
+def add_middlewares(app: FastAPI):
+    ''' 응답 압축 (gzip/br, Accept-Encoding 협상) '''
+    app.add_middleware(CompressionMiddleware)
+    if startup_profile.enabled():
+        # 첫 요청 응답까지의 시간 측정 (가장 바깥)
+        app.add_middleware(startup_profile.FirstRequestTimer)
+
 def add_event_handlers(app: FastAPI):
     ''' 이벤트 핸들러 설정 '''
     app.add_event_handler("startup", startup_event)
@@ -67,12 +94,32 @@ async def startup_event():
         os.makedirs(parent_dir, exist_ok=True)
         # Batmon DB 생성
     create_batmon_db(db_path)
+    # 프로그램 실행 작업 관리 (이전 실행에서 끝나지 않은 작업 기록 정리)
+    job_manager.start()
+
+    # 화면 템플릿 미리 컴파일 (첫 화면 요청이 컴파일을 기다리지 않도록)
+    precompile_templates()
+
+    # 백그라운드 상태 점검 시작 (/api/v1/batmon/check 는 이 스냅샷을 읽는다)
+    health_monitor.start()
+    # 허브 모드 에이전트 조회 (BATMON.yml agents 가 없으면 대기만 한다)
+    hub_poller.start()
+    # 시스템 지표 수집 시작 (/api/v1/system/metrics)
+    metrics_sampler.start()
+    # 호스트 정보(OS/CPU/네트워크)는 platform/socket 조회가 느리므로 백그라운드에서 미리 수집 (/api/v1/system/info)
+    prime_host_facts()
+
+    # 무거운 선택 모듈(pandas 등)은 백그라운드에서 미리 import (첫 엑셀 보기가 기다리지 않도록)
+    start_warmup(config.WARMUP_IMPORTS)
 
     logger.info(f"DB 파일 경로: {db_path}")
     logger.info(f"로그 파일 경로: {config.LOG_FILE}")
     logger.info('---------------------------------')
     logger.info('◀️  Startup 프로세스 종료')
     logger.info('---------------------------------')    
+    startup_profile.mark("startup")
+    if startup_profile.enabled():
+        startup_profile.probe(getattr(config, "PORT", 8002))
 
 async def shutdown_event():
     ''' Batmon application 종료 '''
@@ -80,9 +127,18 @@ async def shutdown_event():
     logger.info('▶️  Shutdown 프로세스 시작')
     logger.info('---------------------------------')
     logger.info("Batmon application 종료 중...")    
+    health_monitor.stop()
+    hub_poller.stop()
+    job_manager.stop()
+    log_tailer.stop()
+    metrics_sampler.stop()
+    dir_size_index.shutdown()
+    batmon_db.close()
     logger.info('---------------------------------')
     logger.info('◀️  Shutdown 프로세스 종료')
     logger.info('---------------------------------')
+    # 큐에 남은 로그를 모두 쓴다 (마지막에)
+    stop_logging()
 
 app = create_app()
 
@@ -0,0 +1,213 @@
+# dir_size_index.py
+"""
+모듈 설명:
+    - 폴더 용량 인덱스. 폴더마다 (mtime, 바로 아래 파일 용량 합계, 하위 폴더 이름들, 전체 용량)을 기억해 두고
+      batmon_db(dir_size_index)에 저장한다. (재시작해도 유지)
+    - 다시 계산할 때 mtime이 그대로인 폴더는 scandir 없이 stat 한 번으로 재사용하고,
+      mtime이 바뀐 폴더(파일 추가/삭제/이름 변경)만 다시 합산한다.
+    - 파일 내용만 바뀌는 경우(로그 append 등)는 폴더 mtime이 바뀌지 않으므로,
+      DIR_SIZE_RESCAN 초가 지난 폴더는 mtime과 관계없이 다시 합산한다.
+    - 요청에서는 인덱스 값만 읽고, 오래된 값이면 백그라운드 계산을 걸어 둔 뒤 "계산 중" 상태로 응답한다.
+    - 재계산은 size_engine 으로 하위 폴더들을 병렬로 훑고, DIR_SIZE_DEADLINE 초가 지나면 그때까지의 값을
+      부분 결과(partial)로 저장한다. 부분 결과는 최신이 아닌 것으로 보므로 다음 조회 때 이어서 다시 계산된다.
+      (이미 훑은 폴더는 stat 한 번으로 재사용)
+주요 기능:
+    - dir_size_index.lookup: (용량 또는 None, 최신 여부)
+    - dir_size_index.refresh: 백그라운드 재계산 요청 (같은 폴더는 한 번만)
+    - dir_size_index.is_computing: 재계산 중인지
+    - dir_size_index.is_partial: 부분 결과인지
+    - dir_size_index.cancel / shutdown: 진행 중인 재계산 중단
+    - dir_size_index.version: 인덱스 용량 값이 바뀔 때마다 증가 (/system/dir ETag)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+from backend.core.batmon_db import batmon_db
+from backend.core.config import config
+from backend.core.logger import get_logger
+from backend.utils.size_engine import scan_dir, size_walker
+
+logger = get_logger(__name__)
+
+@dataclass(frozen=True)
+class DirSizeEntry:
+    mtime_ns: int           # 합산 당시 폴더 mtime
+    files_size: int         # 바로 아래 파일들의 용량 합계
+    subdirs: Tuple[str, ...]  # 바로 아래 폴더 이름들
+    total: int              # 하위 전체 용량
+    scanned_at: float       # 마지막 scandir 시각 (epoch 초)
+    checked_at: float       # 마지막 검증(재계산) 시각 (epoch 초)
+    partial: bool = False   # DIR_SIZE_DEADLINE/중단으로 하위 일부를 훑지 못한 값 (예전 값으로 채움)
+
+
+class DirSizeIndex:
+    def __init__(self):
+        self._entries: Dict[str, DirSizeEntry] = {}
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1, "batmon-dirsize")
+        self._computing: Set[str] = set()
+        self._computing_lock = threading.Lock()
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self.version = 0
+
+    # --- 조회 ----------------------------------------------------------------
+    def lookup(self, path: str) -> Tuple[Optional[int], bool]:
+        """(인덱스의 전체 용량 또는 None, DIR_SIZE_FRESH 이내에 검증된 값인지). 부분 결과는 최신이 아닌 것으로 본다."""
+        self._ensure_loaded()
+        entry = self._entries.get(path)
+        if entry is None:
+            return None, False
+        return entry.total, not entry.partial and time.time() - entry.checked_at < config.DIR_SIZE_FRESH
+
+    def is_partial(self, path: str) -> bool:
+        """인덱스 값이 하위 일부만 합산한 부분 결과인지"""
+        entry = self._entries.get(path)
+        return entry is not None and entry.partial
+
+    def is_computing(self, path: str) -> bool:
+        return path in self._computing
+
+    def refresh(self, path: str):
+        """path의 용량 재계산을 백그라운드에 건다. 이미 계산 중이면 무시"""
+        with self._computing_lock:
+            if path in self._computing:
+                return
+            self._computing.add(path)
+        self._executor.submit(self._refresh, path)
+
+    def cancel(self, path: Optional[str] = None):
+        """진행 중인 재계산 중단 (path 생략 시 전체). 그때까지 합산한 값은 부분 결과로 저장된다."""
+        with self._computing_lock:
+            events = list(self._cancel_events.values()) if path is None else [self._cancel_events.get(path)]
+        for event in events:
+            if event is not None:
+                event.set()
+
+    def shutdown(self):
+        """shutdown 이벤트에서 호출: 진행 중인 재계산을 중단하고 스레드 풀 정리"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        size_walker.shutdown()
+
+    # --- 계산 ----------------------------------------------------------------
+    def _refresh(self, path: str):
+        cancel = threading.Event()
+        with self._computing_lock:
+            self._cancel_events[path] = cancel
+        changed: List[Tuple[str, DirSizeEntry]] = []
+        removed: List[str] = []
+        try:
+            self._ensure_loaded()
+            now = time.time()
+            scanned_meta: Dict[str, Tuple[int, float]] = {}  # 폴더 → (mtime_ns, scanned_at)
+
+            def visit(p: str) -> Optional[Tuple[int, Tuple[str, ...]]]:
+                # mtime이 그대로이고 DIR_SIZE_RESCAN 이내인 폴더는 바로 아래 파일을 다시 세지 않는다
+                st = os.stat(p)
+                entry = self._entries.get(p)
+                if entry and entry.mtime_ns == st.st_mtime_ns and now - entry.scanned_at < config.DIR_SIZE_RESCAN:
+                    scanned_meta[p] = (st.st_mtime_ns, entry.scanned_at)
+                    return entry.files_size, entry.subdirs
+                scanned = scan_dir(p)
+                if scanned is None:
+                    return None
+                scanned_meta[p] = (st.st_mtime_ns, now)
+                if entry:
+                    removed.extend(os.path.join(p, name) for name in set(entry.subdirs) - set(scanned[1]))
+                return scanned
+
+            walked = size_walker.walk(path, visit, deadline=config.DIR_SIZE_DEADLINE, cancel=cancel)
+            # 제한 시간 안에 훑지 못한 폴더는 예전 인덱스 값으로 채우고 부분 결과로 표시
+            totals = walked.totals(lambda p: self._entries[p].total if p in self._entries else None)
+            self._apply(walked.visited, totals, scanned_meta, now, changed)
+            self._persist(changed, removed)
+            state = "완료" if walked.complete else ("중단" if walked.cancelled else "제한 시간 초과, 부분 결과")
+            logger.debug(
+                f"폴더 용량 재계산 {state}: {path} "
+                f"({len(walked.visited)}개 폴더, {len(changed)}개 갱신, {walked.elapsed:.2f}초)"
+            )
+        except Exception as e:
+            logger.exception(f"폴더 용량 계산 실패: {path}: {e}")
+        finally:
+            with self._computing_lock:
+                self._computing.discard(path)
+                self._cancel_events.pop(path, None)
+
+    def _apply(
+        self,
+        visited: Dict[str, Tuple[int, Tuple[str, ...]]],
+        totals: Dict[str, Tuple[int, bool]],
+        scanned_meta: Dict[str, Tuple[int, float]],
+        now: float,
+        changed: List[Tuple[str, DirSizeEntry]],
+    ):
+        """훑은 폴더들의 새 항목을 인덱스에 반영하고, 저장할 항목을 changed에 모은다."""
+        bumped = False
+        for p, (files_size, subdirs) in visited.items():
+            total, done = totals[p]
+            mtime_ns, scanned_at = scanned_meta[p]
+            entry = self._entries.get(p)
+            new_entry = DirSizeEntry(mtime_ns, files_size, subdirs, total, scanned_at, now, not done)
+            self._entries[p] = new_entry
+            if entry is None or entry.total != total or entry.partial != new_entry.partial:
+                bumped = True
+            if entry is None or replace(entry, checked_at=now) != new_entry:
+                # 검증 시각(checked_at)만 바뀐 폴더는 저장하지 않는다
+                changed.append((p, new_entry))
+        if bumped:
+            self.version += 1
+
+    # --- 저장 ----------------------------------------------------------------
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                conn = batmon_db.connect()
+                try:
+                    rows = conn.execute(
+                        "SELECT path, mtime_ns, files_size, subdirs, total, scanned_at, checked_at, partial FROM dir_size_index"
+                    ).fetchall()
+                finally:
+                    conn.close()
+                for row in rows:
+                    self._entries[row["path"]] = DirSizeEntry(
+                        row["mtime_ns"], row["files_size"], tuple(json.loads(row["subdirs"])),
+                        row["total"], row["scanned_at"], row["checked_at"], bool(row["partial"]),
+                    )
+                logger.info(f"폴더 용량 인덱스 로딩: {len(rows)}개 폴더")
+            except sqlite3.Error as e:
+                logger.warning(f"폴더 용량 인덱스를 읽지 못했습니다. 빈 인덱스로 시작합니다: {e}")
+            self._loaded = True
+
+    def _persist(self, changed: List[Tuple[str, DirSizeEntry]], removed: List[str]):
+        for path in removed:
+            # 사라진 폴더와 그 하위 항목 제거
+            prefix = path + os.sep
+            for key in [k for k in self._entries if k == path or k.startswith(prefix)]:
+                del self._entries[key]
+        batmon_db.submit(
+            "DELETE FROM dir_size_index WHERE path = ? OR (path >= ? AND path < ?)",
+            [(path, path + os.sep, path + chr(ord(os.sep) + 1)) for path in removed],
+        )
+        batmon_db.submit(
+            "INSERT OR REPLACE INTO dir_size_index (path, mtime_ns, files_size, subdirs, total, scanned_at, checked_at, partial)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (path, e.mtime_ns, e.files_size, json.dumps(e.subdirs, ensure_ascii=False), e.total, e.scanned_at, e.checked_at, int(e.partial))
+                for path, e in changed
+            ],
+        )
+
+
+# 단일톤
+dir_size_index = DirSizeIndex()
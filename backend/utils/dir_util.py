@@ -1,11 +1,17 @@
 # dir_util.py
+import base64
+import fnmatch
+import heapq
+import json
 import os
 import sys
 import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
 from backend.core.config import config  # Config 싱글톤: programs 파싱/캐시 제공
+from backend.utils.dir_size_index import dir_size_index
+from backend.utils.size_engine import parallel_dir_size
 
 __all__ = [
     "is_hidden",
@@ -15,6 +21,8 @@ __all__ = [
     "dir_size",
     "fmt_mtime",
     "get_directory_info",
+    "iter_directory_entries",
+    "listing_signature",
 ]
 
 # -------------------------
@@ -44,18 +52,12 @@ def stat_safe(entry: os.DirEntry):
         return None
 
 
-def dir_size(p: Path) -> int:
-    """폴더 전체 용량(비용 큼). 필요 시에만 호출 권장."""
-    total = 0
-    for root, dirs, files in os.walk(p, followlinks=False):
-        for fname in files:
-            fpath = Path(root) / fname
-            try:
-                st = fpath.stat()
-                total += getattr(st, "st_size", 0)
-            except Exception:
-                pass
-    return total
+def dir_size(p: Path, deadline: Optional[float] = None) -> int:
+    """
+    폴더 전체 용량(비용 큼). 필요 시에만 호출 권장.
+    하위 폴더들을 size_engine 스레드 풀에서 병렬로 훑는다. deadline(초)을 주면 그때까지의 부분 합계.
+    """
+    return parallel_dir_size(str(p), deadline=deadline).total
 
 
 def fmt_mtime(ts: float | None) -> str | None:
@@ -66,50 +68,71 @@ def fmt_mtime(ts: float | None) -> str | None:
 # 루트 가드 (BATMON.yml 기반)
 # -------------------------
 
-def allowed_roots() -> List[Path]:
+def _root_key(path: str) -> str:
+    """루트 비교용 키. 윈도우는 대소문자를 구분하지 않으므로 casefold."""
+    return path.casefold() if sys.platform.startswith("win") else path
+
+
+# (config.version, 허용 루트 목록, {루트 키: 루트}) - 설정이 바뀔 때만 다시 만든다
+_roots_index: Tuple[int, List[Path], Dict[str, Path]] = (-1, [], {})
+
+
+def _allowed_roots_index() -> Tuple[List[Path], Dict[str, Path]]:
     """
-    BATMON.yml 의 programs[].base_dir 목록을 Path로 정규화하여 반환.
-    config.list_programs()는 YAML 변경을 감지해 자동 재로딩함.
+    BATMON.yml 의 programs[].base_dir 를 resolve 한 결과를 config.version 별로 캐시.
+    요청마다 base_dir 들을 다시 resolve 하지 않는다.
     """
-    roots: List[Path] = []
-    for prog in (config.list_programs() or []):  # YAML 변경 감지 후 최신값
+    global _roots_index
+    # programs 와 version 을 한 스냅샷에서 읽는다 (따로 읽으면 그 사이 다시 읽기로 옛 루트가 새 버전에 캐시될 수 있음)
+    snap = config.snapshot()  # YAML 변경 감지 후 최신값
+    programs, version = snap.programs, snap.version
+    cached_version, roots, index = _roots_index
+    if cached_version == version:
+        return roots, index
+
+    roots, index = [], {}
+    for prog in programs:
         base = (prog or {}).get("base_dir")
         if not base:
             continue
         try:
-            roots.append(Path(base).resolve(strict=False))
+            root = Path(base).resolve(strict=False)
         except Exception:
             continue
+        # 중복 제거 (Windows 대소문자/경로 구분 완화)
+        key = _root_key(str(root))
+        if key not in index:
+            index[key] = root
+            roots.append(root)
+    _roots_index = (version, roots, index)
+    return roots, index
 
-    # 중복 제거 (Windows 대소문자/경로 구분 완화)
-    seen = set()
-    uniq: List[Path] = []
-    for r in roots:
-        key = str(r).casefold()
-        if key not in seen:
-            seen.add(key)
-            uniq.append(r)
-    return uniq
 
-
-def _is_subpath(child: Path, parent: Path) -> bool:
-    """child 가 parent 하위 경로인지 안전 판정."""
-    try:
-        child.resolve(strict=False).relative_to(parent.resolve(strict=False))
-        return True
-    except Exception:
-        return False
+def allowed_roots() -> List[Path]:
+    """
+    BATMON.yml 의 programs[].base_dir 목록을 Path로 정규화하여 반환.
+    config.list_programs()는 YAML 변경을 감지해 자동 재로딩함.
+    """
+    return list(_allowed_roots_index()[0])
 
 
 def normalize_and_guard(path: str) -> Path:
     """
     경로 정규화 + BATMON.yml 에 정의된 base_dir 들 중 하나의 하위만 허용.
     허용 루트 밖이면 PermissionError.
+    경로는 한 번만 resolve 하고, 자신과 상위 폴더들을 루트 키 dict에서 찾는다. (루트 개수와 무관)
     """
     real = Path(path).resolve(strict=False)
-    for root in allowed_roots():
-        if real == root or _is_subpath(real, root):
-            return real
+    _, index = _allowed_roots_index()
+    if index:
+        current = str(real)
+        while True:
+            if _root_key(current) in index:
+                return real
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
     raise PermissionError(f"Access denied outside allowed roots: {real}")
 
 
@@ -117,6 +140,106 @@ def normalize_and_guard(path: str) -> Path:
 # 디렉터리 조회
 # -------------------------
 
+SORT_KEYS = ("name", "mtime", "size")
+_FILE_ATTRIBUTE_HIDDEN = 0x2
+
+
+def _entry_info(entry: os.DirEntry, include_hidden: bool, compute_size: bool) -> Optional[Dict[str, Any]]:
+    """
+    scandir 항목 하나를 폴더/파일 dict로 변환. 숨김(제외 시)이나 기타 항목(심볼릭 링크, 소켓 등)은 None
+    항목 수가 많은 폴더를 위해 Path 객체를 만들지 않고, 숨김 속성도 DirEntry의 stat(윈도우는 추가 syscall 없음)으로 본다.
+    """
+    st = stat_safe(entry)
+    if not include_hidden and (entry.name.startswith(".") or getattr(st, "st_file_attributes", 0) & _FILE_ATTRIBUTE_HIDDEN):
+        return None
+
+    mtime = fmt_mtime(getattr(st, "st_mtime", None)) if st else None
+
+    if entry.is_dir(follow_symlinks=False):
+        return {
+            "name": entry.name,
+            "path": entry.path.replace("\\", "/"),
+            "is_dir": True,
+            "mtime": mtime,
+            "size": None,
+            "size_computing": False,
+            "size_partial": False,
+        }
+    if entry.is_file(follow_symlinks=False):
+        ext = os.path.splitext(entry.name)[1]
+        return {
+            "name": entry.name,
+            "path": entry.path.replace("\\", "/"),
+            "is_dir": False,
+            "ext": ext[1:].lower() if ext else "",
+            "size": getattr(st, "st_size", None) if (st and compute_size) else None,
+            "mtime": mtime,
+        }
+    return None
+
+
+def iter_directory_entries(
+    path: str,
+    *,
+    include_hidden: bool = False,
+    compute_size: bool = False,
+    exts: Optional[Iterable[str]] = None,
+    pattern: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    os.scandir가 내주는 순서 그대로 폴더/파일 dict를 내보낸다. (정렬 없음, 폴더 용량 없음)
+    - exts: 확장자 목록 (예: ["log", "txt"]), pattern: 파일명 glob (예: "*2025_07*"). 대소문자 무시, 파일에만 적용.
+    - 경로 가드는 호출 즉시 수행한다. (허용 루트 밖이면 PermissionError)
+    """
+    root = normalize_and_guard(path)
+    ext_set = {e.lower().lstrip(".") for e in exts or () if e}
+    return _iter_entries(root, include_hidden, compute_size, ext_set, pattern.lower() if pattern else None)
+
+
+def _iter_entries(root: Path, include_hidden: bool, compute_size: bool, ext_set: set, pattern: Optional[str]) -> Iterator[Dict[str, Any]]:
+    with os.scandir(root) as it:
+        for entry in it:
+            try:
+                node = _entry_info(entry, include_hidden, compute_size)
+            except Exception:
+                # 개별 항목 오류는 무시하고 계속
+                continue
+            if node is None:
+                continue
+            if not node["is_dir"]:
+                if ext_set and node["ext"] not in ext_set:
+                    continue
+                if pattern and not fnmatch.fnmatchcase(node["name"].lower(), pattern):
+                    continue
+            yield node
+
+
+def _sort_key(node: Dict[str, Any], sort: str) -> tuple:
+    name = node["name"] or ""
+    if sort == "mtime":
+        primary = node["mtime"] or ""   # "YYYY-mm-dd HH:MM:SS" 문자열은 사전순 = 시간순
+    elif sort == "size":
+        primary = node["size"] or 0
+    else:
+        primary = name.lower()
+    return (primary, name.lower(), name)
+
+
+def encode_cursor(sort: str, order: str, key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort, order, list(key)], ensure_ascii=False).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> tuple:
+    """cursor → 마지막으로 보낸 항목의 정렬 키. 형식이 틀리거나 정렬 조건이 다르면 ValueError"""
+    try:
+        c_sort, c_order, key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("잘못된 cursor 입니다.")
+    if (c_sort, c_order) != (sort, order):
+        raise ValueError("cursor가 정렬 조건(sort/order)과 맞지 않습니다.")
+    return tuple(key)
+
+
 def get_directory_info(
     path: str,
     *,
@@ -124,88 +247,107 @@ def get_directory_info(
     max_depth: int = 1,
     include_hidden: bool = False,
     compute_size: bool = False,          # 파일/폴더 사이즈 계산
+    sort: str = "name",
+    order: str = "asc",
+    exts: Optional[Iterable[str]] = None,
+    pattern: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     주어진 경로의 디렉토리/파일 정보를 반환.
     - recursive=True면 하위 폴더를 depth 제한(max_depth)까지 포함.
     - include_hidden=False면 숨김 항목 제외.
-    - compute_size=True면 파일 size, 폴더 size(재귀) 계산.
+    - compute_size=True면 파일 size, 폴더 size(재귀) 포함.
+      폴더 size는 폴더 용량 인덱스(dir_size_index)의 값이며, 오래된 값이면 백그라운드 재계산을 걸고
+      size_computing=True 로 표시한다. (아직 계산된 적 없으면 size=None)
+      제한 시간 안에 다 훑지 못한 부분 합계면 size_partial=True.
+    - sort(name/mtime/size), order(asc/desc)로 정렬하고, exts/pattern으로 파일을 거른다.
+    - limit을 주면 파일을 limit개씩 나누어 주고, 다음 페이지가 있으면 next_cursor를 준다.
+      폴더 목록은 첫 페이지(cursor 없음)에만 포함한다. cursor가 잘못되면 ValueError.
 
     반환 스키마:
     {
       "path": "C:/auto_esafe/download",
       "is_dir": True,
       "size": 12345,         # 선택
+      "size_computing": False,
+      "size_partial": False, # 부분 합계 (DIR_SIZE_DEADLINE 초과)
       "folders": [ { name, path, is_dir, size?, mtime, children? }, ... ],
-      "files":   [ { name, path, is_dir: False, ext, size?, mtime }, ... ]
+      "files":   [ { name, path, is_dir: False, ext, size?, mtime }, ... ],
+      "total_files": 100000, # 필터를 통과한 전체 파일 수
+      "next_cursor": "..."   # 다음 페이지가 없으면 None
     }
     """
+    after = decode_cursor(cursor, sort, order) if cursor else None
     root = normalize_and_guard(path)
     info: Dict[str, Any] = {
         "path": str(root).replace("\\", "/"),
         "is_dir": True,
-        "size": dir_size(root) if compute_size else None,
+        "size": None,
+        "size_computing": False,
+        "size_partial": False,
         "folders": [],
         "files": [],
+        "total_files": 0,
+        "next_cursor": None,
     }
-
+    if compute_size:
+        info["size"], fresh = dir_size_index.lookup(str(root))
+        if not fresh:
+            dir_size_index.refresh(str(root))
+        info["size_computing"] = dir_size_index.is_computing(str(root))
+        info["size_partial"] = dir_size_index.is_partial(str(root))
+
+    reverse = order == "desc"
     try:
-        with os.scandir(root) as it:
-            for entry in it:
-                try:
-                    p = Path(entry.path)
-                    if not include_hidden and is_hidden(p):
-                        continue
-
-                    st = stat_safe(entry)
-                    mtime = fmt_mtime(getattr(st, "st_mtime", None)) if st else None
-
-                    if entry.is_dir(follow_symlinks=False):
-                        node: Dict[str, Any] = {
-                            "name": entry.name,
-                            "path": str(p).replace("\\", "/"),
-                            "is_dir": True,
-                            "mtime": mtime,
-                            "size": (dir_size(p) if compute_size else None),
-                        }
-                        if recursive and max_depth > 1:
-                            # 하위 폴더 재귀
-                            child = get_directory_info(
-                                str(p),
-                                recursive=True,
-                                max_depth=max_depth - 1,
-                                include_hidden=include_hidden,
-                                compute_size=compute_size,
-                            )
-                            node["children"] = {
-                                "folders": child.get("folders", []),
-                                "files": child.get("files", []),
-                            }
-                        info["folders"].append(node)
-
-                    elif entry.is_file(follow_symlinks=False):
-                        ext = p.suffix[1:].lower() if p.suffix else ""
-                        size = getattr(st, "st_size", None) if (st and compute_size) else None
-                        info["files"].append({
-                            "name": entry.name,
-                            "path": str(p).replace("\\", "/"),
-                            "is_dir": False,
-                            "ext": ext,
-                            "size": size,
-                            "mtime": mtime,
-                        })
-
-                    else:
-                        # 기타(심볼릭 링크, 소켓 등)는 스킵
-                        continue
-
-                except Exception:
-                    # 개별 항목 오류는 무시하고 계속
-                    continue
-
-        # 보기 좋게 정렬(자연정렬/한글은 클라 정렬로 처리하므로 여기선 기본 정렬)
-        info["folders"].sort(key=lambda x: (x["name"] or "").lower())
-        info["files"].sort(key=lambda x: (x["name"] or "").lower())
+        folders: List[Dict[str, Any]] = []
+        files: List[Dict[str, Any]] = []
+        for node in iter_directory_entries(root, include_hidden=include_hidden, compute_size=compute_size,
+                                           exts=exts, pattern=pattern):
+            (folders if node["is_dir"] else files).append(node)
+
+        if after is None:
+            for node in folders:
+                if compute_size:
+                    # 하위 폴더 용량은 root 재계산 때 함께 갱신된다
+                    node_path = os.path.join(str(root), node["name"])
+                    node["size"], _ = dir_size_index.lookup(node_path)
+                    node["size_partial"] = dir_size_index.is_partial(node_path)
+                    if node["size"] is None and not info["size_computing"]:
+                        dir_size_index.refresh(str(root))
+                        info["size_computing"] = True
+                    node["size_computing"] = info["size_computing"]
+                if recursive and max_depth > 1:
+                    # 하위 폴더 재귀
+                    child = get_directory_info(
+                        node["path"],
+                        recursive=True,
+                        max_depth=max_depth - 1,
+                        include_hidden=include_hidden,
+                        compute_size=compute_size,
+                    )
+                    node["children"] = {
+                        "folders": child.get("folders", []),
+                        "files": child.get("files", []),
+                    }
+            folders.sort(key=lambda x: _sort_key(x, sort), reverse=reverse)
+            info["folders"] = folders
+
+        info["total_files"] = len(files)
+        if limit is None:
+            files.sort(key=lambda x: _sort_key(x, sort), reverse=reverse)
+            info["files"] = files
+        else:
+            # 전체 정렬 대신 cursor 이후 limit+1개만 골라낸다 (O(n log limit))
+            if after is not None:
+                files = [f for f in files if (_sort_key(f, sort) < after if reverse else _sort_key(f, sort) > after)]
+            pick = heapq.nlargest if reverse else heapq.nsmallest
+            page = pick(limit + 1, files, key=lambda x: _sort_key(x, sort))
+            if len(page) > limit:
+                page = page[:limit]
+                info["next_cursor"] = encode_cursor(sort, order, _sort_key(page[-1], sort))
+            info["files"] = page
 
     except Exception as e:
         # 전체 디렉토리 접근 예외
@@ -213,6 +355,16 @@ def get_directory_info(
 
     return info
 
+
+def listing_signature(info: Dict[str, Any]) -> str:
+    """
+    get_directory_info 결과의 내용 버전 문자열 (ETag 용).
+    목록을 만든 그 scandir 결과에서 바로 만들므로 ETag 때문에 디렉토리를 다시 훑지 않는다.
+    폴더 용량/재계산 중 여부도 결과에 들어 있으므로 함께 반영된다.
+    """
+    return json.dumps(info, sort_keys=True, ensure_ascii=False, default=str)
+
+
 if __name__ == "__main__":
     dir_info = get_directory_info("C:/auto_esafe", recursive=False, max_depth=2, include_hidden=False, compute_size=True)
     print(dir_info)
\ No newline at end of file
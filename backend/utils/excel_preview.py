@@ -0,0 +1,211 @@
+# excel_preview.py
+"""
+모듈 설명:
+    - 엑셀(.xls/.xlsx) 미리보기용 유틸. 파일보기 화면이 행 구간(page)씩 요청한다.
+    - 통합문서는 (경로, mtime, 크기)마다 한 번만 읽어 모든 시트를 열 단위(DataFrame) 그대로 캐시한다. (HTML 변환 없음)
+      같은 파일을 다시 보거나 페이지를 넘길 때는 다시 읽지 않는다.
+    - 정렬/필터는 서버에서 한다. 결과 행 순서(위치 배열)를 시트마다 몇 개 기억하므로
+      같은 조건으로 페이지를 넘기면 해당 구간만 문자열로 바꿔 보낸다.
+    - 필터용 소문자 문자열 열은 그 열로 처음 필터할 때 한 번 만든다.
+주요 기능:
+    - excel_cache.get: 현재 파일 상태에 맞는 Workbook (없거나 바뀌었으면 읽어서 캐시)
+    - read_page: 시트/정렬/필터/구간 → ExcelPage
+"""
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.core.logger import get_logger
+from backend.domains.system_schema import ExcelPage
+
+logger = get_logger(__name__)
+
+MAX_PAGE_ROWS = 1000    # 한 번에 보낼 수 있는 최대 행 수
+CACHE_SIZE = 8          # 기억하는 통합문서 수 (LRU)
+ORDER_CACHE_SIZE = 8    # 시트마다 기억하는 정렬/필터 결과 수 (LRU)
+
+
+def _cell(value: Any) -> Optional[str]:
+    """셀 값 → 화면 표시 문자열 (빈 셀은 None)"""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        return str(int(value)) if value.is_integer() and abs(value) < 1e15 else str(value)
+    if isinstance(value, datetime):
+        # pandas.Timestamp/NaT 도 datetime 이다
+        if value != value:
+            return None
+        if (value.hour, value.minute, value.second, value.microsecond) == (0, 0, 0, 0):
+            return value.strftime("%Y-%m-%d")
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+@dataclass
+class Sheet:
+    name: str
+    frame: Any                                  # pandas.DataFrame (열 이름은 문자열, 행은 0부터 위치)
+    _text: Dict[int, Any] = field(default_factory=dict, repr=False)
+    _orders: "OrderedDict[tuple, Any]" = field(default_factory=OrderedDict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.frame.columns)
+
+    def text(self, column: int):
+        """필터용 소문자 표시 문자열 열 (빈 셀은 ""). 열마다 처음 필터할 때 만든다"""
+        with self._lock:
+            text = self._text.get(column)
+            if text is None:
+                text = self.frame.iloc[:, column].map(lambda v: (_cell(v) or "").lower()).astype(object)
+                self._text[column] = text
+            return text
+
+    def order(self, sort: Optional[int], desc: bool, query: str, column: Optional[int]):
+        """정렬/필터 결과 행 위치 배열 (numpy). 같은 조건은 캐시에서 돌려준다"""
+        import numpy as np
+
+        key = (sort, desc, query, column)
+        with self._lock:
+            positions = self._orders.get(key)
+            if positions is not None:
+                self._orders.move_to_end(key)
+                return positions
+
+        positions = np.arange(len(self.frame))
+        if query:
+            columns = [column] if column is not None else range(len(self.frame.columns))
+            mask = np.zeros(len(self.frame), dtype=bool)
+            for i in columns:
+                mask |= self.text(i).str.contains(query, regex=False).to_numpy(dtype=bool)
+            positions = positions[mask]
+        if sort is not None:
+            series = self.frame.iloc[positions, sort]
+            try:
+                ordered = series.sort_values(ascending=not desc, kind="stable", na_position="last")
+            except TypeError:
+                # 숫자/문자가 섞인 열은 표시 문자열로 정렬 (빈 칸은 None 으로 바꿔서 위와 같이 맨 뒤로)
+                ordered = series.map(lambda v: _cell(v) or None).sort_values(
+                    ascending=not desc, kind="stable", na_position="last")
+            # iloc 로 잘라낸 series 의 index 는 원래 행 위치(RangeIndex)
+            positions = ordered.index.to_numpy()
+
+        with self._lock:
+            self._orders[key] = positions
+            while len(self._orders) > ORDER_CACHE_SIZE:
+                self._orders.popitem(last=False)
+        return positions
+
+
+@dataclass
+class Workbook:
+    path: str
+    mtime_ns: int
+    size: int
+    sheets: Dict[str, Sheet]
+
+
+def load_workbook(path: str) -> Workbook:
+    """통합문서의 모든 시트를 읽는다. (첫 행은 머리글, .xls 는 xlrd 필요)"""
+    import pandas as pd
+
+    st = os.stat(path)
+    frames = pd.read_excel(path, sheet_name=None)
+    sheets = {}
+    for name, frame in frames.items():
+        frame.columns = [str(c) for c in frame.columns]
+        sheets[str(name)] = Sheet(str(name), frame.reset_index(drop=True))
+    return Workbook(path, st.st_mtime_ns, st.st_size, sheets)
+
+
+class ExcelCache:
+    """경로별 Workbook LRU 캐시. 읽기는 한 번에 하나씩 (같은 파일을 두 번 읽지 않도록)"""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self._size = size
+        self._items: "OrderedDict[str, Workbook]" = OrderedDict()
+        self._lock = threading.Lock()          # _items 보호
+        self._load_lock = threading.Lock()     # 파일 읽기 직렬화
+
+    def _fresh(self, path: str, st: os.stat_result) -> Optional[Workbook]:
+        with self._lock:
+            book = self._items.get(path)
+            if book is not None and book.size == st.st_size and book.mtime_ns == st.st_mtime_ns:
+                self._items.move_to_end(path)
+                return book
+        return None
+
+    def get(self, path: str) -> Tuple[Workbook, bool]:
+        """(현재 파일 상태에 맞는 Workbook, 캐시에서 꺼냈는지)"""
+        book = self._fresh(path, os.stat(path))
+        if book is not None:
+            return book, True
+        with self._load_lock:
+            book = self._fresh(path, os.stat(path))
+            if book is not None:
+                return book, True
+            book = load_workbook(path)
+            logger.debug(f"엑셀 읽기 완료: {path} (시트 {len(book.sheets)}개)")
+            with self._lock:
+                self._items[path] = book
+                self._items.move_to_end(path)
+                while len(self._items) > self._size:
+                    self._items.popitem(last=False)
+            return book, False
+
+
+# 단일톤
+excel_cache = ExcelCache()
+
+
+def read_page(
+    path: str,
+    *,
+    sheet: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+    sort: Optional[int] = None,
+    desc: bool = False,
+    query: str = "",
+    column: Optional[int] = None,
+) -> ExcelPage:
+    """
+    시트의 행 구간. sort/column 은 열 위치(0부터), query 는 대소문자 무시 부분 문자열 필터.
+    없는 시트/열이면 ValueError.
+    """
+    book, cached = excel_cache.get(path)
+    names = list(book.sheets)
+    if not names:
+        raise ValueError("시트가 없는 파일입니다.")
+    if sheet is None:
+        sheet = names[0]
+    if sheet not in book.sheets:
+        raise ValueError(f"시트를 찾을 수 없습니다: {sheet}")
+    data = book.sheets[sheet]
+    width = len(data.frame.columns)
+    for index in (sort, column):
+        if index is not None and not 0 <= index < width:
+            raise ValueError(f"열 번호가 범위를 벗어났습니다: {index}")
+
+    limit = max(1, min(limit, MAX_PAGE_ROWS))
+    positions = data.order(sort, desc, query.strip().lower(), column)
+    page = positions[offset:offset + limit]
+    values = data.frame.iloc[page].itertuples(index=False, name=None)
+    return ExcelPage(
+        sheets=names,
+        sheet=sheet,
+        columns=data.columns,
+        total_rows=len(data.frame),
+        matched_rows=len(positions),
+        offset=offset,
+        row_numbers=[int(p) + 1 for p in page],
+        rows=[[_cell(v) for v in row] for row in values],
+        cached=cached,
+    )
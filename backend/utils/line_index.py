@@ -0,0 +1,287 @@
+# line_index.py
+"""
+모듈 설명:
+    - 큰 텍스트/로그 파일을 통째로 읽지 않고 원하는 줄 구간만 읽어 주는 텍스트 뷰어용 유틸.
+    - 파일마다 희소(sparse) 줄 위치 색인을 만든다. CHUNK_SIZE(1MB)마다 한 번씩 (줄 번호, byte offset)을 기억하므로
+      수 GB 로그도 색인은 수천 개 항목뿐이고, 임의의 줄은 가장 가까운 색인 지점부터 1MB 안쪽만 읽으면 찾는다.
+    - 색인은 (크기, mtime) 기준으로 캐시하고, 파일이 커지면(로그 append) 늘어난 부분만 이어서 색인한다.
+      파일이 작아지거나 같은 크기로 다시 쓰이면 처음부터 다시 만든다.
+    - "마지막 N줄", "offset 앞/뒤 N줄"은 색인 없이 파일 끝/해당 위치에서 바로 읽으므로 처음 열 때 기다리지 않는다.
+      (색인은 그동안 백그라운드에서 만든다)
+    - 인코딩은 파일 앞부분(SAMPLE_SIZE)만 보고 정한다. (BOM → utf-8-sig, utf-8로 읽히면 utf-8, 아니면 cp949)
+주요 기능:
+    - line_index_cache.get: 색인 조회 (wait=False면 없을 때 백그라운드 생성만 걸고 None)
+    - read_window: 줄 번호/마지막 N줄/offset 기준으로 줄 구간 읽기 → TextWindow
+"""
+import bisect
+import codecs
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import BinaryIO, List, Optional, Tuple
+
+from backend.core.logger import get_logger
+from backend.domains.system_schema import TextWindow
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 1024 * 1024        # 색인 간격이자 한 번에 읽는 크기 (1MB)
+SAMPLE_SIZE = 64 * 1024         # 인코딩 판단에 쓰는 앞부분 크기
+MAX_LINE_BYTES = 64 * 1024      # 한 줄을 이보다 길게 보여주지 않는다 (줄바꿈 없는 거대한 줄 대비)
+MAX_WINDOW_LINES = 5000         # 한 번에 읽을 수 있는 최대 줄 수
+CACHE_SIZE = 32                 # 색인을 기억하는 파일 수 (LRU)
+HEAD_SIZE = 256                 # 파일이 교체되었는지 비교하는 앞부분 크기
+
+
+def detect_encoding(sample: bytes) -> str:
+    """앞부분 sample로 인코딩 판단. 잘린 마지막 글자는 무시한다."""
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp949"
+
+
+@dataclass
+class LineIndex:
+    path: str
+    mtime_ns: int
+    size: int                   # 색인한 크기 (bytes)
+    encoding: str
+    head: bytes = b""           # 파일 앞부분 (교체된 파일인지 확인용)
+    newlines: int = 0           # size 까지의 줄바꿈 수
+    last_byte: bytes = b""      # size 직전 1 byte (마지막 줄이 줄바꿈으로 끝났는지)
+    cp_lines: List[int] = field(default_factory=lambda: [0])    # 색인 지점의 줄 번호 (0부터)
+    cp_offsets: List[int] = field(default_factory=lambda: [0])  # 색인 지점의 byte offset (항상 줄의 시작)
+
+    @property
+    def total_lines(self) -> int:
+        """줄 수 (줄바꿈 없이 끝나는 마지막 줄 포함)"""
+        return self.newlines + (1 if self.size and self.last_byte != b"\n" else 0)
+
+    def extend(self, f: BinaryIO, size: int):
+        """self.size 부터 size 까지 이어서 색인 (CHUNK_SIZE 마다 색인 지점 하나)"""
+        pos = self.size
+        f.seek(pos)
+        while pos < size:
+            chunk = f.read(min(CHUNK_SIZE, size - pos))
+            if not chunk:
+                break
+            first = chunk.find(b"\n")
+            if first != -1 and pos + first + 1 < size:
+                # 이 청크에서 처음 시작하는 줄을 색인 지점으로
+                self.cp_lines.append(self.newlines + 1)
+                self.cp_offsets.append(pos + first + 1)
+            self.newlines += chunk.count(b"\n")
+            self.last_byte = chunk[-1:]
+            pos += len(chunk)
+        self.size = pos
+
+    def line_offset(self, f: BinaryIO, line: int) -> int:
+        """line 번째 줄(0부터)의 시작 offset. 줄 수보다 크면 파일 끝"""
+        if line >= self.total_lines:
+            return self.size
+        i = bisect.bisect_right(self.cp_lines, line) - 1
+        return _skip_lines(f, self.cp_offsets[i], line - self.cp_lines[i], self.size)
+
+    def line_number(self, f: BinaryIO, offset: int) -> int:
+        """offset(줄의 시작)의 줄 번호 (0부터)"""
+        i = bisect.bisect_right(self.cp_offsets, offset) - 1
+        return self.cp_lines[i] + _count_newlines(f, self.cp_offsets[i], offset)
+
+
+def _skip_lines(f: BinaryIO, offset: int, lines: int, size: int) -> int:
+    """offset 에서 lines 줄을 건너뛴 위치"""
+    f.seek(offset)
+    while lines > 0 and offset < size:
+        chunk = f.read(min(CHUNK_SIZE, size - offset))
+        if not chunk:
+            break
+        n = chunk.count(b"\n")
+        if n < lines:
+            lines -= n
+            offset += len(chunk)
+            continue
+        i = -1
+        for _ in range(lines):
+            i = chunk.find(b"\n", i + 1)
+        return offset + i + 1
+    return offset
+
+
+def _count_newlines(f: BinaryIO, start: int, end: int) -> int:
+    f.seek(start)
+    count = 0
+    while start < end:
+        chunk = f.read(min(CHUNK_SIZE, end - start))
+        if not chunk:
+            break
+        count += chunk.count(b"\n")
+        start += len(chunk)
+    return count
+
+
+class LineIndexCache:
+    """경로별 LineIndex LRU 캐시. 색인 생성/확장은 한 번에 하나씩 (같은 파일을 두 번 읽지 않도록)"""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self._size = size
+        self._items: "OrderedDict[str, LineIndex]" = OrderedDict()
+        self._lock = threading.Lock()          # _items 보호
+        self._build_lock = threading.Lock()    # 색인 생성/확장 직렬화
+        self._executor = ThreadPoolExecutor(1, "batmon-line-index")
+        self._pending: set = set()
+
+    def get(self, path: str, wait: bool = True) -> Optional[LineIndex]:
+        """
+        현재 파일 상태에 맞는 색인. wait=False 이고 새로 만들거나 늘려야 하면
+        백그라운드 작업만 걸고 None 을 돌려준다.
+        """
+        st = os.stat(path)
+        with self._lock:
+            index = self._items.get(path)
+            if index is not None:
+                self._items.move_to_end(path)
+        if index is not None and index.size == st.st_size and index.mtime_ns == st.st_mtime_ns:
+            return index
+        if not wait:
+            self._schedule(path)
+            return None
+        return self._build(path)
+
+    def _schedule(self, path: str):
+        with self._lock:
+            if path in self._pending:
+                return
+            self._pending.add(path)
+        self._executor.submit(self._background_build, path)
+
+    def _background_build(self, path: str):
+        try:
+            self._build(path)
+        except OSError as e:
+            logger.warning(f"줄 색인 생성 실패: {path}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+
+    def _build(self, path: str) -> LineIndex:
+        with self._build_lock, open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            with self._lock:
+                index = self._items.get(path)
+            if index is not None and index.size == st.st_size and index.mtime_ns == st.st_mtime_ns:
+                return index
+            sample = f.read(SAMPLE_SIZE)
+            if index is None or st.st_size <= index.size or not sample.startswith(index.head):
+                # 처음이거나, 작아짐(잘림)/같은 크기로 다시 쓰임/다른 파일로 교체됨 → 처음부터
+                index = LineIndex(path, st.st_mtime_ns, 0, detect_encoding(sample), sample[:HEAD_SIZE])
+            else:
+                # 늘어난 부분만 이어서 색인. 읽고 있는 요청이 있을 수 있으므로 사본을 늘린다
+                index = replace(index, cp_lines=list(index.cp_lines), cp_offsets=list(index.cp_offsets))
+            index.extend(f, st.st_size)
+            index.mtime_ns = st.st_mtime_ns
+            with self._lock:
+                self._items[path] = index
+                self._items.move_to_end(path)
+                while len(self._items) > self._size:
+                    self._items.popitem(last=False)
+            return index
+
+
+# 단일톤
+line_index_cache = LineIndexCache()
+
+
+def _read_forward(f: BinaryIO, offset: int, count: int, size: int) -> Tuple[List[bytes], int]:
+    """offset(줄의 시작)부터 count 줄과 끝 offset"""
+    f.seek(offset)
+    lines: List[bytes] = []
+    while len(lines) < count and offset < size:
+        line = f.readline(min(MAX_LINE_BYTES, size - offset))
+        if not line:
+            break
+        offset += len(line)
+        if not line.endswith(b"\n") and offset < size:
+            # 너무 긴 줄: 보여줄 부분만 남기고 줄 끝까지 건너뛴다
+            offset = _skip_lines(f, offset, 1, size)
+            f.seek(offset)
+        lines.append(line)
+    return lines, offset
+
+
+def _read_backward(f: BinaryIO, end: int, count: int) -> Tuple[List[bytes], int]:
+    """end(줄의 시작 또는 파일 끝) 앞의 count 줄과 시작 offset"""
+    block = 64 * 1024
+    limit = min(count * MAX_LINE_BYTES, 16 * CHUNK_SIZE)  # 줄이 아주 길어도 읽는 양에 상한
+    pos = end
+    buf = b""
+    while pos > 0 and buf.count(b"\n", 0, max(0, len(buf) - 1)) < count and len(buf) < limit:
+        step = min(block, pos)
+        pos -= step
+        f.seek(pos)
+        buf = f.read(step) + buf
+    parts = buf.split(b"\n")
+    lines = [part + b"\n" for part in parts[:-1]] + ([parts[-1]] if parts[-1] else [])
+    if pos > 0 and len(lines) > 1:
+        # 잘린 첫 줄은 버린다 (줄의 시작부터 보여준다)
+        lines = lines[1:]
+    lines = lines[-count:]
+    return lines, end - sum(len(line) for line in lines)
+
+
+def read_window(
+    path: str,
+    *,
+    count: int = 200,
+    start_line: Optional[int] = None,
+    tail: bool = False,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+) -> TextWindow:
+    """
+    파일의 줄 구간을 읽는다. (파일 전체를 메모리에 올리지 않음)
+    - start_line: 그 줄(1부터)부터 count 줄 (색인이 필요하므로 없으면 만들 때까지 기다림)
+    - tail: 마지막 count 줄
+    - before / after: 그 offset 앞 / 뒤의 count 줄 (이전/다음 구간, 색인 불필요)
+    - 아무것도 없으면 처음부터 count 줄
+    before/after 는 이전 응답의 start_offset / end_offset 값이어야 한다. (줄의 시작)
+    """
+    count = max(1, min(count, MAX_WINDOW_LINES))
+    index = line_index_cache.get(path, wait=start_line is not None)
+
+    with open(path, "rb") as f:
+        if index is not None:
+            size, encoding = index.size, index.encoding
+        else:
+            size = os.fstat(f.fileno()).st_size
+            encoding = detect_encoding(f.read(SAMPLE_SIZE))
+
+        if start_line is not None:
+            start = index.line_offset(f, max(0, start_line - 1))
+            raw, end = _read_forward(f, start, count, size)
+        elif tail or before is not None:
+            end = size if before is None else min(max(0, before), size)
+            raw, start = _read_backward(f, end, count)
+        else:
+            start = min(max(0, after or 0), size)
+            raw, end = _read_forward(f, start, count, size)
+
+        first_line = index.line_number(f, start) + 1 if index is not None and raw else None
+
+    return TextWindow(
+        encoding=encoding,
+        size=size,
+        total_lines=index.total_lines if index is not None else None,
+        indexing=index is None,
+        first_line=first_line,
+        start_offset=start,
+        end_offset=end,
+        bof=start == 0,
+        eof=end >= size,
+        lines=[line[:MAX_LINE_BYTES].decode(encoding, errors="replace").rstrip("\r\n") for line in raw],
+    )
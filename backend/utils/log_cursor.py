@@ -0,0 +1,128 @@
+# log_cursor.py
+"""
+모듈 설명:
+    - 로그 파일별로 "어디까지 읽었는지"(inode/size/offset)와 누적 ERROR 건수를 기억하는 커서.
+    - 점검할 때마다 파일 전체를 다시 읽지 않고, 지난번 이후에 추가된 바이트만 검사한다.
+      (검사 자체는 log_scanner가 담당하며, 첫/마지막 ERROR 위치와 주변 줄도 함께 누적된다)
+    - 파일이 잘리거나(truncate) 교체(rotate)되면 처음부터 다시 읽는다.
+    - 커서는 {BASE_DIR}/db/log_cursor.json 에 저장되어 재시작 후에도 이어서 읽는다.
+주요 기능:
+    - log_cursor_store.scan(path): 새로 추가된 부분만 검사한 뒤 커서(누적 결과) 반환
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, Optional
+
+from backend.core.config import config
+from backend.core.logger import get_logger
+from backend.utils.log_scanner import LogScanResult, scan_stream, scan_tail
+
+logger = get_logger(__name__)
+
+HEAD_SIZE = 64            # 파일 교체 감지용 앞부분 지문 크기
+KEEP_DAYS = 7             # 이 기간 동안 검사하지 않은 커서는 저장 시 제거
+
+
+@dataclass
+class LogCursor(LogScanResult):
+    """LogScanResult(offset/line_count/error_count/ERROR 위치) + 파일 식별 정보"""
+    path: str = ""
+    dev: int = 0
+    ino: int = 0
+    size: int = 0          # 마지막 검사 시 파일 크기
+    head: str = ""         # 파일 앞부분(hex), 같은 inode로 다시 쓰인 파일 감지용
+    scanned_at: float = 0.0
+
+
+class LogCursorStore:
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+        self._cursors: Optional[Dict[str, LogCursor]] = None
+        self._lock = threading.Lock()  # _cursors / 저장 파일 보호
+        self._path_locks: Dict[str, threading.Lock] = {}
+
+    def scan(self, path: str) -> LogCursor:
+        """
+        path 로그에서 지난 검사 이후 추가된 부분만 읽어 커서를 갱신하고,
+        누적 결과를 반환한다. (아직 줄바꿈이 안 된 마지막 줄의 ERROR도 결과에는 포함되지만
+        커서에는 반영하지 않고 다음 검사 때 다시 읽는다)
+        """
+        key = os.path.normcase(os.path.abspath(path))
+        # 같은 파일을 동시에 검사하면 중복 집계되므로 파일 단위로 직렬화한다.
+        with self._path_lock(key):
+            st = os.stat(path)
+            with open(path, "rb") as f:
+                head = f.read(HEAD_SIZE).hex()
+                with self._lock:
+                    cursor = self._load().get(key)
+                before = (cursor.offset, cursor.size, cursor.head) if cursor else None
+                if cursor is None or self._replaced(cursor, st, head):
+                    if cursor is not None:
+                        logger.info(f"로그 파일이 교체되었거나 잘려서 처음부터 다시 읽습니다: {path}")
+                    cursor = LogCursor(path=path, dev=st.st_dev, ino=st.st_ino)
+                else:
+                    cursor = replace(cursor, error_context=list(cursor.error_context),
+                                     recent_lines=list(cursor.recent_lines))
+
+                tail = scan_stream(f, cursor) if st.st_size > cursor.offset else b""
+
+            cursor.size = st.st_size
+            cursor.head = head
+            # 변화가 없으면 저장 생략 (단, 하루에 한 번은 scanned_at 갱신을 위해 저장)
+            now = time.time()
+            changed = before != (cursor.offset, cursor.size, cursor.head) or now - cursor.scanned_at > 86400
+            if changed:
+                cursor.scanned_at = now
+            with self._lock:
+                self._load()[key] = cursor
+                if changed:
+                    self._save(self._cursors)
+            return scan_tail(cursor, tail)
+
+    # --- 내부 ----------------------------------------------------------------
+    @staticmethod
+    def _replaced(cursor: LogCursor, st: os.stat_result, head: str) -> bool:
+        """rotate(다른 inode) / truncate(크기 감소) / 같은 inode에 새로 쓰기(앞부분 변경) 감지"""
+        if (cursor.dev, cursor.ino) != (st.st_dev, st.st_ino):
+            return True
+        if st.st_size < cursor.offset:
+            return True
+        n = min(len(cursor.head), len(head))
+        return cursor.head[:n] != head[:n]
+
+    def _path_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._path_locks.setdefault(key, threading.Lock())
+
+    def _load(self) -> Dict[str, LogCursor]:
+        if self._cursors is None:
+            self._cursors = {}
+            try:
+                with open(self.store_path, "r", encoding="utf-8") as f:
+                    for key, raw in (json.load(f) or {}).items():
+                        self._cursors[key] = LogCursor(**raw)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"로그 커서 파일을 읽지 못해 새로 시작합니다: {self.store_path} ({e})")
+        return self._cursors
+
+    def _save(self, cursors: Dict[str, LogCursor]):
+        expire = time.time() - KEEP_DAYS * 86400
+        for key in [k for k, c in cursors.items() if c.scanned_at < expire]:
+            del cursors[key]
+            self._path_locks.pop(key, None)
+        tmp_path = f"{self.store_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({k: asdict(c) for k, c in cursors.items()}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.store_path)
+        except Exception as e:
+            logger.warning(f"로그 커서 저장 실패: {self.store_path} ({e})")
+
+
+# 단일톤
+log_cursor_store = LogCursorStore(config.LOG_CURSOR_PATH)
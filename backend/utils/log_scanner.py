@@ -0,0 +1,165 @@
+# log_scanner.py
+"""
+모듈 설명:
+    - 로그 파일을 고정 크기 청크(bytes)로 읽으면서 ERROR가 포함된 줄을 찾는 스캐너.
+    - 줄마다 str을 만들지 않고 bytes.find/count로만 검색하며, 찾은 줄과 그 주변 줄만 디코딩한다.
+    - 청크 경계에 걸친 줄은 다음 청크와 이어 붙여 처리하므로, 사용 메모리는 파일 크기와 무관하다.
+주요 기능:
+    - LogScanResult: ERROR 건수, 첫/마지막 ERROR의 위치(offset, 줄번호), 마지막 ERROR 주변 줄
+    - scan_stream: 열린 파일을 result.offset부터 끝까지 읽어 result를 갱신 (완결된 줄만 반영)
+    - scan_tail: 아직 줄바꿈이 없는 마지막 줄까지 포함한 결과(사본) 생성
+    - scan_file: 파일 전체를 한 번에 검사
+"""
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Deque, List, Optional
+
+ERROR_MARK = b"ERROR"
+CHUNK_SIZE = 1024 * 1024   # 한 번에 읽는 크기 (1MB)
+MAX_LINE = 4 * CHUNK_SIZE  # 줄바꿈 없이 이보다 길어지면 강제로 끊어서 처리 (메모리 상한)
+CONTEXT_LINES = 2          # 마지막 ERROR 앞뒤로 보여줄 줄 수
+MAX_CONTEXT_CHARS = 500    # 주변 줄 하나당 최대 글자 수
+
+
+@dataclass
+class LogScanResult:
+    offset: int = 0                           # 다음 검사 시작 위치 (항상 줄의 시작)
+    line_count: int = 0                       # offset 까지의 줄 수
+    error_count: int = 0                      # ERROR가 포함된 줄 수
+    first_error_offset: Optional[int] = None  # 첫 ERROR 줄의 시작 byte 위치
+    first_error_line: Optional[int] = None    # 첫 ERROR 줄 번호 (1부터)
+    last_error_offset: Optional[int] = None
+    last_error_line: Optional[int] = None
+    error_context: List[str] = field(default_factory=list)  # 마지막 ERROR 줄과 앞뒤 줄
+    context_pending: int = 0                  # 아직 못 채운 마지막 ERROR 뒤쪽 줄 수
+    recent_lines: List[str] = field(default_factory=list)   # offset 직전의 줄들 (다음 검사의 앞쪽 주변 줄)
+
+
+def _decode(line: bytes) -> str:
+    try:
+        text = line.decode("utf-8")
+    except UnicodeDecodeError:
+        text = line.decode("cp949", errors="replace")
+    return text.rstrip("\r\n")[:MAX_CONTEXT_CHARS]
+
+
+def _split_lines(buf: bytes, start: int, end: int) -> List[bytes]:
+    """buf[start:end] (완결된 줄들)을 줄 단위로 분리"""
+    return buf[start:end].splitlines() if end > start else []
+
+
+class _Scanner:
+    """청크 사이에 유지해야 하는 상태(직전 줄들)를 가진 스캐너"""
+
+    def __init__(self, result: LogScanResult, pattern: bytes, context_lines: int):
+        self.result = result
+        self.pattern = pattern
+        self.context_lines = context_lines
+        # 직전 버퍼의 마지막 줄들 (디코딩된 상태)
+        self.recent: Deque[str] = deque(result.recent_lines[-context_lines:] if context_lines else [], maxlen=context_lines)
+
+    def feed(self, buf: bytes):
+        """완결된 줄들로만 이루어진 buf를 처리 (buf[0]은 result.offset 위치)"""
+        r = self.result
+        n = self.context_lines
+
+        # 1) 이전 ERROR의 뒤쪽 주변 줄 채우기
+        if r.context_pending:
+            pos = 0
+            lines: List[bytes] = []
+            while len(lines) < r.context_pending and pos < len(buf):
+                eol = buf.find(b"\n", pos)
+                lines.append(buf[pos:eol])
+                pos = eol + 1
+            r.error_context.extend(_decode(line) for line in lines)
+            r.context_pending -= len(lines)
+
+        # 2) ERROR 줄 찾기 (줄 번호는 찾은 곳까지만 세어 나간다)
+        line_no = r.line_count
+        counted = 0
+        last_start = last_end = -1
+        idx = buf.find(self.pattern)
+        while idx != -1:
+            start = buf.rfind(b"\n", 0, idx) + 1
+            end = buf.find(b"\n", idx)
+            line_no += buf.count(b"\n", counted, start)
+            counted = start
+            r.error_count += 1
+            if r.first_error_offset is None:
+                r.first_error_offset = r.offset + start
+                r.first_error_line = line_no + 1
+            r.last_error_offset = r.offset + start
+            r.last_error_line = line_no + 1
+            last_start, last_end = start, end
+            idx = buf.find(self.pattern, end + 1)
+
+        # 3) 이 버퍼에서 ERROR가 나왔다면 마지막 ERROR 주변 줄만 디코딩
+        if last_start != -1:
+            before = [_decode(line) for line in _split_lines(buf, 0, last_start)[-n:]] if n else []
+            if len(before) < n and self.recent:
+                before = list(self.recent)[-(n - len(before)):] + before
+            after = [_decode(line) for line in _split_lines(buf, last_end + 1, len(buf))[:n]]
+            r.error_context = before + [_decode(buf[last_start:last_end])] + after
+            r.context_pending = n - len(after)
+
+        # 4) 다음 버퍼를 위해 마지막 몇 줄 보관
+        if n:
+            tail_start = len(buf)
+            for _ in range(n):
+                tail_start = buf.rfind(b"\n", 0, tail_start - 1) + 1
+                if tail_start == 0:
+                    break
+            self.recent.extend(_decode(line) for line in _split_lines(buf, tail_start, len(buf)))
+            r.recent_lines = list(self.recent)
+
+        r.line_count += buf.count(b"\n")
+        r.offset += len(buf)
+
+
+def scan_stream(f, result: LogScanResult, *, pattern: bytes = ERROR_MARK,
+                chunk_size: int = CHUNK_SIZE, context_lines: int = CONTEXT_LINES) -> bytes:
+    """
+    열린 바이너리 파일 f를 result.offset 부터 끝까지 chunk_size 단위로 읽으며 result를 갱신한다.
+    완결된(줄바꿈으로 끝나는) 줄만 result에 반영하고, 줄바꿈이 없는 마지막 조각을 반환한다.
+    """
+    scanner = _Scanner(result, pattern, context_lines)
+    f.seek(result.offset)
+    carry = b""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        buf = carry + chunk if carry else chunk
+        cut = buf.rfind(b"\n") + 1
+        if cut == 0 and len(buf) > MAX_LINE:
+            # 비정상적으로 긴 줄: 강제로 줄바꿈이 있는 것처럼 처리
+            buf, cut = buf + b"\n", len(buf) + 1
+            scanner.feed(buf)
+            result.offset -= 1
+            carry = b""
+            continue
+        if cut == 0:
+            carry = buf
+            continue
+        scanner.feed(buf[:cut] if cut < len(buf) else buf)
+        carry = buf[cut:]
+    return carry
+
+
+def scan_tail(result: LogScanResult, tail: bytes, *, pattern: bytes = ERROR_MARK,
+              context_lines: int = CONTEXT_LINES) -> LogScanResult:
+    """줄바꿈이 없는 마지막 조각(tail)까지 포함한 결과를 사본으로 반환 (result는 그대로)"""
+    merged = replace(result, error_context=list(result.error_context), recent_lines=list(result.recent_lines))
+    if tail:
+        _Scanner(merged, pattern, context_lines).feed(tail + b"\n")
+        merged.offset -= 1
+    return merged
+
+
+def scan_file(path: str, *, pattern: bytes = ERROR_MARK, chunk_size: int = CHUNK_SIZE,
+              context_lines: int = CONTEXT_LINES) -> LogScanResult:
+    """파일 전체를 검사 (마지막 미완결 줄 포함)"""
+    result = LogScanResult()
+    with open(path, "rb") as f:
+        tail = scan_stream(f, result, pattern=pattern, chunk_size=chunk_size, context_lines=context_lines)
+    return scan_tail(result, tail, pattern=pattern, context_lines=context_lines)
@@ -0,0 +1,185 @@
+# size_engine.py
+"""
+모듈 설명:
+    - 폴더 트리를 제한된 크기의 스레드 풀에서 병렬로 훑는 용량 계산 엔진.
+    - 네트워크 드라이브처럼 scandir/stat 한 번의 지연이 큰 저장소에서는 한 폴더씩 재귀로 도는 것보다
+      여러 폴더를 동시에 훑는 쪽이 훨씬 빠르다. (지연 시간이 겹쳐서 숨겨진다)
+    - deadline(초)이 지나거나 cancel 이벤트가 설정되면 새 폴더를 더 훑지 않고,
+      그때까지 훑은 폴더들만으로 결과를 돌려준다. (complete=False)
+주요 기능:
+    - SizeWalker.walk: 폴더마다 visit(path) → (바로 아래 파일 용량 합계, 바로 아래 폴더 이름들)을 병렬 호출
+    - WalkResult.totals: 훑은 결과로 폴더별 하위 전체 용량과 완료 여부를 아래에서부터 합산
+    - scan_dir: 기본 visit (심볼릭 링크/정션은 따라가지 않음)
+    - parallel_dir_size: 한 폴더의 전체 용량 (SizeResult, 부분 결과 여부 포함)
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from backend.core.config import config
+
+# 0x400 == FILE_ATTRIBUTE_REPARSE_POINT (윈도우 정션, 중복/순환 방지)
+_REPARSE_POINT = 0x400
+# cancel 이벤트 확인 간격(초)
+_POLL_INTERVAL = 0.2
+
+# visit(path) -> (바로 아래 파일 용량 합계, 바로 아래 폴더 이름들). 폴더를 읽을 수 없으면 None
+Visit = Callable[[str], Optional[Tuple[int, Tuple[str, ...]]]]
+
+
+def scan_dir(path: str) -> Optional[Tuple[int, Tuple[str, ...]]]:
+    """(바로 아래 파일 용량 합계, 바로 아래 폴더 이름들). 심볼릭 링크/정션은 따라가지 않는다."""
+    files_size = 0
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_file(follow_symlinks=False):
+                        files_size += entry.stat(follow_symlinks=False).st_size
+                    elif entry.is_dir(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        if getattr(st, "st_file_attributes", 0) & _REPARSE_POINT:
+                            continue
+                        subdirs.append(entry.name)
+                except OSError:
+                    # 권한/경합 문제는 건너뛰기
+                    continue
+    except OSError:
+        return None
+    return files_size, tuple(sorted(subdirs))
+
+
+@dataclass
+class WalkResult:
+    root: str
+    visited: Dict[str, Tuple[int, Tuple[str, ...]]] = field(default_factory=dict)
+    complete: bool = True       # deadline/cancel 없이 끝까지 훑었는지
+    cancelled: bool = False
+    elapsed: float = 0.0
+
+    def totals(self, fallback: Callable[[str], Optional[int]] = lambda path: None) -> Dict[str, Tuple[int, bool]]:
+        """
+        훑은 폴더마다 (하위 전체 용량, 완료 여부).
+        훑지 못한 하위 폴더는 fallback(path)(예: 예전 인덱스 값, 없으면 0)으로 채우고 완료 아님으로 표시한다.
+        """
+        result: Dict[str, Tuple[int, bool]] = {}
+        # 깊은 폴더부터 합산 (재귀 없이)
+        for path in sorted(self.visited, key=lambda p: p.count(os.sep), reverse=True):
+            files_size, subdirs = self.visited[path]
+            total, done = files_size, True
+            for name in subdirs:
+                child = os.path.join(path, name)
+                if child in result:
+                    child_total, child_done = result[child]
+                else:
+                    child_total, child_done = fallback(child) or 0, False
+                total += child_total
+                done = done and child_done
+            result[path] = (total, done)
+        return result
+
+
+@dataclass(frozen=True)
+class SizeResult:
+    total: int
+    dirs: int           # 훑은 폴더 수
+    partial: bool       # deadline/cancel로 일부만 합산한 값인지
+    elapsed: float
+
+
+class SizeWalker:
+    """
+    폴더 트리 병렬 순회기. 폴더 하나 = 작업 하나로 스레드 풀(DIR_SIZE_WORKERS)에 넣고,
+    끝난 폴더의 하위 폴더들을 다시 넣는다. 풀은 모든 순회가 함께 쓴다. (스레드 수 상한)
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self._workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self._workers or config.DIR_SIZE_WORKERS, "batmon-size-walk")
+        return self._pool
+
+    def walk(
+        self,
+        root: str,
+        visit: Visit = scan_dir,
+        *,
+        deadline: Optional[float] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> WalkResult:
+        """
+        root 아래 폴더들을 병렬로 visit 한다.
+        - deadline: 제한 시간(초). 지나면 남은 폴더는 훑지 않고 complete=False
+        - cancel: 설정되면 남은 폴더는 훑지 않고 complete=False, cancelled=True
+        이미 실행 중인 visit 는 끝까지 돌지만 결과는 버린다.
+        """
+        started = time.monotonic()
+        stop_at = started + deadline if deadline else None
+        pool = self._get_pool()
+        result = WalkResult(root)
+        pending: Set[Future] = {pool.submit(self._visit, visit, root)}
+
+        while pending:
+            timeout = _POLL_INTERVAL
+            if stop_at is not None:
+                timeout = min(timeout, max(0.0, stop_at - time.monotonic()))
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, scanned = future.result()
+                if scanned is None:
+                    continue
+                result.visited[path] = scanned
+                for name in scanned[1]:
+                    pending.add(pool.submit(self._visit, visit, os.path.join(path, name)))
+
+            cancelled = cancel is not None and cancel.is_set()
+            if pending and (cancelled or (stop_at is not None and time.monotonic() >= stop_at)):
+                for future in pending:
+                    future.cancel()
+                result.complete = False
+                result.cancelled = cancelled
+                break
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    @staticmethod
+    def _visit(visit: Visit, path: str) -> Tuple[str, Optional[Tuple[int, Tuple[str, ...]]]]:
+        try:
+            return path, visit(path)
+        except Exception:
+            return path, None
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# 단일톤
+size_walker = SizeWalker()
+
+
+def parallel_dir_size(
+    path: str,
+    *,
+    deadline: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+) -> SizeResult:
+    """path 아래 전체 파일 용량. deadline/cancel로 중단되면 partial=True 인 부분 합계."""
+    walked = size_walker.walk(path, deadline=deadline, cancel=cancel)
+    total, done = walked.totals().get(path, (0, walked.complete))
+    return SizeResult(total, len(walked.visited), not (done and walked.complete), walked.elapsed)
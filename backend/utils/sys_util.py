@@ -1,7 +1,11 @@
 import os
+import threading
+import time
+from dataclasses import dataclass
+from backend.core.config import config
 from backend.core.logger import get_logger
 import platform, socket, uuid, psutil, datetime
-from typing import Iterable
+from typing import Optional, Tuple
 from datetime import datetime, timedelta, timezone
 
 from backend.domains.system_schema import CPUInfo, DiskInfo, MemoryInfo, NetworkInfo, OSInfo, SystemStats, SystemSummary
@@ -42,11 +46,36 @@ def _get_primary_ip() -> str:
         except Exception:
             return "0.0.0.0"
 
+def system_drive() -> str:
+    """디스크 사용량을 볼 시스템 드라이브 (윈도우: C:\\, 그 외: /)"""
+    if platform.system() == "Windows":
+        return os.getenv("SystemDrive", "C:") + "\\"
+    return "/"
+
 def _get_mac() -> str:
     node = uuid.getnode()
     return ":".join(f"{(node >> i) & 0xff:02x}" for i in range(40, -1, -8))
 
-def get_system_info() -> "SystemSummary":
+@dataclass(frozen=True)
+class HostFacts:
+    """거의 바뀌지 않는 호스트 정보 (STATIC_INFO_TTL 동안 재사용)"""
+    os_info: OSInfo
+    net_info: NetworkInfo
+    processor: str
+    physical_cores: Optional[int]
+    logical_cores: Optional[int]
+    boot_time: datetime
+
+_host_facts: Optional[HostFacts] = None
+_host_facts_expires = 0.0           # time.monotonic() 기준
+_host_facts_lock = threading.Lock()
+_host_facts_refreshing = False
+_host_facts_generation = 0          # 호스트 정보를 새로 수집할 때마다 1씩 증가 (/system/info 의 ETag)
+
+# (system_info_version, SystemSummary): 같은 버전이면 다시 만들지 않는다
+_summary_cache: Optional[Tuple[Tuple[int, float], SystemSummary]] = None
+
+def _collect_host_facts() -> HostFacts:
     # ---- OS / Host ----
     system = platform.system()                      # e.g., 'Windows'
     release = platform.release()                    # e.g., '10' or '11'
@@ -68,12 +97,102 @@ def get_system_info() -> "SystemSummary":
     mac = _get_mac()
     net_info = NetworkInfo(ip=ip, mac=mac)
 
-    # ---- CPU ----
-    cpu_info = CPUInfo(
+    return HostFacts(
+        os_info=os_info,
+        net_info=net_info,
         processor=platform.processor(),
         physical_cores=psutil.cpu_count(logical=False) or None,
         logical_cores=psutil.cpu_count(logical=True) or None,
-        usage_percent=float(psutil.cpu_percent(interval=1)),
+        boot_time=datetime.fromtimestamp(psutil.boot_time(), tz=KST),
+    )
+
+def _store_host_facts(facts: HostFacts):
+    global _host_facts, _host_facts_expires, _host_facts_generation
+    _host_facts = facts
+    _host_facts_generation += 1
+    _host_facts_expires = time.monotonic() + config.STATIC_INFO_TTL
+
+def _refresh_host_facts():
+    global _host_facts_refreshing
+    try:
+        _store_host_facts(_collect_host_facts())
+    except Exception as e:
+        logger.exception("호스트 정보 갱신 실패: %s", e)
+    finally:
+        _host_facts_refreshing = False
+
+def get_host_facts() -> HostFacts:
+    """
+    호스트 정보. 처음 한 번만 직접 수집하고, 이후 TTL이 지나면
+    이전 값을 그대로 돌려주면서 백그라운드 스레드에서 다시 수집한다.
+    """
+    global _host_facts_refreshing
+    facts = _host_facts
+    if facts is None:
+        with _host_facts_lock:
+            if _host_facts is None:
+                _store_host_facts(_collect_host_facts())
+            return _host_facts
+    if time.monotonic() >= _host_facts_expires and not _host_facts_refreshing:
+        _host_facts_refreshing = True
+        threading.Thread(target=_refresh_host_facts, name="batmon-host-facts", daemon=True).start()
+    return facts
+
+def _latest_sample():
+    """백그라운드 지표 수집기의 최근 수집값 (아직 없으면 None)"""
+    # sys_util ← metrics_sampler 순환 import를 피하기 위해 여기서 import
+    from backend.domains.services.metrics_sampler import metrics_sampler
+    return metrics_sampler.latest()
+
+def host_facts_ready() -> bool:
+    """호스트 정보를 이미 수집했는지 (False 이면 get_host_facts 가 platform/socket 조회로 기다린다)"""
+    return _host_facts is not None
+
+def prime_host_facts() -> threading.Thread:
+    """startup: 호스트 정보를 백그라운드 스레드에서 미리 수집 (첫 /system/info 가 기다리지 않도록)"""
+    def _prime():
+        try:
+            get_host_facts()
+        except Exception as e:
+            logger.exception("호스트 정보 수집 실패: %s", e)
+    thread = threading.Thread(target=_prime, name="batmon-host-facts", daemon=True)
+    thread.start()
+    return thread
+
+def _cpu_usage_percent() -> float:
+    """백그라운드 지표 수집기의 최근 CPU 사용률 (기다리지 않음)"""
+    latest = _latest_sample()
+    if latest is not None:
+        return float(latest.cpu)
+    return float(psutil.cpu_percent(interval=None))
+
+def system_info_version() -> Tuple[int, float]:
+    """
+    /system/info 내용 버전: (호스트 정보 세대, 지표 수집 시각).
+    사용률/업타임은 지표 수집 주기(METRICS_INTERVAL)마다 한 번만 새로 읽으므로 버전이 같으면 get_system_info 도 같은 값이다.
+    지표 수집기가 아직 값이 없으면 METRICS_INTERVAL 단위 시각을 쓴다.
+    """
+    latest = _latest_sample()
+    if latest is not None:
+        tick = latest.ts
+    else:
+        tick = time.time() // config.METRICS_INTERVAL * config.METRICS_INTERVAL
+    return _host_facts_generation, tick
+
+def get_system_info() -> "SystemSummary":
+    global _summary_cache
+    facts = get_host_facts()
+    version = system_info_version()
+    cached = _summary_cache
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # ---- CPU ----
+    cpu_info = CPUInfo(
+        processor=facts.processor,
+        physical_cores=facts.physical_cores,
+        logical_cores=facts.logical_cores,
+        usage_percent=_cpu_usage_percent(),
     )
 
     # ---- Memory ----
@@ -91,15 +210,15 @@ def get_system_info() -> "SystemSummary":
     )
 
     # ---- Disk (시스템 드라이브 기준) ----
-    system_drive = os.getenv("SystemDrive", "C:") + "\\"
-    d = psutil.disk_usage(system_drive)
+    drive = system_drive()
+    d = psutil.disk_usage(drive)
     disk_total_gb = _bytes_to_gb(d.total)
     disk_free_gb = _bytes_to_gb(d.free)
     disk_used_gb = _bytes_to_gb(d.used)
     disk_used_pct = round(d.percent, 1)
 
     disk_info = DiskInfo(
-        device=system_drive,
+        device=drive,
         total_gb=disk_total_gb,
         used_gb=disk_used_gb,
         free_gb=disk_free_gb,
@@ -107,7 +226,7 @@ def get_system_info() -> "SystemSummary":
     )
 
     # ---- Stats (부팅/업타임) ----
-    boot_dt1 = datetime.fromtimestamp(psutil.boot_time(), tz=KST)
+    boot_dt1 = facts.boot_time
     now = datetime.now(KST)
     uptime_seconds = max(0, int((now - boot_dt1).total_seconds()))
     # boot_dt = boot_dt1.strftime("%Y-%m-%d %H:%M:%S %Z")
@@ -120,14 +239,14 @@ def get_system_info() -> "SystemSummary":
 
     # ---- Summary ----
     summary = SystemSummary(
-        os=os_info,
+        os=facts.os_info,
         cpu=cpu_info,
         memory=mem_info,
         disk=disk_info,
-        network=net_info,
+        network=facts.net_info,
         stats=stats,
     )
-
+    _summary_cache = (version, summary)
     return summary
 
 
@@ -138,80 +257,8 @@ def format_bytes(n: int) -> str:
             return f"{n:.2f} {unit}"
         n /= 1024
     return f"{n:.2f} EB"
-    
-def dir_size(path: str,
-             exclude_globs: Iterable[str] = (),
-             follow_symlinks: bool = False,
-             skip_reparse: bool = True) -> int:
-    """
-    path 아래 모든 파일 용량(st_size)을 합산.
-    - exclude_globs: ['*.tmp','*.log'] 같이 제외 패턴
-    - follow_symlinks: 심볼릭 링크/정션 따라갈지 여부
-    - skip_reparse: 윈도우 reparse point(정션) 건너뛰기
-    """
-    import fnmatch
-    total = 0
-
-    try:
-        with os.scandir(path) as it:
-            for entry in it:
-                # 제외 패턴
-                if any(fnmatch.fnmatch(entry.name, pat) for pat in exclude_globs):
-                    continue
-
-                try:
-                    if entry.is_symlink():
-                        if not follow_symlinks:
-                            continue
-
-                    if entry.is_file(follow_symlinks=follow_symlinks):
-                        # stat 한 번만 호출 (성능)
-                        total += entry.stat(follow_symlinks=follow_symlinks).st_size
-                    elif entry.is_dir(follow_symlinks=follow_symlinks):
-                        # 윈도우 reparse point(정션) 회피 (중복/순환 방지)
-                        if skip_reparse:
-                            try:
-                                # Windows에서 reparse point 감지
-                                st = entry.stat(follow_symlinks=False)
-                                # 0x400 == FILE_ATTRIBUTE_REPARSE_POINT
-                                if getattr(st, "st_file_attributes", 0) & 0x400:
-                                    continue
-                            except Exception:
-                                pass
-                        total += dir_size(entry.path, exclude_globs, follow_symlinks, skip_reparse)
-                except (PermissionError, FileNotFoundError):
-                    # 권한/경합 문제는 건너뛰기
-                    continue
-    except (NotADirectoryError, FileNotFoundError):
-        return 0
-
-    return total
-
-def get_directory_info(path:str) -> dict:
-    """
-    주어진 경로의 디렉토리 및 파일 정보를 반환합니다.
-    """
-    info = {
-        "path": path,
-        "size": dir_size(path),
-        "files": [],
-        "folders": [],
-    }
-
-    try:
-        with os.scandir(path) as it:
-            for entry in it:
-                if entry.is_file():
-                    info["files"].append(entry.name)
-                elif entry.is_dir():
-                    info["folders"].append(entry.name)
-    except Exception as e:
-        logger.exception("디렉토리 정보 조회 실패: %s", e)
-
-    return info
 
 if __name__ == "__main__":
     # from pprint import pprint
     # pprint(get_system_info())
-    dir_info = get_directory_info("c:/auto_esafe/log")
-    logger.info("디렉토리 정보: %s", dir_info)
\ No newline at end of file
+    logger.info("시스템 정보: %s", get_system_info())
\ No newline at end of file
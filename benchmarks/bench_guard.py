@@ -0,0 +1,95 @@
+# bench_guard.py
+"""
+경로 가드 벤치마크: 기존 방식(매번 base_dir 들을 resolve + 루트마다 relative_to) vs 루트 인덱스(normalize_and_guard)
+
+    uv run python -m benchmarks.bench_guard                    # 루트 20개, 폴더 2000개
+    uv run python -m benchmarks.bench_guard --roots 100 --folders 5000
+
+- 합성 BATMON.yml(programs 여러 개)과 폴더 트리를 임시 폴더에 만들고,
+  재귀 목록 조회처럼 폴더마다 한 번씩 가드를 호출했을 때의 폴더당 비용(µs)을 잰다.
+- 대상 폴더들은 마지막 루트 아래에 둔다. (기존 방식의 최악 경우: 모든 루트를 다 비교)
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def make_tree(base: str, roots: int, folders: int) -> list:
+    root_dirs = [os.path.join(base, f"program_{i:03d}") for i in range(roots)]
+    for d in root_dirs:
+        os.makedirs(d, exist_ok=True)
+    targets = []
+    for i in range(folders):
+        d = os.path.join(root_dirs[-1], "log", f"{i // 100:02d}", f"run_{i:05d}")
+        os.makedirs(d, exist_ok=True)
+        targets.append(d)
+    with open(os.path.join(base, "BATMON.yml"), "w", encoding="utf-8") as f:
+        f.write("programs:\n")
+        for i, d in enumerate(root_dirs):
+            f.write(f"  - name: program_{i:03d}\n    base_dir: \"{d}\"\n")
+    return targets
+
+
+def legacy_guard(path: str) -> Path:
+    """기존 normalize_and_guard (요청마다 allowed_roots() + 루트마다 _is_subpath)"""
+    from backend.core.config import config
+    roots = []
+    for prog in (config.list_programs() or []):
+        base = (prog or {}).get("base_dir")
+        if base:
+            roots.append(Path(base).resolve(strict=False))
+    seen, uniq = set(), []
+    for r in roots:
+        key = str(r).casefold()
+        if key not in seen:
+            seen.add(key)
+            uniq.append(r)
+
+    real = Path(path).resolve(strict=False)
+    for root in uniq:
+        if real == root:
+            return real
+        try:
+            real.resolve(strict=False).relative_to(root.resolve(strict=False))
+            return real
+        except Exception:
+            continue
+    raise PermissionError(path)
+
+
+def measure(fn, targets: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for t in targets:
+            fn(t)
+        best = min(best, time.perf_counter() - started)
+    return best / len(targets) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roots", type=int, default=20, help="BATMON.yml programs 개수, 기본 20")
+    parser.add_argument("--folders", type=int, default=2000, help="가드를 호출할 폴더 개수, 기본 2000")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용), 기본 3")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="batmon_bench_guard_") as base:
+        targets = make_tree(base, args.roots, args.folders)
+        # config 싱글톤이 합성 BATMON.yml을 읽도록 import 전에 지정
+        os.environ["BASE_DIR"] = base
+        os.environ["BATMON_YAML"] = os.path.join(base, "BATMON.yml")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        from backend.utils.dir_util import normalize_and_guard
+
+        print(f"루트 {args.roots}개, 폴더 {len(targets)}개 ({sys.platform})")
+        print(f"{'방식':<22}{'폴더당(µs)':>12}")
+        for name, fn in (("기존(매번 resolve)", legacy_guard), ("루트 인덱스", normalize_and_guard)):
+            print(f"{name:<22}{measure(fn, targets, args.repeat):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
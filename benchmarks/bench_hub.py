@@ -0,0 +1,164 @@
+# bench_hub.py
+"""
+허브 모드 벤치마크/확인: 로컬 포트에 대역(stand-in) 에이전트 여러 개를 띄우고 hub_poller 로 조회한다.
+
+    uv run python -m benchmarks.bench_hub                       # 에이전트 12개, 가장 느린 응답 0.8초
+    uv run python -m benchmarks.bench_hub --agents 30 --slowest 1.5 --hung 1 --down 1
+
+- 대역 에이전트는 /api/v1/batmon/check, /api/v1/system/info 만 흉내 낸다. (keep-alive, ETag → 304)
+  응답 지연은 0 ~ --slowest 초로 고르게 나눈다.
+- --hung: 제한시간(--timeout)보다 오래 걸리는 에이전트 수, --down: 아무도 듣지 않는 포트 수
+- 전체 새로고침(refresh) 시간을 가장 느린 에이전트 / 지연 합계(차례로 조회했을 때)와 비교하고,
+  두 번째 조회에서 연결 재사용(에이전트별 TCP 연결 수, check/info 동시 조회라 2개)과 304 응답 수를 확인한다.
+"""
+import argparse
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _check_body(name: str, services: int) -> bytes:
+    return json.dumps({
+        "timestamp": "2025-08-19 10:00:00",
+        "overall_status": "OK",
+        "services": [{
+            "name": f"{name}_job{i}", "description": "stand-in", "status": "OK", "message": "정상",
+            "base_dir": f"/opt/{name}/job{i}", "scheduler": "taskschd.msc", "run_time": ["0630"],
+            "retry_program": "", "retry_program_name": "", "age_seconds": 1.0,
+        } for i in range(services)],
+        "summary": "", "total_services": services, "ok_count": services, "error_count": 0,
+        "snapshot_version": 1,
+    }).encode("utf-8")
+
+
+def _info_body(name: str) -> bytes:
+    return json.dumps({
+        "os": {"system": "Linux", "release": "6", "hostname": name, "descriptions": "stand-in"},
+        "cpu": {"processor": "x86_64"},
+        "memory": {"total_gb": 16, "used_gb": 4, "available_gb": 12, "used_percent": 25},
+        "disk": {"device": "/", "total_gb": 100, "used_gb": 50, "free_gb": 50, "used_percent": 50},
+        "network": {"ip": "127.0.0.1", "mac": "00:00:00:00:00:00"},
+        "stats": {"boot_time": "2025-08-19T00:00:00", "uptime_seconds": 36000, "uptime_human": "10h"},
+    }).encode("utf-8")
+
+
+class StandInAgent:
+    """한 포트의 대역 에이전트. 받은 TCP 연결 수/요청 수/304 수를 센다"""
+
+    def __init__(self, name: str, delay: float, services: int):
+        self.name = name
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+        self.not_modified = 0
+        agent = self
+        bodies = {"/api/v1/batmon/check": _check_body(name, services), "/api/v1/system/info": _info_body(name)}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive
+
+            def setup(self):
+                super().setup()
+                agent.connections += 1
+
+            def do_GET(self):
+                agent.requests += 1
+                time.sleep(agent.delay)
+                body = bodies.get(self.path.split("?")[0])
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = f'"{name}-{len(body)}"'
+                if self.headers.get("If-None-Match") == etag:
+                    agent.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except BrokenPipeError:
+                    pass    # 제한시간이 지나 허브가 먼저 끊음 (--hung)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", _free_port()), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=12, help="정상 대역 에이전트 수, 기본 12")
+    parser.add_argument("--slowest", type=float, default=0.8, help="가장 느린 에이전트의 응답 지연(초), 기본 0.8")
+    parser.add_argument("--services", type=int, default=5, help="에이전트별 프로그램 수, 기본 5")
+    parser.add_argument("--hung", type=int, default=0, help="제한시간보다 느린 에이전트 수, 기본 0")
+    parser.add_argument("--down", type=int, default=0, help="꺼져 있는(연결 거부) 에이전트 수, 기본 0")
+    parser.add_argument("--timeout", type=float, default=2.0, help="에이전트별 제한시간(초), 기본 2")
+    args = parser.parse_args()
+
+    step = args.slowest / max(1, args.agents - 1)
+    agents = [StandInAgent(f"host{i:02d}", i * step, args.services) for i in range(args.agents)]
+    agents += [StandInAgent(f"hung{i:02d}", args.timeout * 3, args.services) for i in range(args.hung)]
+    down = [f"http://127.0.0.1:{_free_port()}" for _ in range(args.down)]
+
+    with tempfile.TemporaryDirectory(prefix="batmon_bench_hub_") as base:
+        with open(os.path.join(base, "BATMON.yml"), "w", encoding="utf-8") as f:
+            f.write("programs: []\nagents:\n")
+            for agent in agents:
+                f.write(f"  - name: {agent.name}\n    url: \"{agent.url}\"\n")
+            for i, url in enumerate(down):
+                f.write(f"  - name: down{i:02d}\n    url: \"{url}\"\n")
+        # config 싱글톤이 합성 BATMON.yml을 읽도록 import 전에 지정
+        os.environ["BASE_DIR"] = base
+        os.environ["BATMON_YAML"] = os.path.join(base, "BATMON.yml")
+        os.environ["HUB_TIMEOUT"] = str(args.timeout)
+        os.environ["HUB_INTERVAL"] = "3600"   # 백그라운드 조회는 멈추고 refresh 만 잰다
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        os.environ.setdefault("HUB_MAX_WORKERS", str(max(16, len(agents) + len(down))))
+        from backend.domains.services.hub_poller import hub_poller
+
+        hub_poller.start()
+        try:
+            total_delay = sum(a.delay for a in agents) * 2   # check + info 를 차례로
+            print(f"에이전트 {len(agents) + len(down)}개 (느림 {args.hung}, 꺼짐 {args.down}), 제한시간 {args.timeout:g}초")
+            print(f"가장 느린 정상 에이전트: {max(a.delay for a in agents[:args.agents]):.2f}초 (check, info 동시)")
+            print(f"차례로 조회했을 때 지연 합계: {total_delay:.2f}초")
+            for round_no in (1, 2):
+                started = time.perf_counter()
+                _, services, statuses = hub_poller.refresh()
+                elapsed = time.perf_counter() - started
+                by_status = {}
+                for s in statuses:
+                    by_status[s.status] = by_status.get(s.status, 0) + 1
+                print(f"[{round_no}회] refresh {elapsed:.2f}초, 서비스 {len(services)}개, 에이전트 상태 {by_status}")
+            connections = sum(a.connections for a in agents[:args.agents])
+            not_modified = sum(a.not_modified for a in agents[:args.agents])
+            print(f"정상 에이전트 TCP 연결 {connections}개 (에이전트당 {connections / args.agents:.1f}), 304 응답 {not_modified}개")
+        finally:
+            hub_poller.stop()
+            for agent in agents:
+                agent.server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
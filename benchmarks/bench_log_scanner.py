@@ -0,0 +1,82 @@
+# bench_log_scanner.py
+"""
+로그 ERROR 검사 벤치마크: 기존 readlines() 방식 vs log_scanner(청크 단위 bytes 검색)
+
+    uv run python -m benchmarks.bench_log_scanner              # 1GB 합성 로그
+    uv run python -m benchmarks.bench_log_scanner --size-mb 200
+
+- 각 방식은 별도 프로세스에서 실행하여 최대 메모리(peak RSS)를 따로 잰다.
+- 합성 로그는 ERROR 줄이 드문드문 섞인(약 1/50000) 일반적인 배치 로그 형태이다.
+  (기존 방식은 첫 ERROR에서 멈추므로, 공정하게 비교하려고 끝까지 세는 형태로 측정한다)
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+
+def _peak_rss_mb() -> float:
+    if sys.platform.startswith("win"):
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 ** 2)
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # linux: KB
+
+
+def make_log(path: str, size_mb: int):
+    info = "2025-07-15 16:21:14,287 [I] kindscrap page=12345 rows=20 공시 목록 수집 완료\n".encode("utf-8")
+    error = "2025-07-15 16:21:15,001 [E] ERROR 공시 상세 페이지 응답 없음 (timeout)\n".encode("utf-8")
+    block = info * 50_000 + error
+    with open(path, "wb") as f:
+        written = 0
+        while written < size_mb * 1024 * 1024:
+            f.write(block)
+            written += len(block)
+
+
+def run_readlines(path: str, queue):
+    started = time.perf_counter()
+    count = 0
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+        for line in lines:
+            if "ERROR" in line:
+                count += 1
+    queue.put(("readlines()", time.perf_counter() - started, _peak_rss_mb(), count))
+
+
+def run_scanner(path: str, queue):
+    from backend.utils.log_scanner import scan_file
+    started = time.perf_counter()
+    result = scan_file(path)
+    queue.put(("log_scanner", time.perf_counter() - started, _peak_rss_mb(), result.error_count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024, help="합성 로그 크기(MB), 기본 1024")
+    parser.add_argument("--path", help="합성 로그 대신 사용할 로그 파일")
+    args = parser.parse_args()
+
+    path = args.path
+    if not path:
+        path = os.path.join(tempfile.gettempdir(), f"batmon_bench_{args.size_mb}mb.log")
+        if not os.path.exists(path) or os.path.getsize(path) < args.size_mb * 1024 * 1024:
+            print(f"합성 로그 생성 중: {path}")
+            make_log(path, args.size_mb)
+    print(f"대상: {path} ({os.path.getsize(path) / (1024 ** 2):.0f} MB)")
+    print(f"{'방식':<14}{'시간(초)':>10}{'peak RSS(MB)':>15}{'ERROR 줄':>10}")
+
+    queue = multiprocessing.Queue()
+    for target in (run_readlines, run_scanner):
+        proc = multiprocessing.Process(target=target, args=(path, queue))
+        proc.start()
+        name, elapsed, peak, count = queue.get()
+        proc.join()
+        print(f"{name:<14}{elapsed:>10.2f}{peak:>15.1f}{count:>10}")
+
+
+if __name__ == "__main__":
+    main()
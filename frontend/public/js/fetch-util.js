@@ -13,6 +13,13 @@ class BatmonError extends Error {
         return `Error ${this.status}: ${this.message} (Server Time: ${this.server_time})`;
     }    
 }
+/**
+ * GET 응답 캐시 (url → { etag, data })
+ * 서버가 ETag를 주면 저장해 두고, 다음 요청에 If-None-Match로 보내서
+ * 304(Not Modified)이면 저장해 둔 데이터를 그대로 돌려준다.
+ */
+const etagCache = new Map();
+
 /**
  * 공통 fetch 함수
  * 
@@ -36,7 +43,19 @@ async function callApi(url, method, data = null) {
         if (data) {
             options.body = JSON.stringify(data);
         }
+        const cached = method === 'GET' ? etagCache.get(url) : null;
+        if (cached) {
+            options.headers['If-None-Match'] = cached.etag;
+        }
+        if (method === 'GET') {
+            // 재검증은 etagCache로 직접 하므로 브라우저 HTTP 캐시는 거치지 않는다.
+            options.cache = 'no-store';
+        }
         const response = await fetch(url, options);
+
+        if (response.status === 304 && cached) {
+            return cached.data;
+        }
         
         // 세션 타임아웃으로 인해 401 상태 코드가 반환되었는지 체크
         if (response.status === 401) {
@@ -61,6 +80,10 @@ async function callApi(url, method, data = null) {
         }
 
         const responseData = await response.json();
+        const etag = response.headers.get('ETag');
+        if (method === 'GET' && etag) {
+            etagCache.set(url, { etag, data: responseData });
+        }
         return responseData;
     } catch (error) {
         let errorStr = error.toString();